@@ -0,0 +1,131 @@
+"""Compare the delta encoded snapshot archive against JSON lines.
+
+Encodes a synthetic history of BasicVehicleStatus snapshots where only a few
+fields change between consecutive polls, then decodes it back.
+
+Usage: python benchmarks/delta_codec.py [snapshots]
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+import random
+import sys
+import time
+from typing import TYPE_CHECKING
+
+import dacite
+
+from saic_ismart_client_ng.api.vehicle import BasicVehicleStatus
+from saic_ismart_client_ng.net.codec import StdlibJsonCodec, to_json_dict
+from saic_ismart_client_ng.telemetry import DeltaArchive, DeltaEncoder
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+BASE_STATUS = {
+    "batteryVoltage": 142,
+    "bonnetStatus": 0,
+    "bootStatus": 0,
+    "canBusActive": 0,
+    "currentJourneyDistance": 40,
+    "currentJourneyId": 1237,
+    "driverDoor": 0,
+    "driverWindow": 0,
+    "engineStatus": 0,
+    "exteriorTemperature": 7,
+    "extendedData1": 79,
+    "frontLeftTyrePressure": 62,
+    "frontRightTyrePressure": 62,
+    "fuelRange": 3240,
+    "fuelRangeElec": 3240,
+    "handBrake": 1,
+    "interiorTemperature": 17,
+    "lockStatus": 1,
+    "mileage": 133690,
+    "passengerDoor": 0,
+    "powerMode": 0,
+    "rearLeftTyrePressure": 62,
+    "rearRightTyrePressure": 63,
+    "remoteClimateStatus": 0,
+    "sunroofStatus": 0,
+    "timeOfLastCANBUSActivity": 1705953523,
+    "vehicleAlarmStatus": 2,
+}
+
+
+def make_history(snapshots: int) -> list[tuple[int, BasicVehicleStatus]]:
+    rng = random.Random(42)
+    status = dict(BASE_STATUS)
+    history = []
+    timestamp = 1705953524
+    for _ in range(snapshots):
+        timestamp += 60
+        status["timeOfLastCANBUSActivity"] = timestamp - 1
+        status["exteriorTemperature"] += rng.choice((-1, 0, 0, 1))
+        status["interiorTemperature"] += rng.choice((-1, 0, 0, 1))
+        if rng.random() < 0.2:
+            status["mileage"] += rng.randint(1, 5)
+            status["fuelRangeElec"] -= rng.randint(1, 10)
+        history.append((timestamp, dacite.from_dict(BasicVehicleStatus, status)))
+    return history
+
+
+@dataclass
+class Result:
+    label: str
+    size: int
+    encode_seconds: float
+    decode_seconds: float
+
+
+def timed(function: Callable[[], object]) -> tuple[float, object]:
+    start = time.perf_counter()
+    value = function()
+    return time.perf_counter() - start, value
+
+
+def json_lines(history: list[tuple[int, BasicVehicleStatus]]) -> Result:
+    codec = StdlibJsonCodec()
+
+    def encode() -> bytes:
+        return b"\n".join(
+            codec.dumps({"timestamp": timestamp, "status": to_json_dict(status)})
+            for timestamp, status in history
+        )
+
+    encode_seconds, data = timed(encode)
+    assert isinstance(data, bytes)
+    decode_seconds, _ = timed(lambda: [json.loads(line) for line in data.splitlines()])
+    return Result("JSON lines", len(data), encode_seconds, decode_seconds)
+
+
+def delta(history: list[tuple[int, BasicVehicleStatus]]) -> Result:
+    def encode() -> bytes:
+        encoder = DeltaEncoder(BasicVehicleStatus)
+        encoder.extend(history)
+        return encoder.to_bytes()
+
+    encode_seconds, data = timed(encode)
+    assert isinstance(data, bytes)
+    decode_seconds, _ = timed(lambda: DeltaArchive(data).read())
+    return Result("delta", len(data), encode_seconds, decode_seconds)
+
+
+def main() -> None:
+    snapshots = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    history = make_history(snapshots)
+    baseline = json_lines(history)
+    results = [baseline, delta(history)]
+    for result in results:
+        print(
+            f"{result.label:>10}: {result.size / snapshots:8.1f} bytes/snapshot "
+            f"({baseline.size / result.size:5.1f}x smaller), "
+            f"encode {snapshots / result.encode_seconds:9.0f}/s, "
+            f"decode {snapshots / result.decode_seconds:9.0f}/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Measure end-to-end API call throughput for each JSON codec.
+
+Every call goes through the full client pipeline (body serialization,
+encryption, signing, decryption, JSON parsing and decoding) against an
+in-process transport that answers like the gateway does.
+
+Usage: python benchmarks/json_throughput.py [calls]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import time
+
+import httpx
+
+from saic_ismart_client_ng import SaicApi
+from saic_ismart_client_ng.api.vehicle_charging import ChargingSettingRequest
+from saic_ismart_client_ng.model import SaicApiConfiguration
+from saic_ismart_client_ng.net.codec import (
+    JsonCodec,
+    OrjsonJsonCodec,
+    StdlibJsonCodec,
+)
+from saic_ismart_client_ng.net.crypto import encrypt_response
+
+BASE_URI = "http://gateway.local/api.app/v1/"
+TENANT_ID = "459771"
+VIN = "LSJWHXXXXXXXXXXXX"
+
+CHARGING_DATA = {
+    "chrgMgmtData": {
+        "bmsChrgSts": 1,
+        "bmsPackVol": 1649,
+        "bmsPackCrnt": 19915,
+        "bmsPackSOCDsp": 786,
+        "bmsEstdElecRng": 358,
+        "imcuVehElecRng": 330,
+        "chrgngRmnngTime": 29,
+        "bmsChrgOtptCrntReq": 107,
+        "ccuOnbdChrgrPlugOn": 4,
+        "bmsOnBdChrgTrgtSOCDspCmd": 7,
+    },
+    "rvsChargeStatus": {
+        "mileage": 133690,
+        "chargingGunState": 1,
+        "realtimePower": 81,
+        "totalBatteryCapacity": 640,
+        "workingCurrent": 19915,
+        "workingVoltage": 1649,
+    },
+}
+SETTINGS_DATA = {"bmsOnBdChrgTrgtSOCDspCmd": 7, "rvcReqSts": "AQ=="}
+
+
+def gateway_transport() -> httpx.MockTransport:
+    payloads = {
+        "/vehicle/charging/mgmtData": json.dumps({"code": 0, "data": CHARGING_DATA}),
+        "/vehicle/charging/setting": json.dumps({"code": 0, "data": SETTINGS_DATA}),
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        content, headers = encrypt_response(
+            original_request_url=str(request.url),
+            original_response_headers={"Content-Type": "application/json"},
+            original_response_content=payloads[request.url.path.removeprefix("/api.app/v1")],
+            response_timestamp_ms=int(time.time() * 1000),
+            base_uri=BASE_URI,
+            tenant_id=TENANT_ID,
+        )
+        return httpx.Response(200, content=content, headers=headers)
+
+    return httpx.MockTransport(handler)
+
+
+async def run(codec: JsonCodec, calls: int) -> float:
+    configuration = SaicApiConfiguration(
+        "user@example.com",
+        "password",
+        base_uri=BASE_URI,
+        tenant_id=TENANT_ID,
+        json_codec=codec,
+    )
+    api = SaicApi(configuration, transport=gateway_transport())
+    start = time.perf_counter()
+    for _ in range(calls):
+        await api.get_vehicle_charging_management_data(VIN)
+        await api.send_vehicle_charging_settings(
+            VIN, ChargingSettingRequest(onBdChrgTrgtSOCReq=7)
+        )
+    return 2 * calls / (time.perf_counter() - start)
+
+
+def main() -> None:
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    codecs: list[JsonCodec] = [StdlibJsonCodec()]
+    try:
+        codecs.append(OrjsonJsonCodec())
+    except ImportError:
+        print("orjson is not installed, only measuring the standard library codec")
+    for codec in codecs:
+        throughput = asyncio.run(run(codec, calls))
+        print(f"{type(codec).__name__:>16}: {throughput:8.0f} calls/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,494 @@
+"""Measure each stage of an API call, in isolation and end to end.
+
+The stages are the ones a call goes through in the client: building the
+request body, converting it to JSON values (asdict), serializing it,
+encrypting it, signing the request, the (mocked) transport, decrypting the
+response, parsing its JSON and decoding it into the schema dataclasses.
+The end_to_end stage runs the whole call through SaicApi against a transport
+that replays a precomputed gateway response.
+
+Results are written as JSON. With --compare, the medians are checked
+against a previous run, e.g. the committed baseline, and the script exits
+with status 1 if a stage got slower than the threshold allows. The previous
+run must have used the same JSON codec: the standard library one, or orjson
+with --orjson.
+
+Usage:
+    python benchmarks/pipeline.py [--output results.json]
+    python benchmarks/pipeline.py --compare benchmarks/pipeline_baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+from dataclasses import dataclass
+import datetime
+import json
+import pathlib
+import platform
+import statistics
+import sys
+import time
+import timeit
+from typing import TYPE_CHECKING, Any
+
+import dacite
+import httpx
+
+from saic_ismart_client_ng import SaicApi
+from saic_ismart_client_ng.api.message import MessageResp
+from saic_ismart_client_ng.api.vehicle import VehicleControlResp, VehicleStatusResp
+from saic_ismart_client_ng.api.vehicle.commands import climate_command
+from saic_ismart_client_ng.api.vehicle_charging import (
+    ChargingSettingRequest,
+    ChargingSettingResp,
+    ChrgMgmtDataResp,
+)
+from saic_ismart_client_ng.crypto_utils import encrypt_aes_cbc_pkcs5_padding
+from saic_ismart_client_ng.model import SaicApiConfiguration
+from saic_ismart_client_ng.net.codec import (
+    JsonCodec,
+    OrjsonJsonCodec,
+    default_json_codec,
+    to_json_dict,
+)
+from saic_ismart_client_ng.net.crypto import (
+    decrypt_response,
+    encrypt_response,
+    get_app_verification_string,
+    request_key_and_iv,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+BASE_URI = "http://gateway.local/api.app/v1/"
+TENANT_ID = "459771"
+USER_TOKEN = "0123456789abcdef0123456789abcdef"
+VIN = "LSJWHXXXXXXXXXXXX"
+TIMESTAMP_MS = 1705953524000
+DEFAULT_THRESHOLD = 0.15
+
+VEHICLE_STATUS = {
+    "basicVehicleStatus": {
+        "batteryVoltage": 142,
+        "canBusActive": 1,
+        "currentJourneyDistance": 40,
+        "currentJourneyId": 1237,
+        "engineStatus": 0,
+        "exteriorTemperature": 7,
+        "frontLeftTyrePressure": 62,
+        "frontRightTyrePressure": 62,
+        "fuelRange": 3240,
+        "fuelRangeElec": 3240,
+        "interiorTemperature": 17,
+        "lockStatus": 1,
+        "mileage": 133690,
+        "rearLeftTyrePressure": 62,
+        "rearRightTyrePressure": 63,
+        "remoteClimateStatus": 2,
+        "timeOfLastCANBUSActivity": 1705953523,
+        "vehicleAlarmStatus": 2,
+    },
+    "gpsPosition": {
+        "gpsStatus": 2,
+        "timeStamp": 1705953524,
+        "wayPoint": {
+            "hdop": 7,
+            "heading": 0,
+            "position": {"altitude": 115, "latitude": 45485072, "longitude": 9160267},
+            "satellites": 10,
+            "speed": 0,
+        },
+    },
+    "statusTime": 1705953524,
+}
+CHARGING_DATA = {
+    "chrgMgmtData": {
+        "bmsChrgSts": 1,
+        "bmsPackVol": 1649,
+        "bmsPackCrnt": 19915,
+        "bmsPackSOCDsp": 786,
+        "bmsEstdElecRng": 358,
+        "imcuVehElecRng": 330,
+        "chrgngRmnngTime": 29,
+        "bmsChrgOtptCrntReq": 107,
+        "ccuOnbdChrgrPlugOn": 4,
+        "bmsOnBdChrgTrgtSOCDspCmd": 7,
+    },
+    "rvsChargeStatus": {
+        "mileage": 133690,
+        "chargingGunState": 1,
+        "realtimePower": 81,
+        "totalBatteryCapacity": 640,
+        "workingCurrent": 19915,
+        "workingVoltage": 1649,
+    },
+}
+CONTROL_DATA = {
+    "basicVehicleStatus": VEHICLE_STATUS["basicVehicleStatus"],
+    "failureType": 0,
+    "gpsPosition": VEHICLE_STATUS["gpsPosition"],
+    "rvcReqSts": "AQ==",
+    "rvcReqType": "Bg==",
+}
+SETTINGS_DATA = {"bmsOnBdChrgTrgtSOCDspCmd": 7, "rvcReqSts": "AQ=="}
+
+
+def message_list(messages: int) -> dict[str, Any]:
+    return {
+        "messages": [
+            {
+                "content": f"Your vehicle has been locked remotely ({i})",
+                "messageId": str(100_000 + i),
+                "messageTime": "2024-01-22 20:38:44",
+                "messageType": "323",
+                "readStatus": i % 2,
+                "sender": "iSMART",
+                "title": "Remote control",
+                "vin": VIN,
+            }
+            for i in range(messages)
+        ],
+        "recordsNumber": messages,
+        "totalNumber": messages,
+    }
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """One API call: the request the client sends and the data it gets back."""
+
+    name: str
+    method: str
+    path: str
+    out_type: type[Any]
+    data: dict[str, Any]
+    params: dict[str, str] | None = None
+    build: Callable[[], Any] | None = None
+    call: Callable[[SaicApi], Awaitable[Any]] | None = None
+
+
+SCENARIOS = [
+    Scenario(
+        "vehicle_status",
+        "GET",
+        "/vehicle/status",
+        VehicleStatusResp,
+        VEHICLE_STATUS,
+        params={"vin": VIN, "vehStatusReqType": "2"},
+        call=lambda api: api.get_vehicle_status(VIN),
+    ),
+    Scenario(
+        "charging_mgmt_data",
+        "GET",
+        "/vehicle/charging/mgmtData",
+        ChrgMgmtDataResp,
+        CHARGING_DATA,
+        params={"vin": VIN},
+        call=lambda api: api.get_vehicle_charging_management_data(VIN),
+    ),
+    Scenario(
+        "vehicle_control",
+        "POST",
+        "/vehicle/control",
+        VehicleControlResp,
+        CONTROL_DATA,
+        build=lambda: climate_command(fan_speed=3, temperature_idx=8).to_request(VIN),
+        call=lambda api: api.start_ac(VIN),
+    ),
+    Scenario(
+        "charging_setting",
+        "POST",
+        "/vehicle/charging/setting",
+        ChargingSettingResp,
+        SETTINGS_DATA,
+        build=lambda: ChargingSettingRequest(onBdChrgTrgtSOCReq=7, vin=VIN),
+        call=lambda api: api.send_vehicle_charging_settings(
+            VIN, ChargingSettingRequest(onBdChrgTrgtSOCReq=7)
+        ),
+    ),
+    *(
+        Scenario(
+            f"message_list_{size}",
+            "GET",
+            "/message/list",
+            MessageResp,
+            message_list(size),
+            params={"pageNum": "1", "pageSize": str(size), "messageGroup": "ALARM"},
+            call=lambda api, size=size: api.get_alarm_list(page_num=1, page_size=size),
+        )
+        for size in (10, 100, 1000)
+    ),
+]
+
+
+@dataclass
+class Timing:
+    median_us: float
+    min_us: float
+    loops: int
+
+    def to_json(self) -> dict[str, float | int]:
+        return {
+            "median_us": round(self.median_us, 3),
+            "min_us": round(self.min_us, 3),
+            "loops": self.loops,
+        }
+
+
+def measure(runner: Callable[[int], float], *, repeat: int, min_time: float) -> Timing:
+    """Time `runner(loops)` with enough loops to last `min_time` per repetition."""
+    loops = 1
+    while (elapsed := runner(loops)) < min_time:
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9)))
+    samples = [runner(loops) / loops * 1e6 for _ in range(repeat)]
+    return Timing(statistics.median(samples), min(samples), loops)
+
+
+def sync_runner(function: Callable[[], object]) -> Callable[[int], float]:
+    timer = timeit.Timer(function)
+    return timer.timeit
+
+
+def async_runner(
+    loop: asyncio.AbstractEventLoop, function: Callable[[], Awaitable[object]]
+) -> Callable[[int], float]:
+    async def run(loops: int) -> float:
+        start = time.perf_counter()
+        for _ in range(loops):
+            await function()
+        return time.perf_counter() - start
+
+    return lambda loops: loop.run_until_complete(run(loops))
+
+
+def encrypted_response(scenario: Scenario, url: str) -> tuple[bytes, dict[str, str]]:
+    content, headers = encrypt_response(
+        original_request_url=url,
+        original_response_headers={"Content-Type": "application/json"},
+        original_response_content=json.dumps({"code": 0, "data": scenario.data}),
+        response_timestamp_ms=TIMESTAMP_MS,
+        base_uri=BASE_URI,
+        tenant_id=TENANT_ID,
+        user_token=USER_TOKEN,
+    )
+    return (
+        content if isinstance(content, bytes) else content.encode("utf-8"),
+        dict(headers),
+    )
+
+
+def replay_transport(scenario: Scenario) -> httpx.MockTransport:
+    """Answer every request with the precomputed gateway response of a scenario."""
+    cache: dict[str, tuple[bytes, dict[str, str]]] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        if url not in cache:
+            cache[url] = encrypted_response(scenario, url)
+        content, headers = cache[url]
+        return httpx.Response(200, content=content, headers=headers)
+
+    return httpx.MockTransport(handler)
+
+
+def stages(
+    scenario: Scenario,
+    codec: JsonCodec,
+    loop: asyncio.AbstractEventLoop,
+    cleanup: contextlib.AsyncExitStack,
+) -> dict[str, Callable[[int], float]]:
+    """Return a runner per stage of a scenario, closing its clients on cleanup."""
+    runners: dict[str, Callable[[int], float]] = {}
+    request = httpx.Request(
+        scenario.method, f"{BASE_URI}{scenario.path[1:]}", params=scenario.params
+    )
+    url = str(request.url)
+    request_path = url.replace(BASE_URI, "/")
+    content_type = "application/json"
+    timestamp = str(TIMESTAMP_MS)
+    request_content = ""
+    if scenario.build is not None:
+        build = scenario.build
+        body = build()
+        values = to_json_dict(body)
+        request_content = codec.dumps(values).decode("utf-8")
+        runners["build"] = sync_runner(build)
+        runners["asdict"] = sync_runner(lambda: to_json_dict(body))
+        runners["dumps"] = sync_runner(lambda: codec.dumps(values))
+
+        def encrypt() -> str:
+            key, iv = request_key_and_iv(
+                request_path=request_path,
+                current_ts=timestamp,
+                tenant_id=TENANT_ID,
+                content_type=content_type,
+                user_token=USER_TOKEN,
+            )
+            return encrypt_aes_cbc_pkcs5_padding(request_content, key, iv)
+
+        runners["encrypt"] = sync_runner(encrypt)
+
+    runners["sign"] = sync_runner(
+        lambda: get_app_verification_string(
+            request_path=request_path,
+            current_ts=timestamp,
+            tenant_id=TENANT_ID,
+            content_type=content_type,
+            request_content=request_content,
+            user_token=USER_TOKEN,
+        )
+    )
+
+    encrypted, headers = encrypted_response(scenario, url)
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(
+            lambda _: httpx.Response(200, content=encrypted, headers=headers)
+        )
+    )
+    cleanup.push_async_callback(client.aclose)
+    runners["transport"] = async_runner(loop, lambda: client.send(request))
+
+    encrypted_text = encrypted.decode("utf-8")
+    runners["decrypt"] = sync_runner(
+        lambda: decrypt_response(
+            original_response_content=encrypted_text,
+            original_response_headers=dict(headers),
+            original_response_charset="utf-8",
+        )
+    )
+    plain, _ = decrypt_response(
+        original_response_content=encrypted_text,
+        original_response_headers=dict(headers),
+        original_response_charset="utf-8",
+    )
+    runners["parse"] = sync_runner(lambda: codec.loads(plain))
+    data = codec.loads(plain)["data"]
+    runners["decode"] = sync_runner(lambda: dacite.from_dict(scenario.out_type, data))
+
+    if scenario.call is not None:
+        call = scenario.call
+        api = SaicApi(
+            SaicApiConfiguration(
+                "user@example.com",
+                "password",
+                base_uri=BASE_URI,
+                tenant_id=TENANT_ID,
+                json_codec=codec,
+            ),
+            transport=replay_transport(scenario),
+        )
+        runners["end_to_end"] = async_runner(loop, lambda: call(api))
+    return runners
+
+
+def run(
+    scenarios: list[Scenario], codec: JsonCodec, *, repeat: int, min_time: float
+) -> dict[str, Any]:
+    loop = asyncio.new_event_loop()
+    results: dict[str, dict[str, Any]] = {}
+    try:
+        for scenario in scenarios:
+            results[scenario.name] = {}
+            cleanup = contextlib.AsyncExitStack()
+            try:
+                for stage, runner in stages(scenario, codec, loop, cleanup).items():
+                    timing = measure(runner, repeat=repeat, min_time=min_time)
+                    results[scenario.name][stage] = timing.to_json()
+                    print(
+                        f"{scenario.name:>20} {stage:>10}: "
+                        f"{timing.median_us:10.2f} us (min {timing.min_us:.2f})"
+                    )
+            finally:
+                loop.run_until_complete(cleanup.aclose())
+    finally:
+        loop.close()
+    return {
+        "meta": {
+            "date": datetime.datetime.now(datetime.UTC).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "codec": type(codec).__name__,
+            "repeat": repeat,
+            "min_time": min_time,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """Print the change of every stage against the baseline, return the regressions."""
+    regressions = []
+    for scenario, scenario_stages in current["results"].items():
+        for stage, timing in scenario_stages.items():
+            reference = baseline["results"].get(scenario, {}).get(stage)
+            if reference is None:
+                continue
+            ratio = timing["median_us"] / reference["median_us"]
+            flag = ""
+            if ratio > 1 + threshold:
+                flag = "  REGRESSION"
+                regressions.append(f"{scenario}.{stage}")
+            elif ratio < 1 - threshold:
+                flag = "  faster"
+            print(
+                f"{scenario:>20} {stage:>10}: {reference['median_us']:10.2f} -> "
+                f"{timing['median_us']:10.2f} us ({ratio - 1:+7.1%}){flag}"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=pathlib.Path, help="write the results here")
+    parser.add_argument(
+        "--compare", type=pathlib.Path, help="a previous result to compare against"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="relative slowdown of a median that counts as a regression",
+    )
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument(
+        "--min-time", type=float, default=0.05, help="seconds per repetition"
+    )
+    parser.add_argument(
+        "--orjson",
+        action="store_true",
+        help="use the orjson codec instead of the default standard library one",
+    )
+    parser.add_argument("--scenario", action="append", help="only run these scenarios")
+    args = parser.parse_args()
+
+    codec: JsonCodec = OrjsonJsonCodec() if args.orjson else default_json_codec()
+    baseline = None
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text())
+        if baseline["meta"].get("codec") != type(codec).__name__:
+            parser.error(
+                f"the baseline used {baseline['meta'].get('codec')}, "
+                f"this run would use {type(codec).__name__}"
+            )
+    scenarios = [
+        s for s in SCENARIOS if args.scenario is None or s.name in args.scenario
+    ]
+    results = run(scenarios, codec, repeat=args.repeat, min_time=args.min_time)
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+    if baseline is not None:
+        print()
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Measure the memory used by decoded status snapshots.
+
+Compares the slotted schema dataclasses against equivalent dataclasses that
+still carry a per-instance __dict__.
+
+Usage: python benchmarks/schema_memory.py [snapshots]
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields, is_dataclass, make_dataclass
+import functools
+import sys
+import tracemalloc
+from typing import Any, get_args, get_type_hints
+
+import dacite
+
+from saic_ismart_client_ng.api.vehicle import VehicleStatusResp
+from saic_ismart_client_ng.api.vehicle_charging import ChrgMgmtDataResp
+
+VEHICLE_STATUS = {
+    "basicVehicleStatus": {
+        "batteryVoltage": 142,
+        "canBusActive": 1,
+        "currentJourneyDistance": 40,
+        "currentJourneyId": 1237,
+        "engineStatus": 0,
+        "exteriorTemperature": 7,
+        "extendedData1": 79,
+        "frontLeftTyrePressure": 62,
+        "frontRightTyrePressure": 62,
+        "fuelRange": 3240,
+        "fuelRangeElec": 3240,
+        "interiorTemperature": 17,
+        "lockStatus": 1,
+        "mileage": 133690,
+        "rearLeftTyrePressure": 62,
+        "rearRightTyrePressure": 63,
+        "remoteClimateStatus": 2,
+        "timeOfLastCANBUSActivity": 1705953523,
+        "vehicleAlarmStatus": 2,
+    },
+    "gpsPosition": {
+        "gpsStatus": 2,
+        "timeStamp": 1705953524,
+        "wayPoint": {
+            "hdop": 7,
+            "heading": 0,
+            "position": {"altitude": 115, "latitude": 45485072, "longitude": 9160267},
+            "satellites": 10,
+            "speed": 0,
+        },
+    },
+    "statusTime": 1705953524,
+}
+
+CHARGING_DATA = {
+    "chrgMgmtData": {
+        "bmsChrgSts": 1,
+        "bmsPackVol": 1649,
+        "bmsPackCrnt": 19915,
+        "bmsPackSOCDsp": 786,
+        "bmsEstdElecRng": 358,
+        "imcuVehElecRng": 330,
+        "chrgngRmnngTime": 29,
+        "chrgngDoorPosSts": 1,
+        "bmsChrgCtrlDspCmd": 1,
+        "clstrElecRngToEPT": 330,
+        "bmsChrgOtptCrntReq": 107,
+        "ccuOnbdChrgrPlugOn": 4,
+        "disChrgngRmnngTime": 1023,
+        "bmsOnBdChrgTrgtSOCDspCmd": 7,
+    },
+    "rvsChargeStatus": {
+        "mileage": 133690,
+        "chargingGunState": 1,
+        "realtimePower": 81,
+        "totalBatteryCapacity": 640,
+        "powerUsageOfDay": 12,
+        "workingCurrent": 19915,
+        "workingVoltage": 1649,
+    },
+}
+
+
+@functools.cache
+def _with_dict(data_class: type[Any]) -> type[Any]:
+    """Build a copy of a schema dataclass that does not use __slots__."""
+    return make_dataclass(
+        data_class.__name__,
+        [(f.name, Any, None) for f in fields(data_class)],
+    )
+
+
+def _decode_with_dict(data_class: type[Any], data: dict[str, Any]) -> Any:
+    values = {}
+    for f in fields(data_class):
+        value = data.get(f.name)
+        if isinstance(value, dict):
+            nested_type = _nested_type(data_class, f.name)
+            value = _decode_with_dict(nested_type, value)
+        values[f.name] = value
+    return _with_dict(data_class)(**values)
+
+
+@functools.cache
+def _nested_type(data_class: type[Any], field_name: str) -> type[Any]:
+    hint = get_type_hints(data_class)[field_name]
+    return next(arg for arg in get_args(hint) if is_dataclass(arg))
+
+
+@dataclass
+class Measurement:
+    label: str
+    total_bytes: int
+    snapshots: int
+
+    @property
+    def bytes_per_snapshot(self) -> float:
+        return self.total_bytes / self.snapshots
+
+
+def measure(label: str, snapshots: int, *, slotted: bool) -> Measurement:
+    def decode(data_class: type[Any], data: dict[str, Any]) -> Any:
+        if slotted:
+            return dacite.from_dict(data_class, data)
+        return _decode_with_dict(data_class, data)
+
+    # Warm up the caches so that they do not count towards the snapshots
+    decode(VehicleStatusResp, VEHICLE_STATUS)
+    decode(ChrgMgmtDataResp, CHARGING_DATA)
+
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    history = [
+        (
+            decode(VehicleStatusResp, VEHICLE_STATUS),
+            decode(ChrgMgmtDataResp, CHARGING_DATA),
+        )
+        for _ in range(snapshots)
+    ]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del history
+    return Measurement(label, end - start, snapshots)
+
+
+def main() -> None:
+    snapshots = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    before = measure("with __dict__", snapshots, slotted=False)
+    after = measure("with __slots__", snapshots, slotted=True)
+    for result in (before, after):
+        print(f"{result.label:>16}: {result.bytes_per_snapshot:8.0f} bytes/snapshot")
+    saving = 1 - after.total_bytes / before.total_bytes
+    print(f"{'saving':>16}: {saving:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from dataclasses import asdict
 import datetime
 import logging
 from typing import (
@@ -16,22 +15,28 @@ import httpx
 import tenacity
 from tenacity import RetryCallState, retry_if_exception
 
+from saic_ismart_client_ng.api.lazy import lazy_view
 from saic_ismart_client_ng.api.schema import LoginResp
 from saic_ismart_client_ng.crypto_utils import sha1_hex_digest
 from saic_ismart_client_ng.exceptions import (
     SaicApiException,
     SaicApiRetryException,
     SaicLogoutException,
+    SaicUnsupportedOperationException,
 )
 from saic_ismart_client_ng.net.client import SaicApiClient
+from saic_ismart_client_ng.net.codec import to_json_dict
+from saic_ismart_client_ng.registry import VehicleRegistry
 
 if TYPE_CHECKING:
     from collections.abc import MutableMapping
 
     from httpx._types import HeaderTypes, QueryParamTypes
 
+    from saic_ismart_client_ng.capabilities import VehicleCapability
     from saic_ismart_client_ng.listener import SaicApiListener
     from saic_ismart_client_ng.model import SaicApiConfiguration
+    from saic_ismart_client_ng.registry import VehicleHandle
 
     class IsDataclass(Protocol):
         # as already noted in comments, checking for this attribute is currently
@@ -48,10 +53,15 @@ class AbstractSaicApi:
         self,
         configuration: SaicApiConfiguration,
         listener: SaicApiListener | None = None,
+        *,
+        transport: httpx.AsyncBaseTransport | None = None,
     ) -> None:
         self.__configuration = configuration
-        self.__api_client = SaicApiClient(configuration, listener=listener)
+        self.__api_client = SaicApiClient(
+            configuration, listener=listener, transport=transport
+        )
         self.__token_expiration: datetime.datetime | None = None
+        self.__vehicle_registry = VehicleRegistry()
 
     async def login(self) -> LoginResp:
         headers = {
@@ -190,15 +200,17 @@ class AbstractSaicApi:
     ) -> T | None:
         try:
             url = f"{self.__configuration.base_uri}{path.removeprefix('/')}"
-            json_body = asdict(body) if body else None
+            content = self.__serialize(body)
             req = httpx.Request(
                 method,
                 url,
                 params=params,
                 headers=headers,
                 data=form_body,
-                json=json_body,
+                content=content,
             )
+            if content is not None:
+                req.headers.setdefault("Content-Type", "application/json")
             response = await self.__api_client.send(req)
             return await self.__deserialize(req, response, out_type, allow_null_body)
         except SaicApiException as e:
@@ -207,6 +219,14 @@ class AbstractSaicApi:
             msg = f"API call {method} {path} failed unexpectedly"
             raise SaicApiException(msg, return_code=500) from e
 
+    def __serialize(self, body: Any | None) -> bytes | None:
+        if not body:
+            return None
+        # Bodies can be handed over already serialized, e.g. from the command catalog
+        if isinstance(body, bytes):
+            return body
+        return self.__configuration.json_codec.dumps(to_json_dict(body))
+
     async def execute_api_call_with_event_id(
         self,
         method: str,
@@ -292,10 +312,10 @@ class AbstractSaicApi:
     ) -> T | None:
         try:
             request_event_id = request.headers.get("event-id")
-            json_data = response.json()
+            json_data = self.__configuration.json_codec.loads(response.content)
             return_code = json_data.get("code", -1)
             error_message = json_data.get("message", "Unknown error")
-            logger.debug("Response code: %s %s", return_code, response.text)
+            _log_response_debug(return_code, response)
 
             if return_code in (401, 403) or response.status_code in (401, 403):
                 self.logout()
@@ -343,7 +363,7 @@ class AbstractSaicApi:
             if data_class is None:
                 return None
             if "data" in json_data:
-                return dacite.from_dict(data_class, json_data["data"])
+                return self.__decode_data(data_class, json_data["data"])
             if allow_null_body:
                 return None
             msg = (
@@ -374,6 +394,11 @@ class AbstractSaicApi:
             msg = f"Failed to deserialize response: {e}. Original json was {response.text}"
             raise SaicApiException(msg) from e
 
+    def __decode_data(self, data_class: type[T], data: Any) -> T:
+        if self.__configuration.lazy_decode and isinstance(data, dict):
+            return lazy_view(data_class, data)
+        return dacite.from_dict(data_class, data)
+
     def logout(self) -> None:
         self.__api_client.user_token = ""
         self.__token_expiration = None
@@ -390,6 +415,31 @@ class AbstractSaicApi:
     def token_expiration(self) -> datetime.datetime | None:
         return self.__token_expiration
 
+    @property
+    def configuration(self) -> SaicApiConfiguration:
+        return self.__configuration
+
+    @property
+    def vehicle_registry(self) -> VehicleRegistry:
+        return self.__vehicle_registry
+
+    def hash_vin(self, vin: str | VehicleHandle) -> str:
+        return self.__vehicle_registry.resolve(vin).vin_hash
+
+    def ensure_supported(
+        self, vin: str | VehicleHandle, capability: VehicleCapability
+    ) -> None:
+        capabilities = self.__vehicle_registry.resolve(vin).capabilities
+        if capabilities is not None and capabilities.supports(capability) is False:
+            msg = f"Vehicle does not support {capability.name}"
+            raise SaicUnsupportedOperationException(msg)
+
+
+def _log_response_debug(return_code: int, response: httpx.Response) -> None:
+    # Decoding the body as text is only worth it when it is going to be logged
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Response code: %s %s", return_code, response.text)
+
 
 def saic_api_after_retry(retry_state: RetryCallState) -> None:
     if not retry_state.outcome:
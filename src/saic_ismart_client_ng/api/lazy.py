@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import MISSING, Field, fields, is_dataclass
+import types
+from typing import Any, TypeVar, Union, cast, get_args, get_origin, get_type_hints
+
+T = TypeVar("T")
+
+Converter = Callable[[Any], Any]
+
+_VIEW_TYPES: dict[type[Any], type[Any]] = {}
+
+
+class _LazyField:
+    """Converts a single field of the underlying JSON object on first access.
+
+    The converted value is cached in the slot the dataclass reserved for the
+    field, so later reads cost the same as on a fully decoded instance.
+    """
+
+    __slots__ = ("__convert", "__default", "__name", "__slot")
+
+    def __init__(
+        self, dataclass_field: Field[Any], slot: Any, convert: Converter
+    ) -> None:
+        self.__name = dataclass_field.name
+        self.__slot = slot
+        self.__convert = convert
+        self.__default = dataclass_field
+
+    def __get__(self, instance: Any, owner: type | None = None) -> Any:
+        if instance is None:
+            return self
+        try:
+            return self.__slot.__get__(instance, owner)
+        except AttributeError:
+            raw_value = instance._lazy_data.get(self.__name)  # noqa: SLF001
+            value = (
+                self.__convert(raw_value)
+                if raw_value is not None
+                else _default_value(self.__default)
+            )
+            self.__slot.__set__(instance, value)
+            return value
+
+    def __set__(self, instance: Any, value: Any) -> None:
+        self.__slot.__set__(instance, value)
+
+
+def _default_value(dataclass_field: Field[Any]) -> Any:
+    if dataclass_field.default is not MISSING:
+        return dataclass_field.default
+    if dataclass_field.default_factory is not MISSING:
+        return dataclass_field.default_factory()
+    return None
+
+
+def _converter_for(hint: Any) -> Converter | None:
+    origin = get_origin(hint)
+    if origin in (Union, types.UnionType):
+        converters = [
+            converter
+            for arg in get_args(hint)
+            if (converter := _converter_for(arg)) is not None
+        ]
+        return converters[0] if len(converters) == 1 else None
+    if origin is list:
+        (item_hint,) = get_args(hint)
+        item_converter = _converter_for(item_hint)
+        if item_converter is None:
+            return None
+        return lambda values: [item_converter(value) for value in values]
+    if isinstance(hint, type) and is_dataclass(hint):
+        view_type = _lazy_view_type(hint)
+        return lambda value: view_type(value) if isinstance(value, dict) else value
+    return None
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+class LazyView:
+    """Marker base class of the lazy views built by lazy_view_type."""
+
+    __slots__ = ()
+    _lazy_data_class: type[Any]
+
+
+def _init_view(self: Any, data: dict[str, Any]) -> None:
+    self._lazy_data = data  # pylint: disable=protected-access
+
+
+def lazy_view_type(data_class: type[T]) -> type[T]:
+    """Build a lazy subclass of a slotted schema dataclass.
+
+    Instances wrap the parsed JSON object and only convert the fields that are
+    actually read. They are real instances of the dataclass, so properties and
+    isinstance checks keep working.
+    """
+    return cast("type[T]", _lazy_view_type(data_class))
+
+
+def _lazy_view_type(data_class: type[Any]) -> type[Any]:
+    if (view_type := _VIEW_TYPES.get(data_class)) is not None:
+        return view_type
+    if not is_dataclass(data_class) or "__slots__" not in data_class.__dict__:
+        msg = f"{data_class.__name__} is not a slotted dataclass"
+        raise TypeError(msg)
+    hints = get_type_hints(data_class)
+    namespace: dict[str, Any] = {
+        "__slots__": ("_lazy_data",),
+        "__init__": _init_view,
+        "_lazy_data_class": data_class,
+    }
+    for dataclass_field in fields(data_class):
+        namespace[dataclass_field.name] = _LazyField(
+            dataclass_field,
+            data_class.__dict__[dataclass_field.name],
+            _converter_for(hints[dataclass_field.name]) or _identity,
+        )
+    view_type = type(f"Lazy{data_class.__name__}", (data_class, LazyView), namespace)
+    view_type.__qualname__ = f"Lazy{data_class.__qualname__}"
+    _VIEW_TYPES[data_class] = view_type
+    return view_type
+
+
+def lazy_view(data_class: type[T], data: dict[str, Any]) -> T:
+    """Wrap a parsed JSON object in a lazily decoded instance of data_class."""
+    return cast("T", _lazy_view_type(data_class)(data))
+
+
+def materialize(value: T) -> T:
+    """Convert a lazy view, and any nested views, into a plain dataclass instance.
+
+    Values that are not lazy views are returned unchanged.
+    """
+    if isinstance(value, list):
+        return cast("T", [materialize(item) for item in value])
+    if not isinstance(value, LazyView):
+        return value
+    data_class = value._lazy_data_class  # pylint: disable=protected-access # noqa: SLF001
+    return cast(
+        "T",
+        data_class(
+            **{
+                dataclass_field.name: materialize(getattr(value, dataclass_field.name))
+                for dataclass_field in fields(data_class)
+            }
+        ),
+    )
@@ -1,14 +1,29 @@
 from __future__ import annotations
 
+import asyncio
+from collections import deque
+from typing import TYPE_CHECKING
+
 from saic_ismart_client_ng.api.base import AbstractSaicApi
+from saic_ismart_client_ng.api.message.bulk import (
+    GROUP_DELETE_ACTIONS,
+    MessageFilter,
+    MessageOperationResult,
+    run_bounded,
+)
 from saic_ismart_client_ng.api.message.schema import (
     MessageEntity,
     MessageResp,
     UpateMessageRequest,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, Iterable
+
 __all__ = [
     "MessageEntity",
+    "MessageFilter",
+    "MessageOperationResult",
     "MessageResp",
     "UpateMessageRequest",
 ]
@@ -50,6 +65,57 @@ class SaicMessageApi(AbstractSaicApi):
             out_type=MessageResp,
         )
 
+    async def iter_messages(
+        self, message_group: str, *, page_size: int = 20, prefetch: int = 2
+    ) -> AsyncGenerator[MessageEntity, None]:
+        """Iterate over all the messages of a group, newest first.
+
+        Up to `prefetch` pages are requested ahead of the one being consumed, so
+        at most `prefetch + 1` pages are held in memory at any time.
+        """
+        if page_size <= 0 or prefetch < 0:
+            msg = "page_size must be positive and prefetch must not be negative"
+            raise ValueError(msg)
+
+        page = await self.get_message_list(
+            page_num=1, page_size=page_size, message_group=message_group
+        )
+        last_page = _last_page_number(page, page_size)
+        next_page_num = 2
+        pending: deque[asyncio.Task[MessageResp | None]] = deque()
+
+        def schedule(limit: int) -> None:
+            nonlocal next_page_num
+            while len(pending) < limit and (
+                last_page is None or next_page_num <= last_page
+            ):
+                pending.append(
+                    asyncio.create_task(
+                        self.get_message_list(
+                            page_num=next_page_num,
+                            page_size=page_size,
+                            message_group=message_group,
+                        )
+                    )
+                )
+                next_page_num += 1
+
+        try:
+            while page is not None and page.messages:
+                schedule(prefetch)
+                for message in page.messages:
+                    yield message
+                if len(page.messages) < page_size:
+                    break
+                schedule(1)
+                if not pending:
+                    break
+                page = await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
     async def delete_all_alarms(self) -> None:
         await self.__change_message_status(action="DELETE_ALARM")
 
@@ -65,6 +131,47 @@ class SaicMessageApi(AbstractSaicApi):
     async def delete_message(self, *, message_id: str | int) -> None:
         await self.__change_message_status(message_id=message_id, action="DELETE")
 
+    async def read_messages(
+        self, message_ids: Iterable[str | int], *, concurrency: int = 8
+    ) -> list[MessageOperationResult]:
+        return await run_bounded(
+            "READ",
+            message_ids,
+            lambda message_id: self.read_message(message_id=message_id),
+            concurrency=concurrency,
+        )
+
+    async def delete_messages(
+        self,
+        messages: MessageFilter | Iterable[str | int],
+        *,
+        concurrency: int = 8,
+    ) -> list[MessageOperationResult]:
+        """Delete the given messages, or all the messages matching a filter.
+
+        A filter covering a whole group is applied with a single group level
+        action. Otherwise the matching messages are collected before deleting
+        them, so that deletions do not shift the pages being read.
+        """
+        if isinstance(messages, MessageFilter):
+            group_action = GROUP_DELETE_ACTIONS.get(messages.message_group)
+            if messages.covers_whole_group and group_action is not None:
+                await self.__change_message_status(action=group_action)
+                return [MessageOperationResult(group_action)]
+            message_ids = [
+                message.messageId
+                async for message in self.iter_messages(messages.message_group)
+                if message.messageId is not None and messages.matches(message)
+            ]
+        else:
+            message_ids = list(messages)
+        return await run_bounded(
+            "DELETE",
+            message_ids,
+            lambda message_id: self.delete_message(message_id=message_id),
+            concurrency=concurrency,
+        )
+
     async def __change_message_status(
         self, *, action: str, message_id: str | int | None = None
     ) -> None:
@@ -85,3 +192,12 @@ class SaicMessageApi(AbstractSaicApi):
         return await self.execute_api_call_with_optional_result(
             "GET", "/message/unreadCount", out_type=MessageResp
         )
+
+
+def _last_page_number(page: MessageResp | None, page_size: int) -> int | None:
+    if page is None:
+        return None
+    total = page.totalNumber if page.totalNumber is not None else page.recordsNumber
+    if total is None:
+        return None
+    return -(-total // page_size)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from saic_ismart_client_ng.exceptions import SaicApiException, SaicLogoutException
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterable
+
+    from saic_ismart_client_ng.api.message.schema import MessageEntity
+
+GROUP_DELETE_ACTIONS = {
+    "ALARM": "DELETE_ALARM",
+    "COMMAND": "DELETE_COMMAND",
+    "NEWS": "DELETE_NEWS",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class MessageFilter:
+    """Selects the messages of a group, optionally narrowed down by a predicate.
+
+    A filter without predicate covers the whole group.
+    """
+
+    message_group: str
+    predicate: Callable[[MessageEntity], bool] | None = None
+
+    @property
+    def covers_whole_group(self) -> bool:
+        return self.predicate is None
+
+    def matches(self, message: MessageEntity) -> bool:
+        return self.predicate is None or self.predicate(message)
+
+
+@dataclass(frozen=True, slots=True)
+class MessageOperationResult:
+    """The outcome of a bulk operation on one message.
+
+    Group level actions have no message id.
+    """
+
+    action: str
+    message_id: str | int | None = None
+    error: SaicApiException | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+async def run_bounded(
+    action: str,
+    message_ids: Iterable[str | int],
+    operation: Callable[[str | int], Awaitable[None]],
+    *,
+    concurrency: int,
+) -> list[MessageOperationResult]:
+    """Apply an operation to each message with at most `concurrency` calls in flight.
+
+    Failures are reported per message, except for a logout which aborts the run.
+    """
+    if concurrency <= 0:
+        msg = "concurrency must be positive"
+        raise ValueError(msg)
+
+    ids = list(message_ids)
+    results: list[MessageOperationResult | None] = [None] * len(ids)
+    queue = iter(enumerate(ids))
+
+    async def worker() -> None:
+        for index, message_id in queue:
+            try:
+                await operation(message_id)
+            except SaicLogoutException:
+                raise
+            except SaicApiException as e:
+                results[index] = MessageOperationResult(action, message_id, e)
+            else:
+                results[index] = MessageOperationResult(action, message_id)
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, len(ids)))]
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+    return [result for result in results if result is not None]
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 import datetime
+import functools
 import logging
 from typing import Any
 
@@ -15,7 +16,27 @@ MESSAGE_DATE_TIME_FORMATS = [
 ]
 
 
-@dataclass
+def parse_message_time(message_time: str) -> datetime.datetime | None:
+    parsed = _parse_message_time(message_time)
+    if parsed is None:
+        LOGGER.error(
+            "Could not parse messageTime '%s'. This is a bug. Please file a ticket",
+            message_time,
+        )
+    return parsed
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_message_time(message_time: str) -> datetime.datetime | None:
+    for date_format in MESSAGE_DATE_TIME_FORMATS:
+        try:
+            return datetime.datetime.strptime(message_time, date_format)
+        except ValueError:
+            pass
+    return None
+
+
+@dataclass(slots=True)
 class MessageEntity:
     content: str | None = None
     contentId: str | None = None
@@ -33,15 +54,9 @@ class MessageEntity:
     @property
     def message_time(self) -> datetime.datetime:
         if self.messageTime:
-            for date_format in MESSAGE_DATE_TIME_FORMATS:
-                try:
-                    return datetime.datetime.strptime(self.messageTime, date_format)
-                except ValueError:
-                    pass
-            LOGGER.error(
-                "Could not parse messageTime '%s'. This is a bug. Please file a ticket",
-                self.messageTime,
-            )
+            parsed = parse_message_time(self.messageTime)
+            if parsed is not None:
+                return parsed
         return datetime.datetime.now()
 
     @property
@@ -60,7 +75,7 @@ class MessageEntity:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class MessageResp:
     alarmNumber: int | None = None
     commandNumber: int | None = None
@@ -71,7 +86,7 @@ class MessageResp:
     totalNumber: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class UpateMessageRequest:
     actionType: str | None = None
     deviceId: str | None = None
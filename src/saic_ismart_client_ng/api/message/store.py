@@ -0,0 +1,422 @@
+from __future__ import annotations
+
+from array import array
+import bisect
+from dataclasses import dataclass
+import json
+import re
+import sqlite3
+import sys
+from typing import TYPE_CHECKING, Any, Protocol
+
+from saic_ismart_client_ng.api.message.schema import MessageEntity
+from saic_ismart_client_ng.api.message.sync import message_create_time
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    import datetime
+    import os
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str | None) -> set[str]:
+    if not text:
+        return set()
+    return {sys.intern(token) for token in _TOKEN_PATTERN.findall(text.casefold())}
+
+
+def _message_tokens(message: MessageEntity) -> set[str]:
+    return tokenize(message.title) | tokenize(message.content)
+
+
+def _intern(value: str | None) -> str | None:
+    return sys.intern(value) if value is not None else None
+
+
+def _to_millis(value: datetime.datetime | None) -> int | None:
+    return int(value.timestamp() * 1000) if value is not None else None
+
+
+@dataclass(frozen=True, slots=True)
+class MessageQuery:
+    """Filters applied by a message store, all of them optional and combined."""
+
+    vin: str | None = None
+    message_type: str | None = None
+    read_status: int | None = None
+    since: datetime.datetime | None = None
+    until: datetime.datetime | None = None
+    text: str | None = None
+    limit: int | None = None
+    newest_first: bool = True
+
+
+class MessageStore(Protocol):
+    def add(self, message: MessageEntity) -> None: ...
+
+    def add_all(self, messages: Iterable[MessageEntity]) -> None: ...
+
+    def get(self, message_id: str | int) -> MessageEntity | None: ...
+
+    def remove(self, message_id: str | int) -> bool: ...
+
+    def query(self, query: MessageQuery) -> list[MessageEntity]: ...
+
+    def __len__(self) -> int: ...
+
+
+class InMemoryMessageStore:
+    """Keeps messages in columns indexed by VIN, type, read status, time and tokens.
+
+    Messages are keyed by their id, adding a message with a known id replaces it.
+    Removed rows are left empty and their index entries are dropped.
+    """
+
+    def __init__(self, messages: Iterable[MessageEntity] = ()) -> None:
+        self.__rows: dict[str, int] = {}
+        self.__create_times = array("q")
+        self.__message_ids: list[str | int | None] = []
+        self.__vins: list[str | None] = []
+        self.__message_types: list[str | None] = []
+        self.__read_statuses: list[int | None] = []
+        self.__senders: list[str | None] = []
+        self.__titles: list[str | None] = []
+        self.__contents: list[str | None] = []
+        self.__message_times: list[str | None] = []
+        self.__content_ids: list[str | None] = []
+        self.__extras: list[tuple[list[Any], bool | None]] = []
+
+        self.__by_vin: dict[str | None, set[int]] = {}
+        self.__by_type: dict[str | None, set[int]] = {}
+        self.__by_read_status: dict[int | None, set[int]] = {}
+        self.__by_token: dict[str, set[int]] = {}
+        # (create time, row) pairs, kept sorted
+        self.__by_time: list[tuple[int, int]] = []
+
+        self.add_all(messages)
+
+    def add(self, message: MessageEntity) -> None:
+        key = str(message.messageId)
+        row = self.__rows.get(key)
+        if row is not None:
+            self.__unindex(row)
+        else:
+            row = len(self.__create_times)
+            self.__rows[key] = row
+            self.__create_times.append(0)
+            for column in self.__columns():
+                column.append(None)
+            self.__extras.append(([], None))
+
+        create_time = message_create_time(message)
+        self.__create_times[row] = create_time
+        self.__message_ids[row] = message.messageId
+        self.__vins[row] = _intern(message.vin)
+        self.__message_types[row] = _intern(message.messageType)
+        self.__read_statuses[row] = message.readStatus
+        self.__senders[row] = _intern(message.sender)
+        self.__titles[row] = message.title
+        self.__contents[row] = message.content
+        self.__message_times[row] = message.messageTime
+        self.__content_ids[row] = message.contentId
+        self.__extras[row] = (message.contentIdList, message.showCheckButton)
+
+        self.__by_vin.setdefault(self.__vins[row], set()).add(row)
+        self.__by_type.setdefault(self.__message_types[row], set()).add(row)
+        self.__by_read_status.setdefault(message.readStatus, set()).add(row)
+        for token in _message_tokens(message):
+            self.__by_token.setdefault(token, set()).add(row)
+        bisect.insort(self.__by_time, (create_time, row))
+
+    def add_all(self, messages: Iterable[MessageEntity]) -> None:
+        for message in messages:
+            self.add(message)
+
+    def get(self, message_id: str | int) -> MessageEntity | None:
+        row = self.__rows.get(str(message_id))
+        return self.__entity(row) if row is not None else None
+
+    def remove(self, message_id: str | int) -> bool:
+        row = self.__rows.pop(str(message_id), None)
+        if row is None:
+            return False
+        self.__unindex(row)
+        for column in self.__columns():
+            column[row] = None
+        self.__extras[row] = ([], None)
+        return True
+
+    def query(self, query: MessageQuery) -> list[MessageEntity]:
+        candidates = self.__candidates(query)
+        start = _to_millis(query.since)
+        end = _to_millis(query.until)
+        lo = 0 if start is None else bisect.bisect_left(self.__by_time, (start, -1))
+        hi = (
+            len(self.__by_time)
+            if end is None
+            else bisect.bisect_right(self.__by_time, (end, sys.maxsize))
+        )
+        if candidates is not None and len(candidates) < hi - lo:
+            # Fewer index matches than messages in the time range, sort the matches
+            times = self.__create_times
+            in_range = [
+                (times[row], row)
+                for row in candidates
+                if (start is None or times[row] >= start)
+                and (end is None or times[row] <= end)
+            ]
+            in_range.sort(reverse=query.newest_first)
+        else:
+            in_range = self.__by_time[lo:hi]
+            if query.newest_first:
+                in_range.reverse()
+            if candidates is not None:
+                in_range = [entry for entry in in_range if entry[1] in candidates]
+
+        if query.limit is not None:
+            in_range = in_range[: query.limit]
+        return [self.__entity(row) for _, row in in_range]
+
+    def __len__(self) -> int:
+        return len(self.__rows)
+
+    def __iter__(self) -> Iterator[MessageEntity]:
+        for _, row in reversed(self.__by_time):
+            yield self.__entity(row)
+
+    def __candidates(self, query: MessageQuery) -> set[int] | None:
+        """Intersect the index entries matching the query, smallest first."""
+        matches: list[set[int]] = []
+        if query.vin is not None:
+            matches.append(self.__by_vin.get(query.vin, set()))
+        if query.message_type is not None:
+            matches.append(self.__by_type.get(query.message_type, set()))
+        if query.read_status is not None:
+            matches.append(self.__by_read_status.get(query.read_status, set()))
+        if query.text is not None:
+            matches.extend(
+                self.__by_token.get(token, set()) for token in tokenize(query.text)
+            )
+        if not matches:
+            return None
+        matches.sort(key=len)
+        return matches[0].intersection(*matches[1:])
+
+    def __columns(self) -> tuple[list[Any], ...]:
+        return (
+            self.__message_ids,
+            self.__vins,
+            self.__message_types,
+            self.__read_statuses,
+            self.__senders,
+            self.__titles,
+            self.__contents,
+            self.__message_times,
+            self.__content_ids,
+        )
+
+    def __unindex(self, row: int) -> None:
+        _discard(self.__by_vin, self.__vins[row], row)
+        _discard(self.__by_type, self.__message_types[row], row)
+        _discard(self.__by_read_status, self.__read_statuses[row], row)
+        for token in tokenize(self.__titles[row]) | tokenize(self.__contents[row]):
+            _discard(self.__by_token, token, row)
+        time_key = (self.__create_times[row], row)
+        index = bisect.bisect_left(self.__by_time, time_key)
+        if index < len(self.__by_time) and self.__by_time[index] == time_key:
+            del self.__by_time[index]
+
+    def __entity(self, row: int) -> MessageEntity:
+        content_id_list, show_check_button = self.__extras[row]
+        return MessageEntity(
+            content=self.__contents[row],
+            contentId=self.__content_ids[row],
+            contentIdList=content_id_list,
+            createTime=self.__create_times[row],
+            messageId=self.__message_ids[row],
+            messageTime=self.__message_times[row],
+            messageType=self.__message_types[row],
+            readStatus=self.__read_statuses[row],
+            sender=self.__senders[row],
+            showCheckButton=show_check_button,
+            title=self.__titles[row],
+            vin=self.__vins[row],
+        )
+
+
+def _discard(index: dict[Any, set[int]], key: Any, row: int) -> None:
+    rows = index.get(key)
+    if rows is not None:
+        rows.discard(row)
+        if not rows:
+            del index[key]
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    message_key TEXT PRIMARY KEY,
+    message_id TEXT,
+    create_time INTEGER NOT NULL,
+    vin TEXT,
+    message_type TEXT,
+    read_status INTEGER,
+    sender TEXT,
+    title TEXT,
+    content TEXT,
+    message_time TEXT,
+    content_id TEXT,
+    extras TEXT
+);
+CREATE INDEX IF NOT EXISTS messages_vin ON messages (vin, create_time);
+CREATE INDEX IF NOT EXISTS messages_type ON messages (message_type, create_time);
+CREATE INDEX IF NOT EXISTS messages_read_status
+    ON messages (read_status, create_time);
+CREATE INDEX IF NOT EXISTS messages_time ON messages (create_time);
+CREATE TABLE IF NOT EXISTS message_tokens (
+    token TEXT NOT NULL,
+    message_key TEXT NOT NULL,
+    PRIMARY KEY (token, message_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS message_tokens_key ON message_tokens (message_key);
+"""
+
+
+class SqliteMessageStore:
+    """A message store persisted in SQLite, with the same indexes as the in-memory one."""
+
+    def __init__(self, path: str | os.PathLike[str] = ":memory:") -> None:
+        self.__connection = sqlite3.connect(path)
+        self.__connection.executescript(_SQLITE_SCHEMA)
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    def add(self, message: MessageEntity) -> None:
+        self.add_all([message])
+
+    def add_all(self, messages: Iterable[MessageEntity]) -> None:
+        with self.__connection:
+            for message in messages:
+                key = str(message.messageId)
+                self.__connection.execute(
+                    "DELETE FROM message_tokens WHERE message_key = ?", (key,)
+                )
+                self.__connection.execute(
+                    "INSERT OR REPLACE INTO messages VALUES "
+                    "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        json.dumps(message.messageId),
+                        message_create_time(message),
+                        message.vin,
+                        message.messageType,
+                        message.readStatus,
+                        message.sender,
+                        message.title,
+                        message.content,
+                        message.messageTime,
+                        message.contentId,
+                        json.dumps([message.contentIdList, message.showCheckButton]),
+                    ),
+                )
+                self.__connection.executemany(
+                    "INSERT INTO message_tokens VALUES (?, ?)",
+                    ((token, key) for token in _message_tokens(message)),
+                )
+
+    def get(self, message_id: str | int) -> MessageEntity | None:
+        row = self.__connection.execute(
+            f"SELECT {_SQLITE_COLUMNS} FROM messages WHERE message_key = ?",  # noqa: S608
+            (str(message_id),),
+        ).fetchone()
+        return _entity_from_row(row) if row is not None else None
+
+    def remove(self, message_id: str | int) -> bool:
+        key = str(message_id)
+        with self.__connection:
+            self.__connection.execute(
+                "DELETE FROM message_tokens WHERE message_key = ?", (key,)
+            )
+            cursor = self.__connection.execute(
+                "DELETE FROM messages WHERE message_key = ?", (key,)
+            )
+        return cursor.rowcount > 0
+
+    def query(self, query: MessageQuery) -> list[MessageEntity]:
+        conditions: list[str] = []
+        params: list[Any] = []
+        for column, value in (
+            ("vin", query.vin),
+            ("message_type", query.message_type),
+            ("read_status", query.read_status),
+        ):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if query.since is not None:
+            conditions.append("create_time >= ?")
+            params.append(_to_millis(query.since))
+        if query.until is not None:
+            conditions.append("create_time <= ?")
+            params.append(_to_millis(query.until))
+        for token in tokenize(query.text):
+            conditions.append(
+                "message_key IN "
+                "(SELECT message_key FROM message_tokens WHERE token = ?)"
+            )
+            params.append(token)
+
+        sql = f"SELECT {_SQLITE_COLUMNS} FROM messages"  # noqa: S608
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += (
+            " ORDER BY create_time DESC"
+            if query.newest_first
+            else " ORDER BY create_time"
+        )
+        if query.limit is not None:
+            sql += " LIMIT ?"
+            params.append(query.limit)
+        return [_entity_from_row(row) for row in self.__connection.execute(sql, params)]
+
+    def __len__(self) -> int:
+        (count,) = self.__connection.execute("SELECT COUNT(*) FROM messages").fetchone()
+        return int(count)
+
+
+_SQLITE_COLUMNS = (
+    "message_id, create_time, vin, message_type, read_status, sender, "
+    "title, content, message_time, content_id, extras"
+)
+
+
+def _entity_from_row(row: tuple[Any, ...]) -> MessageEntity:
+    (
+        message_id,
+        create_time,
+        vin,
+        message_type,
+        read_status,
+        sender,
+        title,
+        content,
+        message_time,
+        content_id,
+        extras,
+    ) = row
+    content_id_list, show_check_button = json.loads(extras)
+    return MessageEntity(
+        content=content,
+        contentId=content_id,
+        contentIdList=content_id_list,
+        createTime=create_time,
+        messageId=json.loads(message_id),
+        messageTime=message_time,
+        messageType=_intern(message_type),
+        readStatus=read_status,
+        sender=_intern(sender),
+        showCheckButton=show_check_button,
+        title=title,
+        vin=_intern(vin),
+    )
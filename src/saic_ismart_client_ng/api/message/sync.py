@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import json
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    import os
+
+    from saic_ismart_client_ng.api.message import SaicMessageApi
+    from saic_ismart_client_ng.api.message.schema import MessageEntity, MessageResp
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_GROUPS = ("ALARM", "COMMAND", "NEWS")
+
+
+@dataclass(frozen=True, slots=True)
+class MessageCursor:
+    """The newest message seen so far in a message group.
+
+    Several messages can share the same createTime, so the ids of all the
+    messages seen at that time are kept as well.
+    """
+
+    create_time: int
+    message_ids: frozenset[str] = field(default_factory=frozenset)
+
+    def is_newer(self, message: MessageEntity) -> bool:
+        create_time = message_create_time(message)
+        if create_time != self.create_time:
+            return create_time > self.create_time
+        return str(message.messageId) not in self.message_ids
+
+    def advance(self, messages: Iterable[MessageEntity]) -> MessageCursor:
+        cursor = self
+        for message in messages:
+            create_time = message_create_time(message)
+            if create_time > cursor.create_time:
+                cursor = MessageCursor(create_time, frozenset([str(message.messageId)]))
+            elif create_time == cursor.create_time:
+                cursor = MessageCursor(
+                    create_time, cursor.message_ids | {str(message.messageId)}
+                )
+        return cursor
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "createTime": self.create_time,
+            "messageIds": sorted(self.message_ids),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> MessageCursor:
+        return cls(
+            create_time=int(data["createTime"]),
+            message_ids=frozenset(str(i) for i in data.get("messageIds", [])),
+        )
+
+
+_EMPTY_CURSOR = MessageCursor(create_time=-1)
+
+
+def message_create_time(message: MessageEntity) -> int:
+    """Return the creation time of a message in milliseconds."""
+    if message.createTime is not None:
+        return message.createTime
+    return int(message.message_time.timestamp() * 1000)
+
+
+class MessageCursorStore(Protocol):
+    async def load(self, account: str, message_group: str) -> MessageCursor | None: ...
+
+    async def save(
+        self, account: str, message_group: str, cursor: MessageCursor
+    ) -> None: ...
+
+
+class InMemoryMessageCursorStore:
+    def __init__(self) -> None:
+        self.__cursors: dict[tuple[str, str], MessageCursor] = {}
+
+    async def load(self, account: str, message_group: str) -> MessageCursor | None:
+        return self.__cursors.get((account, message_group))
+
+    async def save(
+        self, account: str, message_group: str, cursor: MessageCursor
+    ) -> None:
+        self.__cursors[(account, message_group)] = cursor
+
+
+class JsonFileMessageCursorStore:
+    """Persists the cursors of all accounts and groups in a single JSON file.
+
+    The file is rewritten atomically on every save.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self.__path = Path(path)
+        self.__cursors: dict[str, dict[str, MessageCursor]] | None = None
+        self.__lock = asyncio.Lock()
+
+    async def load(self, account: str, message_group: str) -> MessageCursor | None:
+        async with self.__lock:
+            cursors = await self.__load_all()
+        return cursors.get(account, {}).get(message_group)
+
+    async def save(
+        self, account: str, message_group: str, cursor: MessageCursor
+    ) -> None:
+        async with self.__lock:
+            cursors = await self.__load_all()
+            cursors.setdefault(account, {})[message_group] = cursor
+            data = {
+                account: {group: c.to_dict() for group, c in groups.items()}
+                for account, groups in cursors.items()
+            }
+            await asyncio.to_thread(self.__write, data)
+
+    async def __load_all(self) -> dict[str, dict[str, MessageCursor]]:
+        if self.__cursors is None:
+            self.__cursors = await asyncio.to_thread(self.__read)
+        return self.__cursors
+
+    def __read(self) -> dict[str, dict[str, MessageCursor]]:
+        try:
+            data = json.loads(self.__path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            logger.warning("Ignoring corrupted message cursor file %s", self.__path)
+            return {}
+        return {
+            account: {
+                group: MessageCursor.from_dict(cursor)
+                for group, cursor in groups.items()
+            }
+            for account, groups in data.items()
+        }
+
+    def __write(self, data: dict[str, Any]) -> None:
+        tmp_path = self.__path.with_name(self.__path.name + ".tmp")
+        tmp_path.write_text(json.dumps(data), encoding="utf-8")
+        tmp_path.replace(self.__path)
+
+
+class MessageSync:
+    """Fetches only the messages that were not seen by a previous sync.
+
+    Messages are paged newest first and paging stops at the first message that
+    is not newer than the stored cursor. When a cursor exists, the cheap
+    unread-count endpoint is probed first and groups without unread messages
+    are not fetched at all, so messages read in the app in the meantime are only
+    picked up by the next sync that finds unread messages, or a forced one.
+    """
+
+    def __init__(
+        self,
+        api: SaicMessageApi,
+        store: MessageCursorStore | None = None,
+        *,
+        page_size: int = 20,
+        prefetch: int = 0,
+    ) -> None:
+        self.__api = api
+        self.__store = store or InMemoryMessageCursorStore()
+        self.__page_size = page_size
+        self.__prefetch = prefetch
+        self.__lock = asyncio.Lock()
+
+    @property
+    def account(self) -> str:
+        return self.__api.configuration.username
+
+    async def sync(
+        self, message_group: str, *, force: bool = False
+    ) -> list[MessageEntity]:
+        """Return the new messages of a group, oldest first."""
+        async with self.__lock:
+            unread = None if force else await self.__api.get_unread_messages_count()
+            return await self.__sync_group(message_group, unread)
+
+    async def sync_all(
+        self,
+        message_groups: Iterable[str] = MESSAGE_GROUPS,
+        *,
+        force: bool = False,
+    ) -> dict[str, list[MessageEntity]]:
+        """Return the new messages of each group, probing the unread count once."""
+        async with self.__lock:
+            unread = None if force else await self.__api.get_unread_messages_count()
+            return {
+                group: await self.__sync_group(group, unread)
+                for group in message_groups
+            }
+
+    async def prime(self, message_groups: Iterable[str] = MESSAGE_GROUPS) -> None:
+        """Start the groups without a cursor at their newest message.
+
+        The messages already in these groups are then never returned by a sync,
+        only the ones received afterwards. Groups with a cursor are left as is.
+        """
+        async with self.__lock:
+            for group in message_groups:
+                await self.__prime_group(group)
+
+    async def __prime_group(self, message_group: str) -> None:
+        account = self.account
+        if await self.__store.load(account, message_group) is not None:
+            return
+        newest: list[MessageEntity] = []
+        iterator = self.__api.iter_messages(
+            message_group, page_size=self.__page_size, prefetch=0
+        )
+        try:
+            async for message in iterator:
+                if newest and message_create_time(message) != message_create_time(
+                    newest[0]
+                ):
+                    break
+                newest.append(message)
+        finally:
+            await iterator.aclose()
+        await self.__store.save(account, message_group, _EMPTY_CURSOR.advance(newest))
+
+    async def __sync_group(
+        self, message_group: str, unread: MessageResp | None
+    ) -> list[MessageEntity]:
+        account = self.account
+        cursor = await self.__store.load(account, message_group)
+        if cursor is not None and _unread_count(unread, message_group) == 0:
+            logger.debug("No unread %s messages, skipping sync", message_group)
+            return []
+
+        known = cursor or _EMPTY_CURSOR
+        new_messages: list[MessageEntity] = []
+        iterator = self.__api.iter_messages(
+            message_group, page_size=self.__page_size, prefetch=self.__prefetch
+        )
+        try:
+            async for message in iterator:
+                if not known.is_newer(message):
+                    break
+                new_messages.append(message)
+        finally:
+            await iterator.aclose()
+
+        # Empty groups are saved too, so that the next syncs can be skipped
+        if new_messages or cursor is None:
+            await self.__store.save(account, message_group, known.advance(new_messages))
+        new_messages.reverse()
+        return new_messages
+
+
+def _unread_count(unread: MessageResp | None, message_group: str) -> int | None:
+    if unread is None:
+        return None
+    match message_group:
+        case "ALARM":
+            return unread.alarmNumber
+        case "COMMAND":
+            return unread.commandNumber
+        case "NEWS":
+            return unread.newsNumber
+    return None
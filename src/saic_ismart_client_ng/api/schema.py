@@ -7,9 +7,9 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class LoginResp:
-    @dataclass
+    @dataclass(slots=True)
     class LoginRespDetail:
         languageType: str | None = None
 
@@ -42,11 +42,11 @@ class GpsStatus(Enum):
     FIX_3d = 3
 
 
-@dataclass
+@dataclass(slots=True)
 class GpsPosition:
-    @dataclass
+    @dataclass(slots=True)
     class WayPoint:
-        @dataclass
+        @dataclass(slots=True)
         class Position:
             altitude: int | None = None
             latitude: int | None = None
@@ -3,6 +3,6 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class UserTimezoneResp:
     timezone: str | None = None
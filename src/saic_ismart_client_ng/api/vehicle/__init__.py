@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 import tenacity
 
 from saic_ismart_client_ng.api.base import AbstractSaicApi
+from saic_ismart_client_ng.api.vehicle.commands import RvcCommand, find_my_car_command
 from saic_ismart_client_ng.api.vehicle.schema import (
     BasicVehicleStatus,
     ExtendedVehicleStatus,
@@ -17,11 +20,14 @@ from saic_ismart_client_ng.api.vehicle.schema import (
     VehicleStatusResp,
     VinInfo,
 )
-from saic_ismart_client_ng.crypto_utils import sha256_hex_digest
+
+if TYPE_CHECKING:
+    from saic_ismart_client_ng.registry import VehicleHandle
 
 __all__ = [
     "BasicVehicleStatus",
     "ExtendedVehicleStatus",
+    "RvcCommand",
     "RvcParams",
     "RvcParamsId",
     "RvcReqType",
@@ -37,25 +43,37 @@ __all__ = [
 
 class SaicVehicleApi(AbstractSaicApi):
     async def vehicle_list(self) -> VehicleListResp:
-        return await self.execute_api_call(
+        result = await self.execute_api_call(
             "GET", "/vehicle/list", out_type=VehicleListResp
         )
+        self.vehicle_registry.update(result.vinList)
+        return result
 
-    async def get_vehicle_status(self, vin: str) -> VehicleStatusResp:
+    async def get_vehicle_status(self, vin: str | VehicleHandle) -> VehicleStatusResp:
         return await self.execute_api_call_with_event_id(
             "GET",
             "/vehicle/status",
             params={
-                "vin": sha256_hex_digest(vin),
+                "vin": self.hash_vin(vin),
                 "vehStatusReqType": "2",
             },
             out_type=VehicleStatusResp,
         )
 
     async def send_vehicle_control_command(
-        self, body: VehicleControlReq, vin: str
+        self, body: VehicleControlReq, vin: str | VehicleHandle
+    ) -> VehicleControlResp:
+        body.vin = self.hash_vin(vin)
+        return await self.__send_vehicle_control(body)
+
+    async def send_rvc_command(
+        self, command: RvcCommand, vin: str | VehicleHandle
+    ) -> VehicleControlResp:
+        return await self.__send_vehicle_control(command.serialize(self.hash_vin(vin)))
+
+    async def __send_vehicle_control(
+        self, body: VehicleControlReq | bytes
     ) -> VehicleControlResp:
-        body.vin = sha256_hex_digest(vin)
         return await self.execute_api_call_with_event_id(
             "POST",
             "/vehicle/control",
@@ -66,29 +84,13 @@ class SaicVehicleApi(AbstractSaicApi):
 
     async def control_find_my_car(
         self,
-        vin: str,
+        vin: str | VehicleHandle,
         *,
         should_stop: bool = False,
         with_horn: bool = True,
         with_lights: bool = True,
     ) -> VehicleControlResp:
-        if should_stop:
-            with_horn = False
-            with_lights = False
-        request_type = RvcReqType.FIND_MY_CAR
-        params = [
-            RvcParams(
-                RvcParamsId.FIND_MY_CAR_ENABLE, b"\x00" if should_stop else b"\x01"
-            ),
-            RvcParams(RvcParamsId.FIND_MY_CAR_HORN, b"\x01" if with_horn else b"\x00"),
-            RvcParams(
-                RvcParamsId.FIND_MY_CAR_LIGHTS, b"\x01" if with_lights else b"\x00"
-            ),
-            RvcParams(RvcParamsId.PARAMS_MAX, b"\x00\x00\x00\x00"),
-        ]
-        command = VehicleControlReq(
-            rvc_req_type=request_type,
-            rvc_params=params,
-            vin=sha256_hex_digest(vin),
+        command = find_my_car_command(
+            should_stop=should_stop, with_horn=with_horn, with_lights=with_lights
         )
-        return await self.send_vehicle_control_command(command, vin)
+        return await self.send_rvc_command(command, vin)
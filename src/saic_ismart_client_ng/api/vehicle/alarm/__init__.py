@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from saic_ismart_client_ng.api.vehicle import SaicVehicleApi
 from saic_ismart_client_ng.api.vehicle.alarm.schema import (
     AlarmSwitch,
@@ -7,7 +9,9 @@ from saic_ismart_client_ng.api.vehicle.alarm.schema import (
     AlarmSwitchResp,
     AlarmType,
 )
-from saic_ismart_client_ng.crypto_utils import sha256_hex_digest
+
+if TYPE_CHECKING:
+    from saic_ismart_client_ng.registry import VehicleHandle
 
 __all__ = [
     "AlarmSwitch",
@@ -18,22 +22,20 @@ __all__ = [
 
 
 class SaicVehicleAlarmApi(SaicVehicleApi):
-    async def get_alarm_switch(self, vin: str) -> AlarmSwitchResp:
+    async def get_alarm_switch(self, vin: str | VehicleHandle) -> AlarmSwitchResp:
         return await self.execute_api_call(
             "GET",
             "/vehicle/alarmSwitch",
             out_type=AlarmSwitchResp,
-            params={"vin": sha256_hex_digest(vin)},
+            params={"vin": self.hash_vin(vin)},
         )
 
     async def set_alarm_switches(
-        self, alarm_switches: list[AlarmType], vin: str
+        self, alarm_switches: list[AlarmType], vin: str | VehicleHandle
     ) -> None:
         actual_switches = [
             AlarmSwitch(alarmType=alarm_type.value, alarmSwitch=1, functionSwitch=1)
             for alarm_type in alarm_switches
         ]
-        body = AlarmSwitchReq(
-            alarmSwitchList=actual_switches, vin=sha256_hex_digest(vin)
-        )
+        body = AlarmSwitchReq(alarmSwitchList=actual_switches, vin=self.hash_vin(vin))
         await self.execute_api_call_no_result("PUT", "/vehicle/alarmSwitch", body=body)
@@ -10,19 +10,19 @@ class AlarmType(Enum):
     ALARM_TYPE_VEHICLE_START = 3
 
 
-@dataclass
+@dataclass(slots=True)
 class AlarmSwitch:
     alarmType: int | None = None
     functionSwitch: int | None = None
     alarmSwitch: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AlarmSwitchResp:
     alarmSwitchList: list[AlarmSwitch] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class AlarmSwitchReq:
     vin: str
     alarmSwitchList: list[AlarmSwitch] = field(default_factory=list)
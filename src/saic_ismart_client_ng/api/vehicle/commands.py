@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import functools
+from typing import TYPE_CHECKING
+
+from saic_ismart_client_ng.api.vehicle.schema import (
+    RvcParams,
+    RvcParamsId,
+    RvcReqType,
+    VehicleControlReq,
+)
+from saic_ismart_client_ng.net.codec import StdlibJsonCodec, to_json_dict
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from saic_ismart_client_ng.api.vehicle.locks.schema import VehicleLockId
+    from saic_ismart_client_ng.api.vehicle.windows.schema import VehicleWindowId
+
+RvcParamValues = tuple[tuple[RvcParamsId, bytes], ...]
+
+_PARAMS_MAX = (RvcParamsId.PARAMS_MAX, b"\x00\x00\x00\x00")
+_ON = b"\x01"
+_OFF = b"\x00"
+_WINDOW_PARAMS = (
+    RvcParamsId.WINDOW_SUNROOF,
+    RvcParamsId.WINDOW_DRIVER,
+    RvcParamsId.WINDOW_2,
+    RvcParamsId.WINDOW_3,
+    RvcParamsId.WINDOW_4,
+)
+# The VIN is always the last field of the body, so we can cache everything up to its value
+_VIN_SUFFIX = b'"}'
+_CODEC = StdlibJsonCodec()
+
+
+@dataclass(frozen=True, slots=True)
+class RvcCommand:
+    """A remote vehicle control command, independent of the vehicle it is sent to.
+
+    Commands are hashable, so the serialized request body is computed once per
+    distinct (request type, parameters) pair and only the hashed VIN is spliced
+    in when the command is sent.
+    """
+
+    req_type: RvcReqType
+    params: RvcParamValues | None = None
+
+    def to_request(self, vin_hash: str) -> VehicleControlReq:
+        return VehicleControlReq(
+            rvc_req_type=self.req_type,
+            rvc_params=_to_rvc_params(self.params),
+            vin=vin_hash,
+        )
+
+    def serialize(self, vin_hash: str) -> bytes:
+        return _serialized_prefix(self) + vin_hash.encode("ascii") + _VIN_SUFFIX
+
+
+def _to_rvc_params(params: RvcParamValues | None) -> list[RvcParams] | None:
+    if params is None:
+        return None
+    return [RvcParams(param_id, value) for param_id, value in params]
+
+
+@functools.lru_cache(maxsize=512)
+def _serialized_prefix(command: RvcCommand) -> bytes:
+    body = to_json_dict(command.to_request(vin_hash=""))
+    return _CODEC.dumps(body).removesuffix(_VIN_SUFFIX)
+
+
+def find_my_car_command(
+    *, should_stop: bool = False, with_horn: bool = True, with_lights: bool = True
+) -> RvcCommand:
+    if should_stop:
+        with_horn = False
+        with_lights = False
+    return RvcCommand(
+        RvcReqType.FIND_MY_CAR,
+        (
+            (RvcParamsId.FIND_MY_CAR_ENABLE, _OFF if should_stop else _ON),
+            (RvcParamsId.FIND_MY_CAR_HORN, _ON if with_horn else _OFF),
+            (RvcParamsId.FIND_MY_CAR_LIGHTS, _ON if with_lights else _OFF),
+            _PARAMS_MAX,
+        ),
+    )
+
+
+def close_locks_command() -> RvcCommand:
+    return RvcCommand(RvcReqType.CLOSE_LOCKS)
+
+
+def open_locks_command(lock_id: VehicleLockId) -> RvcCommand:
+    return RvcCommand(
+        RvcReqType.OPEN_LOCKS,
+        (
+            (RvcParamsId.UNK_4, _OFF),
+            (RvcParamsId.UNK_5, _OFF),
+            (RvcParamsId.UNK_6, _OFF),
+            (RvcParamsId.LOCK_ID, lock_id.value.to_bytes(1, byteorder="big")),
+            _PARAMS_MAX,
+        ),
+    )
+
+
+def windows_command(
+    *, should_open: bool, windows: Iterable[VehicleWindowId]
+) -> RvcCommand:
+    requested_windows = {w.value for w in windows}
+    params = tuple(
+        (param_id, _ON if param_id in requested_windows else _OFF)
+        for param_id in _WINDOW_PARAMS
+    )
+    return RvcCommand(
+        RvcReqType.WINDOWS,
+        (
+            *params,
+            (RvcParamsId.WINDOW_OPEN_CLOSE, b"\x03" if should_open else _OFF),
+        ),
+    )
+
+
+def climate_command(
+    *, fan_speed: int = 5, ac_on: bool | None = True, temperature_idx: int = 8
+) -> RvcCommand:
+    if fan_speed == 0:
+        ac_on = False
+        temperature_idx = 8
+
+    params: list[tuple[RvcParamsId, bytes]] = [
+        (RvcParamsId.FAN_SPEED, fan_speed.to_bytes(1, "big"))
+    ]
+    if fan_speed > 0 or temperature_idx == 0:
+        params.append((RvcParamsId.TEMPERATURE, temperature_idx.to_bytes(1, "big")))
+    if ac_on is not None:
+        params.append((RvcParamsId.AC_ON_OFF, _ON if ac_on else _OFF))
+    params.append(_PARAMS_MAX)
+    return RvcCommand(RvcReqType.CLIMATE, tuple(params))
+
+
+def heated_seats_command(
+    *, left_side_level: int = 0, right_side_level: int = 0
+) -> RvcCommand:
+    return RvcCommand(
+        RvcReqType.HEATED_SEATS,
+        (
+            (RvcParamsId.HEATED_SEAT_DRIVER, left_side_level.to_bytes(1, "big")),
+            (RvcParamsId.HEATED_SEAT_PASSENGER, right_side_level.to_bytes(1, "big")),
+            _PARAMS_MAX,
+        ),
+    )
+
+
+def rear_window_heat_command(*, enable: bool) -> RvcCommand:
+    return RvcCommand(
+        RvcReqType.REMOTE_HEAT_REAR_WINDOW,
+        (
+            (RvcParamsId.REMOTE_HEAT_REAR_WINDOW, _ON if enable else _OFF),
+            _PARAMS_MAX,
+        ),
+    )
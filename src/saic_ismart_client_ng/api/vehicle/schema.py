@@ -11,14 +11,14 @@ if TYPE_CHECKING:
     from saic_ismart_client_ng.api.schema import GpsPosition
 
 
-@dataclass
+@dataclass(slots=True)
 class VehicleModelConfiguration:
     itemCode: str | None = None
     itemName: str | None = None
     itemValue: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class SubAccount:
     authorizationCardType: int | None = None
     btKeyStatus: int | None = None
@@ -35,7 +35,7 @@ class SubAccount:
     vin: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class VinInfo:
     bindTime: int | None = None
     brandName: str | None = None
@@ -54,12 +54,12 @@ class VinInfo:
     )
 
 
-@dataclass
+@dataclass(slots=True)
 class VehicleListResp:
     vinList: list[VinInfo] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class BasicVehicleStatus:
     batteryVoltage: int | None = None
     bonnetStatus: int | None = None
@@ -117,12 +117,12 @@ class BasicVehicleStatus:
         return self.engineStatus == 1
 
 
-@dataclass
+@dataclass(slots=True)
 class ExtendedVehicleStatus:
     alertDataSum: list[Any] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class VehicleStatusResp:
     # pylint: disable=import-outside-toplevel
     from saic_ismart_client_ng.api.schema import GpsPosition  # noqa: PLC0415
@@ -156,7 +156,7 @@ class RvcParamsId(Enum):
     PARAMS_MAX = 0xFF
 
 
-@dataclass
+@dataclass(slots=True)
 class RvcParams:
     paramId: int
     paramValue: str
@@ -182,7 +182,7 @@ class RvcReqType(Enum):
     MAX_VALUE = "597"
 
 
-@dataclass
+@dataclass(slots=True)
 class VehicleControlReq:
     rvcParams: list[RvcParams] | None
     rvcReqType: str | int | None
@@ -200,7 +200,7 @@ class VehicleControlReq:
         return decode_bytes(input_value=self.rvcReqType, field_name="rvcReqType")
 
 
-@dataclass
+@dataclass(slots=True)
 class VehicleControlResp:
     # pylint: disable=import-outside-toplevel
     from saic_ismart_client_ng.api.schema import GpsPosition  # noqa: PLC0415
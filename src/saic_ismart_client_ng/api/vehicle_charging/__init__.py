@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime, time, timedelta
+from typing import TYPE_CHECKING
 
 from saic_ismart_client_ng.api.base import AbstractSaicApi
 from saic_ismart_client_ng.api.vehicle_charging.schema import (
@@ -26,7 +27,10 @@ from saic_ismart_client_ng.api.vehicle_charging.schema import (
     ScheduledChargingResp,
     TargetBatteryCode,
 )
-from saic_ismart_client_ng.crypto_utils import sha256_hex_digest
+from saic_ismart_client_ng.capabilities import VehicleCapability
+
+if TYPE_CHECKING:
+    from saic_ismart_client_ng.registry import VehicleHandle
 
 __all__ = [
     "BmsChargingStatusCode",
@@ -54,36 +58,40 @@ __all__ = [
 
 
 class SaicVehicleChargingApi(AbstractSaicApi):
-    async def get_vehicle_charging_status(self, vin: str) -> ChargeStatusResp:
+    async def get_vehicle_charging_status(
+        self, vin: str | VehicleHandle
+    ) -> ChargeStatusResp:
         return await self.execute_api_call_with_event_id(
             "GET",
             "/vehicle/charging/status",
             params={
-                "vin": sha256_hex_digest(vin),
+                "vin": self.hash_vin(vin),
             },
             out_type=ChargeStatusResp,
         )
 
-    async def get_vehicle_charging_management_data(self, vin: str) -> ChrgMgmtDataResp:
+    async def get_vehicle_charging_management_data(
+        self, vin: str | VehicleHandle
+    ) -> ChrgMgmtDataResp:
         return await self.execute_api_call_with_event_id(
             "GET",
             "/vehicle/charging/mgmtData",
             params={
-                "vin": sha256_hex_digest(vin),
+                "vin": self.hash_vin(vin),
             },
             out_type=ChrgMgmtDataResp,
         )
 
     async def send_vehicle_charging_control(
-        self, vin: str, body: ChargingControlRequest
+        self, vin: str | VehicleHandle, body: ChargingControlRequest
     ) -> ChargingControlResp:
-        body.vin = sha256_hex_digest(vin)
+        body.vin = self.hash_vin(vin)
         return await self.execute_api_call_with_event_id(
             "POST", "/vehicle/charging/control", body=body, out_type=ChargingControlResp
         )
 
     async def control_charging_port_lock(
-        self, vin: str, *, unlock: bool
+        self, vin: str | VehicleHandle, *, unlock: bool
     ) -> ChargingControlResp:
         body = ChargingControlRequest(
             chrgCtrlReq=0,
@@ -93,7 +101,7 @@ class SaicVehicleChargingApi(AbstractSaicApi):
         return await self.send_vehicle_charging_control(vin, body)
 
     async def control_charging(
-        self, vin: str, *, stop_charging: bool
+        self, vin: str | VehicleHandle, *, stop_charging: bool
     ) -> ChargingControlResp:
         body = ChargingControlRequest(
             chrgCtrlReq=2 if stop_charging else 1,
@@ -102,7 +110,10 @@ class SaicVehicleChargingApi(AbstractSaicApi):
         )
         return await self.send_vehicle_charging_control(vin, body)
 
-    async def control_v2x(self, vin: str, *, stop_v2x: bool) -> ChargingControlResp:
+    async def control_v2x(
+        self, vin: str | VehicleHandle, *, stop_v2x: bool
+    ) -> ChargingControlResp:
+        self.ensure_supported(vin, VehicleCapability.V2X)
         body = ChargingControlRequest(
             chrgCtrlReq=0,
             tboxV2XReq=2 if stop_v2x else 1,
@@ -111,9 +122,9 @@ class SaicVehicleChargingApi(AbstractSaicApi):
         return await self.send_vehicle_charging_control(vin, body)
 
     async def send_vehicle_charging_reservation(
-        self, vin: str, body: ScheduledChargingRequest
+        self, vin: str | VehicleHandle, body: ScheduledChargingRequest
     ) -> ScheduledChargingResp:
-        body.vin = sha256_hex_digest(vin)
+        body.vin = self.hash_vin(vin)
         return await self.execute_api_call_with_event_id(
             "POST",
             "/vehicle/charging/reservation",
@@ -122,7 +133,12 @@ class SaicVehicleChargingApi(AbstractSaicApi):
         )
 
     async def set_schedule_charging(
-        self, vin: str, *, start_time: time, end_time: time, mode: ScheduledChargingMode
+        self,
+        vin: str | VehicleHandle,
+        *,
+        start_time: time,
+        end_time: time,
+        mode: ScheduledChargingMode,
     ) -> ScheduledChargingResp:
         start_hour = start_time.hour
         start_minute = start_time.minute
@@ -140,21 +156,21 @@ class SaicVehicleChargingApi(AbstractSaicApi):
         return await self.send_vehicle_charging_reservation(vin, body)
 
     async def get_vehicle_battery_heating_schedule(
-        self, vin: str
+        self, vin: str | VehicleHandle
     ) -> ScheduledBatteryHeatingResp:
         return await self.execute_api_call(
             "GET",
             "/charging/batteryHeating",
             params={
-                "vin": sha256_hex_digest(vin),
+                "vin": self.hash_vin(vin),
             },
             out_type=ScheduledBatteryHeatingResp,
         )
 
     async def send_vehicle_battery_heating_schedule(
-        self, vin: str, body: ScheduledBatteryHeatingRequest
+        self, vin: str | VehicleHandle, body: ScheduledBatteryHeatingRequest
     ) -> None:
-        body.vin = sha256_hex_digest(vin)
+        body.vin = self.hash_vin(vin)
         await self.execute_api_call_no_result(
             "POST",
             "/charging/batteryHeating",
@@ -163,10 +179,9 @@ class SaicVehicleChargingApi(AbstractSaicApi):
 
     async def disable_schedule_battery_heating(
         self,
-        vin: str,
+        vin: str | VehicleHandle,
     ) -> None:
         body = ScheduledBatteryHeatingRequest(
-            vin=sha256_hex_digest(vin),
             startTime=0,
             status=0,
         )
@@ -174,7 +189,7 @@ class SaicVehicleChargingApi(AbstractSaicApi):
 
     async def enable_schedule_battery_heating(
         self,
-        vin: str,
+        vin: str | VehicleHandle,
         *,
         start_time: time,
     ) -> None:
@@ -184,66 +199,65 @@ class SaicVehicleChargingApi(AbstractSaicApi):
         if start_date < datetime.now():
             start_date = start_date + timedelta(days=1)
         body = ScheduledBatteryHeatingRequest(
-            vin=sha256_hex_digest(vin),
             startTime=int(start_date.timestamp()) * 1000,
             status=1,
         )
         return await self.send_vehicle_battery_heating_schedule(vin, body)
 
     async def send_vehicle_charging_ptc_heat(
-        self, vin: str, body: ChargingPtcHeatRequest
+        self, vin: str | VehicleHandle, body: ChargingPtcHeatRequest
     ) -> ChrgPtcHeatResp:
-        body.vin = sha256_hex_digest(vin)
+        body.vin = self.hash_vin(vin)
         return await self.execute_api_call_with_event_id(
             "POST", "/vehicle/charging/ptcHeat", body=body, out_type=ChrgPtcHeatResp
         )
 
     async def control_battery_heating(
-        self, vin: str, *, enable: bool
+        self, vin: str | VehicleHandle, *, enable: bool
     ) -> ChrgPtcHeatResp:
-        body = ChargingPtcHeatRequest(
-            ptcHeatReq=1 if enable else 2, vin=sha256_hex_digest(vin)
-        )
+        body = ChargingPtcHeatRequest(ptcHeatReq=1 if enable else 2)
         return await self.send_vehicle_charging_ptc_heat(vin, body)
 
     async def send_vehicle_charging_settings(
-        self, vin: str, body: ChargingSettingRequest
+        self, vin: str | VehicleHandle, body: ChargingSettingRequest
     ) -> ChargingSettingResp:
-        body.vin = sha256_hex_digest(vin)
+        body.vin = self.hash_vin(vin)
         return await self.execute_api_call_with_event_id(
             "POST", "/vehicle/charging/setting", body=body, out_type=ChargingSettingResp
         )
 
-    async def get_vehicle_charging_settings(self, vin: str) -> ChargingSettingResp:
+    async def get_vehicle_charging_settings(
+        self, vin: str | VehicleHandle
+    ) -> ChargingSettingResp:
         body = ChargingSettingRequest(
             altngChrgCrntReq=0,
             onBdChrgTrgtSOCReq=0,
             tboxV2XSpSOCReq=0,
-            vin=sha256_hex_digest(vin),
         )
         return await self.send_vehicle_charging_settings(vin, body)
 
     async def set_target_battery_soc(
         self,
-        vin: str,
+        vin: str | VehicleHandle,
         target_soc: TargetBatteryCode,
         charge_current_limit: ChargeCurrentLimitCode = ChargeCurrentLimitCode.C_IGNORE,
     ) -> ChargingSettingResp:
+        if target_soc != TargetBatteryCode.P_IGNORE:
+            self.ensure_supported(vin, VehicleCapability.TARGET_SOC)
         body = ChargingSettingRequest(
             onBdChrgTrgtSOCReq=target_soc.value,
             altngChrgCrntReq=charge_current_limit.value,
             tboxV2XSpSOCReq=0,
-            vin=sha256_hex_digest(vin),
         )
         return await self.send_vehicle_charging_settings(vin, body)
 
     async def set_v2x_target_battery_soc(
-        self, vin: str, target_soc: TargetBatteryCode
+        self, vin: str | VehicleHandle, target_soc: TargetBatteryCode
     ) -> ChargingSettingResp:
+        self.ensure_supported(vin, VehicleCapability.V2X)
         body = ChargingSettingRequest(
             onBdChrgTrgtSOCReq=0,
             altngChrgCrntReq=0,
             tboxV2XSpSOCReq=target_soc.value,
-            vin=sha256_hex_digest(vin),
         )
         return await self.send_vehicle_charging_settings(vin, body)
@@ -79,6 +79,17 @@ class BmsChargingStatusCode(Enum):
             return None
 
 
+# The statuses for which the battery management system reports a charge
+BMS_CHARGING_STATUSES = frozenset(
+    {
+        BmsChargingStatusCode.CHARGING_1.value,
+        BmsChargingStatusCode.CHARGING_3.value,
+        BmsChargingStatusCode.CHARGING_10.value,
+        BmsChargingStatusCode.CHARGING_12.value,
+    }
+)
+
+
 class HeatingStopReason(Enum):
     NO_REASON = 0
     UNKNOWN_1 = 1
@@ -168,7 +179,7 @@ class TargetBatteryCode(Enum):
                 raise ValueError(msg)
 
 
-@dataclass
+@dataclass(slots=True)
 class ChargingStatus:
     chargingCurrent: int | None = None
     chargingDuration: int | None = None
@@ -198,7 +209,7 @@ class ChargingStatus:
     workingVoltage: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ChargeStatusResp:
     # pylint: disable=import-outside-toplevel
     from saic_ismart_client_ng.api.schema import GpsPosition  # noqa: PLC0415
@@ -208,7 +219,7 @@ class ChargeStatusResp:
     statusTime: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ChrgMgmtData:
     bmsAdpPubChrgSttnDspCmd: int | None = None
     bmsAltngChrgCrntDspCmd: int | None = None
@@ -299,7 +310,7 @@ class ChrgMgmtData:
 
     @property
     def is_bms_charging(self) -> bool:
-        return bool(self.bmsChrgSts is not None and self.bmsChrgSts in (1, 3, 10, 12))
+        return self.bmsChrgSts in BMS_CHARGING_STATUSES
 
     @property
     def bms_charging_status(self) -> BmsChargingStatusCode | None:
@@ -320,7 +331,7 @@ class ChrgMgmtData:
         return None
 
 
-@dataclass
+@dataclass(slots=True)
 class RvsChargeStatus:
     chargingDuration: int | None = None
     chargingElectricityPhase: int | None = None
@@ -349,13 +360,13 @@ class RvsChargeStatus:
     workingVoltage: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ChrgMgmtDataResp:
     chrgMgmtData: ChrgMgmtData | None = None
     rvsChargeStatus: RvsChargeStatus | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ChargingSettingRequest:
     altngChrgCrntReq: int | None = None
     onBdChrgTrgtSOCReq: int | None = None
@@ -363,7 +374,7 @@ class ChargingSettingRequest:
     vin: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ChargingSettingResp:
     bmsAltngChrgCrntDspCmd: int | None = None
     bmsAltngChrgCrntResp: int | None = None
@@ -404,7 +415,7 @@ class ChargingSettingResp:
             return None
 
 
-@dataclass
+@dataclass(slots=True)
 class ScheduledChargingRequest:
     rsvanSpHour: int | None = None
     rsvanSpMintue: int | None = None
@@ -415,7 +426,7 @@ class ScheduledChargingRequest:
     vin: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ScheduledChargingResp:
     bmsAdpPubChrgSttnDspCmd: int | None = None
     bmsReserChrgCtrlResp: int | None = None
@@ -431,13 +442,13 @@ class ScheduledChargingResp:
         return decode_bytes(input_value=self.rvcReqSts, field_name="rvcReqSts")
 
 
-@dataclass
+@dataclass(slots=True)
 class ChargingPtcHeatRequest:
     ptcHeatReq: int | None = None
     vin: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ChrgPtcHeatResp:
     ptcHeatReqDspCmd: int | None = None
     ptcHeatResp: int | None = None
@@ -454,7 +465,7 @@ class ChrgPtcHeatResp:
         return None
 
 
-@dataclass
+@dataclass(slots=True)
 class ChargingControlRequest:
     chrgCtrlReq: int | None = None
     tboxEleccLckCtrlReq: int | None = None
@@ -462,7 +473,7 @@ class ChargingControlRequest:
     vin: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ChargingControlResp:
     bmsAdpPubChrgSttnDspCmd: int | None = None
     bmsAltngChrgCrntDspCmd: int | None = None
@@ -558,7 +569,7 @@ class ChargingControlResp:
 
     @property
     def is_bms_charging(self) -> bool:
-        return bool(self.bmsChrgSts is not None and self.bmsChrgSts in (1, 3, 10, 12))
+        return self.bmsChrgSts in BMS_CHARGING_STATUSES
 
     @property
     def bms_charging_status(self) -> BmsChargingStatusCode | None:
@@ -579,14 +590,14 @@ class ChargingControlResp:
         return None
 
 
-@dataclass
+@dataclass(slots=True)
 class ScheduledBatteryHeatingRequest:
     startTime: int | None = None
     status: int | None = None
     vin: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ScheduledBatteryHeatingResp:
     startTime: int | None = None
     status: int | None = None
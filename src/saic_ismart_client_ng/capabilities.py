@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from enum import Enum
+import sys
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from saic_ismart_client_ng.api.vehicle.schema import VehicleModelConfiguration
+
+
+class VehicleCapability(Enum):
+    """Optional vehicle features, keyed by their vehicleModelConfiguration item name."""
+
+    SUNROOF = "Sunroof"
+    HEATED_SEATS = "HeatedSeat"
+    TARGET_SOC = "Battery"
+    V2X = "V2X"
+
+
+class VehicleCapabilities:
+    """Index over the vehicleModelConfiguration of a single vehicle.
+
+    Items are looked up by either their itemCode or their itemName. Capability
+    checks return None when the vehicle does not report the item at all, so that
+    callers can tell "not supported" apart from "unknown".
+    """
+
+    __slots__ = ("__items", "__supported")
+
+    def __init__(self, configuration: Iterable[VehicleModelConfiguration]) -> None:
+        self.__items: dict[str, str | None] = {}
+        for item in configuration:
+            value = sys.intern(item.itemValue) if item.itemValue else item.itemValue
+            if item.itemCode:
+                self.__items[sys.intern(item.itemCode)] = value
+            if item.itemName:
+                self.__items[sys.intern(item.itemName)] = value
+        self.__supported = {
+            capability: self.__evaluate(capability) for capability in VehicleCapability
+        }
+
+    def __evaluate(self, capability: VehicleCapability) -> bool | None:
+        if capability.value not in self.__items:
+            return None
+        raw_value = self.__items[capability.value]
+        match capability:
+            case VehicleCapability.SUNROOF:
+                return raw_value != "0"
+            case VehicleCapability.HEATED_SEATS:
+                # 1 means the seats have levels, 2 means they can only be turned on or off
+                return raw_value in ("1", "2")
+            case _:
+                return raw_value == "1"
+
+    def supports(self, capability: VehicleCapability) -> bool | None:
+        return self.__supported[capability]
+
+    def value(self, item: str) -> str | None:
+        return self.__items.get(item)
+
+    def __contains__(self, item: object) -> bool:
+        return item in self.__items
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    @property
+    def has_sunroof(self) -> bool | None:
+        return self.__supported[VehicleCapability.SUNROOF]
+
+    @property
+    def has_heated_seats(self) -> bool | None:
+        return self.__supported[VehicleCapability.HEATED_SEATS]
+
+    @property
+    def has_level_heated_seats(self) -> bool | None:
+        if not self.has_heated_seats:
+            return self.has_heated_seats
+        return self.__items[VehicleCapability.HEATED_SEATS.value] == "1"
+
+    @property
+    def supports_target_soc(self) -> bool | None:
+        return self.__supported[VehicleCapability.TARGET_SOC]
+
+    @property
+    def supports_v2x(self) -> bool | None:
+        return self.__supported[VehicleCapability.V2X]
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from saic_ismart_client_ng.capture.exchange import (
+    Exchange,
+    ExchangeLog,
+    ExchangeSink,
+    read_exchanges,
+)
+from saic_ismart_client_ng.capture.log import (
+    CaptureEntry,
+    CaptureReader,
+    CaptureWriter,
+)
+from saic_ismart_client_ng.capture.recording import RecordingTransport
+from saic_ismart_client_ng.capture.replay import ReplayTransport
+
+__all__ = [
+    "CaptureEntry",
+    "CaptureReader",
+    "CaptureWriter",
+    "Exchange",
+    "ExchangeLog",
+    "ExchangeSink",
+    "RecordingTransport",
+    "ReplayTransport",
+    "read_exchanges",
+]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol, Self
+from urllib.parse import parse_qsl, urlsplit
+
+from saic_ismart_client_ng.net.codec import default_json_codec
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    import os
+    from types import TracebackType
+
+    from saic_ismart_client_ng.net.codec import JsonCodec
+
+
+@dataclass(frozen=True, slots=True)
+class Exchange:
+    """One request to the gateway and its response, with decrypted bodies.
+
+    `path` is relative to the base URI and includes the query string, the same
+    path a SaicApiListener receives.
+    """
+
+    started: float
+    duration: float
+    method: str
+    path: str
+    request_headers: dict[str, str]
+    request_body: str | None
+    status: int
+    response_headers: dict[str, str]
+    response_body: str | None
+
+    @property
+    def route(self) -> str:
+        return urlsplit(self.path).path
+
+    @property
+    def params(self) -> tuple[tuple[str, str], ...]:
+        return tuple(sorted(parse_qsl(urlsplit(self.path).query)))
+
+    def to_json(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_json(cls, value: dict[str, Any]) -> Exchange:
+        return cls(**value)
+
+
+class ExchangeSink(Protocol):
+    def append(self, exchange: Exchange) -> None: ...
+
+
+class ExchangeLog:
+    """Appends exchanges to a JSON Lines file, one line per exchange.
+
+    Every line is flushed once written, so a crash loses at most the exchange
+    being written. Reading skips such a truncated last line.
+    """
+
+    def __init__(
+        self, path: str | os.PathLike[str], *, codec: JsonCodec | None = None
+    ) -> None:
+        self.__codec = codec or default_json_codec()
+        self.__file = Path(path).open("ab")  # noqa: SIM115 # pylint: disable=consider-using-with
+
+    def append(self, exchange: Exchange) -> None:
+        self.__file.write(self.__codec.dumps(exchange.to_json()) + b"\n")
+        self.__file.flush()
+
+    def close(self) -> None:
+        self.__file.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def read_exchanges(
+    path: str | os.PathLike[str], *, codec: JsonCodec | None = None
+) -> Iterator[Exchange]:
+    """Yield the exchanges of a log in the order they were appended."""
+    codec = codec or default_json_codec()
+    with Path(path).open("rb") as file:
+        for line in file:
+            if not line.endswith(b"\n"):
+                break
+            if line.strip():
+                yield Exchange.from_json(codec.loads(line))
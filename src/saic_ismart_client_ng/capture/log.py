@@ -0,0 +1,375 @@
+"""Binary, length-prefixed capture log of gateway exchanges.
+
+A capture is a directory of segments. Each segment is a data file starting
+with a magic, followed by records: the payload length and CRC32 (uint32
+each), then the payload, which holds the start time, duration and status of
+the exchange followed by its length-prefixed strings. Next to it, an index
+file holds one fixed size entry per record: the start time in milliseconds,
+the record offset and length, and 8-byte hashes of its route and of the VIN
+hash of the vehicle it is about. Queries scan the memory mapped index and
+only decode the records they match.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import os
+from pathlib import Path
+import re
+import struct
+import time
+from typing import TYPE_CHECKING, NamedTuple, Self
+import zlib
+
+from saic_ismart_client_ng.capture.exchange import Exchange
+from saic_ismart_client_ng.crypto_utils import sha256_hex_digest
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from types import TracebackType
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SAICCAP1"
+INDEX_MAGIC = b"SAICIDX1"
+SEGMENT_SUFFIX = ".caplog"
+INDEX_SUFFIX = ".capidx"
+
+_FRAME = struct.Struct("<II")
+_FIXED = struct.Struct("<ddH")
+_LENGTH = struct.Struct("<I")
+_ENTRY = struct.Struct("<qQI8s8s")
+_NONE = 0xFFFFFFFF
+_NO_VIN = bytes(8)
+_VIN_HASH = re.compile(r"^[0-9a-f]{64}$")
+_BODY_VIN = re.compile(r'"vin"\s*:\s*"([^"]+)"')
+
+
+class CaptureEntry(NamedTuple):
+    """Index entry of a record, times in milliseconds."""
+
+    started_ms: int
+    offset: int
+    length: int
+    route_hash: bytes
+    vin_hash: bytes
+
+
+def route_hash(route: str) -> bytes:
+    return hashlib.blake2b(route.encode("utf-8"), digest_size=8).digest()
+
+
+def vin_hash_key(vin_hash: str) -> bytes:
+    """Index key of a VIN hash, as sent to the gateway."""
+    return bytes.fromhex(vin_hash[:16])
+
+
+def _vin_key_of(exchange: Exchange) -> bytes:
+    vin = dict(exchange.params).get("vin")
+    if (
+        vin is None
+        and exchange.request_body
+        and (match := _BODY_VIN.search(exchange.request_body))
+    ):
+        vin = match.group(1)
+    if not vin:
+        return _NO_VIN
+    return vin_hash_key(vin if _VIN_HASH.match(vin) else sha256_hex_digest(vin))
+
+
+def _encode_headers(headers: dict[str, str]) -> str:
+    return "\n".join(f"{name}:{value}" for name, value in headers.items())
+
+
+def _decode_headers(value: str | None) -> dict[str, str]:
+    if not value:
+        return {}
+    headers = {}
+    for line in value.split("\n"):
+        name, _, header_value = line.partition(":")
+        headers[name] = header_value
+    return headers
+
+
+def encode_exchange(exchange: Exchange) -> bytes:
+    out = bytearray(_FIXED.pack(exchange.started, exchange.duration, exchange.status))
+    for value in (
+        exchange.method,
+        exchange.path,
+        _encode_headers(exchange.request_headers),
+        exchange.request_body,
+        _encode_headers(exchange.response_headers),
+        exchange.response_body,
+    ):
+        if value is None:
+            out += _LENGTH.pack(_NONE)
+        else:
+            data = value.encode("utf-8")
+            out += _LENGTH.pack(len(data))
+            out += data
+    return bytes(out)
+
+
+def decode_exchange(data: bytes | memoryview) -> Exchange:
+    started, duration, status = _FIXED.unpack_from(data, 0)
+    position = _FIXED.size
+    values: list[str | None] = []
+    for _ in range(6):
+        (length,) = _LENGTH.unpack_from(data, position)
+        position += _LENGTH.size
+        if length == _NONE:
+            values.append(None)
+        else:
+            values.append(bytes(data[position : position + length]).decode("utf-8"))
+            position += length
+    return Exchange(
+        started=started,
+        duration=duration,
+        method=values[0] or "",
+        path=values[1] or "",
+        request_headers=_decode_headers(values[2]),
+        request_body=values[3],
+        status=status,
+        response_headers=_decode_headers(values[4]),
+        response_body=values[5],
+    )
+
+
+def _segment_paths(directory: Path) -> list[Path]:
+    return sorted(directory.glob(f"*{SEGMENT_SUFFIX}"))
+
+
+class CaptureWriter:
+    """Appends exchanges to a capture, rotating segments as they fill up.
+
+    Records are written through buffered files and synced to disk in batches:
+    once `sync_every` records are pending or `sync_interval` seconds passed
+    since the last sync, and when a segment is rotated or the writer closed.
+    A crash loses at most the pending records; a torn record at the end of a
+    segment fails its CRC and is skipped by the reader. Every writer starts a
+    new segment, so segments are never appended to after a restart.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        *,
+        max_segment_bytes: int = 256 * 1024 * 1024,
+        sync_every: int = 256,
+        sync_interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.__directory = Path(directory)
+        self.__directory.mkdir(parents=True, exist_ok=True)
+        self.__max_segment_bytes = max_segment_bytes
+        self.__sync_every = sync_every
+        self.__sync_interval = sync_interval
+        self.__clock = clock
+        existing = _segment_paths(self.__directory)
+        self.__sequence = int(existing[-1].stem) + 1 if existing else 1
+        self.__pending = 0
+        self.__last_sync = clock()
+        self.__open_segment()
+
+    def append(self, exchange: Exchange) -> None:
+        payload = encode_exchange(exchange)
+        if (
+            self.__offset > len(MAGIC)
+            and self.__offset + _FRAME.size + len(payload) > self.__max_segment_bytes
+        ):
+            self.__rotate()
+        offset = self.__offset
+        self.__data.write(_FRAME.pack(len(payload), zlib.crc32(payload)))
+        self.__data.write(payload)
+        self.__offset += _FRAME.size + len(payload)
+        self.__index.write(
+            _ENTRY.pack(
+                round(exchange.started * 1000),
+                offset,
+                _FRAME.size + len(payload),
+                route_hash(exchange.route),
+                _vin_key_of(exchange),
+            )
+        )
+        self.__pending += 1
+        if (
+            self.__pending >= self.__sync_every
+            or self.__clock() - self.__last_sync >= self.__sync_interval
+        ):
+            self.sync()
+
+    def sync(self) -> None:
+        """Write the pending records to disk, the data before its index."""
+        for file in (self.__data, self.__index):
+            file.flush()
+            os.fsync(file.fileno())
+        self.__pending = 0
+        self.__last_sync = self.__clock()
+
+    def close(self) -> None:
+        self.sync()
+        self.__data.close()
+        self.__index.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __rotate(self) -> None:
+        self.close()
+        self.__sequence += 1
+        self.__open_segment()
+
+    def __open_segment(self) -> None:
+        name = f"{self.__sequence:06d}"
+        path = self.__directory / f"{name}{SEGMENT_SUFFIX}"
+        self.__data = path.open("xb")
+        self.__index = (self.__directory / f"{name}{INDEX_SUFFIX}").open("xb")
+        self.__data.write(MAGIC)
+        self.__index.write(INDEX_MAGIC)
+        self.__offset = len(MAGIC)
+
+
+class _Segment:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        # The segment being written may not have been flushed yet
+        self.data = _map(path)
+        self.index = _map(path.with_suffix(INDEX_SUFFIX))
+        if (len(self.data) and self.data[: len(MAGIC)] != MAGIC) or (
+            len(self.index) and self.index[: len(INDEX_MAGIC)] != INDEX_MAGIC
+        ):
+            msg = f"{path} is not a capture segment"
+            raise ValueError(msg)
+
+    def __len__(self) -> int:
+        return max(len(self.index) - len(INDEX_MAGIC), 0) // _ENTRY.size
+
+    def entry(self, position: int) -> CaptureEntry:
+        return CaptureEntry._make(
+            _ENTRY.unpack_from(self.index, len(INDEX_MAGIC) + position * _ENTRY.size)
+        )
+
+    def entries(self) -> Iterator[CaptureEntry]:
+        end = len(INDEX_MAGIC) + len(self) * _ENTRY.size
+        view = memoryview(self.index)[len(INDEX_MAGIC) : end]
+        try:
+            for values in _ENTRY.iter_unpack(view):
+                yield CaptureEntry._make(values)
+        finally:
+            view.release()
+
+    def read(self, entry: CaptureEntry) -> Exchange | None:
+        if entry.offset + entry.length > len(self.data):
+            return None
+        length, crc = _FRAME.unpack_from(self.data, entry.offset)
+        start = entry.offset + _FRAME.size
+        payload = self.data[start : start + length]
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            logger.warning("Corrupted record at %s:%d", self.path, entry.offset)
+            return None
+        return decode_exchange(payload)
+
+    def close(self) -> None:
+        for data in (self.data, self.index):
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+
+def _map(path: Path) -> mmap.mmap | bytes:
+    if not path.exists():
+        return b""
+    with path.open("rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class CaptureReader:
+    """Reads a capture through memory maps of its segments and indexes.
+
+    The segments are mapped as they were when the reader was created.
+    Exchanges are numbered across segments in the order they were written,
+    `reader[i]` jumps straight to one of them.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str]) -> None:
+        self.__segments = [_Segment(path) for path in _segment_paths(Path(directory))]
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self.__segments)
+
+    def __getitem__(self, position: int) -> Exchange:
+        if position < 0:
+            position += len(self)
+        for segment in self.__segments:
+            if 0 <= position < len(segment):
+                exchange = segment.read(segment.entry(position))
+                if exchange is None:
+                    msg = f"Exchange {position} of {segment.path} is corrupted"
+                    raise ValueError(msg)
+                return exchange
+            position -= len(segment)
+        msg = "Capture position out of range"
+        raise IndexError(msg)
+
+    def __iter__(self) -> Iterator[Exchange]:
+        return self.find()
+
+    def find(
+        self,
+        *,
+        start: float | None = None,
+        end: float | None = None,
+        route: str | None = None,
+        vin: str | None = None,
+        vin_hash: str | None = None,
+    ) -> Iterator[Exchange]:
+        """Yield the exchanges started in [start, end] matching a route and VIN.
+
+        The VIN can be given in clear or as the hash sent to the gateway.
+        """
+        start_ms = None if start is None else round(start * 1000)
+        end_ms = None if end is None else round(end * 1000)
+        route_key = None if route is None else route_hash(route)
+        if vin is not None:
+            vin_hash = sha256_hex_digest(vin)
+        vin_key = None if vin_hash is None else vin_hash_key(vin_hash)
+
+        def selected(entry: CaptureEntry) -> bool:
+            if start_ms is not None and entry.started_ms < start_ms:
+                return False
+            if end_ms is not None and entry.started_ms > end_ms:
+                return False
+            if route_key is not None and entry.route_hash != route_key:
+                return False
+            return vin_key is None or entry.vin_hash == vin_key
+
+        for segment in self.__segments:
+            for entry in segment.entries():
+                if selected(entry) and (exchange := segment.read(entry)) is not None:
+                    yield exchange
+
+    def close(self) -> None:
+        for segment in self.__segments:
+            segment.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
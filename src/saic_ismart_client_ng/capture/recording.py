@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+import httpx
+
+from saic_ismart_client_ng.capture.exchange import Exchange
+from saic_ismart_client_ng.net.crypto import decrypt_request, decrypt_response
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Collection
+
+    from saic_ismart_client_ng.capture.exchange import ExchangeSink
+
+DEFAULT_REDACTED_HEADERS = frozenset({"authorization", "blade-auth"})
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Records every exchange going through another transport.
+
+    The log is an ExchangeLog or a CaptureWriter. Bodies are decrypted the
+    same way the client does before calling its listener, so the log holds
+    what a SaicApiListener sees, together with the method, status and
+    duration the listener does not get. The token headers are replaced by
+    "<redacted>", but the bodies are kept as they are, including the tokens
+    in login responses: keep the captures private.
+    """
+
+    def __init__(
+        self,
+        log: ExchangeSink,
+        *,
+        base_uri: str,
+        transport: httpx.AsyncBaseTransport | None = None,
+        redacted_headers: Collection[str] = DEFAULT_REDACTED_HEADERS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.__log = log
+        self.__base_uri = base_uri
+        self.__transport = transport or httpx.AsyncHTTPTransport()
+        self.__redacted_headers = {name.lower() for name in redacted_headers}
+        self.__clock = clock
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = self.__clock()
+        start = time.perf_counter()
+        content = await request.aread()
+        response = await self.__transport.handle_async_request(request)
+        response_content = await response.aread()
+        duration = time.perf_counter() - start
+
+        url = str(request.url)
+        request_body = None
+        if content:
+            request_body = decrypt_request(
+                original_request_url=url,
+                original_request_headers=request.headers,
+                original_request_content=content.decode("utf-8"),
+                base_uri=self.__base_uri,
+            ).decode("utf-8")
+        response_headers = httpx.Headers(response.headers)
+        response_body = None
+        if response_content:
+            charset = response.encoding or "utf-8"
+            response_body = response_content.decode(charset)
+            if response.is_success:
+                plain, _ = decrypt_response(
+                    original_response_content=response_body,
+                    original_response_headers=response_headers,
+                    original_response_charset=charset,
+                )
+                response_body = plain.decode(charset)
+
+        self.__log.append(
+            Exchange(
+                started=started,
+                duration=duration,
+                method=request.method,
+                path=url.replace(self.__base_uri, "/"),
+                request_headers=self.__redact(dict(request.headers)),
+                request_body=request_body,
+                status=response.status_code,
+                response_headers=self.__redact(dict(response_headers)),
+                response_body=response_body,
+            )
+        )
+        return response
+
+    async def aclose(self) -> None:
+        await self.__transport.aclose()
+
+    def __redact(self, headers: dict[str, str]) -> dict[str, str]:
+        return {
+            name: "<redacted>" if name.lower() in self.__redacted_headers else value
+            for name, value in headers.items()
+        }
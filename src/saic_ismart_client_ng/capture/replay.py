@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, defaultdict, deque
+import time
+from typing import TYPE_CHECKING
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+
+from saic_ismart_client_ng.net.crypto import encrypt_response
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Collection, Iterable
+
+    from saic_ismart_client_ng.capture.exchange import Exchange
+
+    _Key = tuple[str, str, tuple[tuple[str, str], ...]]
+
+# Headers describing the recorded body on the wire, not the decrypted body
+_WIRE_HEADERS = frozenset(
+    {"connection", "content-encoding", "content-length", "transfer-encoding"}
+)
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serves recorded exchanges back to a client, without a gateway.
+
+    A request is matched on its method, path and query parameters; requests
+    with the same key get the recorded responses in the order they were
+    recorded, so event-id handshakes replay as they happened, and the last one
+    again once they are used up. Responses are encrypted again for the
+    requesting client and delayed by the recorded duration divided by
+    `speed`, `math.inf` replaying them without any delay. Unmatched requests
+    get a 404 and are counted in `misses`.
+    """
+
+    def __init__(
+        self,
+        exchanges: Iterable[Exchange],
+        *,
+        base_uri: str,
+        speed: float = 1.0,
+        ignored_params: Collection[str] = (),
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        if speed <= 0:
+            msg = f"The replay speed must be positive, not {speed}"
+            raise ValueError(msg)
+        self.__base_uri = base_uri
+        self.__speed = speed
+        self.__ignored_params = frozenset(ignored_params)
+        self.__sleep = sleep
+        self.__pending: defaultdict[_Key, deque[Exchange]] = defaultdict(deque)
+        self.__last: dict[_Key, Exchange] = {}
+        for exchange in exchanges:
+            self.__pending[
+                self.__key(exchange.method, exchange.route, exchange.params)
+            ].append(exchange)
+        self.__served = 0
+        self.__misses: Counter[str] = Counter()
+
+    @property
+    def served(self) -> int:
+        return self.__served
+
+    @property
+    def misses(self) -> Counter[str]:
+        return self.__misses
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        url = str(request.url)
+        path = urlsplit(url.replace(self.__base_uri, "/"))
+        route = path.path
+        key = self.__key(request.method, route, tuple(sorted(parse_qsl(path.query))))
+        exchange = self.__next(key)
+        if exchange is None:
+            self.__misses[f"{request.method} {route}"] += 1
+            return httpx.Response(
+                404,
+                json={"code": 404, "message": "No recorded exchange"},
+                request=request,
+            )
+
+        if (delay := exchange.duration / self.__speed) > 0:
+            await self.__sleep(delay)
+        self.__served += 1
+        headers = httpx.Headers(
+            {
+                name: value
+                for name, value in exchange.response_headers.items()
+                if name.lower() not in _WIRE_HEADERS
+            }
+        )
+        content: str | bytes = exchange.response_body or ""
+        if content and httpx.codes.is_success(exchange.status):
+            content, _ = encrypt_response(
+                original_request_url=url,
+                original_response_headers=headers,
+                original_response_content=exchange.response_body or "",
+                response_timestamp_ms=int(time.time() * 1000),
+                base_uri=self.__base_uri,
+                tenant_id=request.headers.get("tenant-id", ""),
+                user_token=request.headers.get("blade-auth", ""),
+            )
+        return httpx.Response(
+            exchange.status, headers=headers, content=content, request=request
+        )
+
+    def __next(self, key: _Key) -> Exchange | None:
+        if pending := self.__pending.get(key):
+            self.__last[key] = pending.popleft()
+        return self.__last.get(key)
+
+    def __key(
+        self, method: str, route: str, params: tuple[tuple[str, str], ...]
+    ) -> _Key:
+        return (
+            method.upper(),
+            route,
+            tuple(p for p in params if p[0] not in self.__ignored_params),
+        )
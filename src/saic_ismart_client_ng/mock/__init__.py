@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from saic_ismart_client_ng.mock.faults import (
+    ErrorRule,
+    FixedLatency,
+    LatencyModel,
+    LogNormalLatency,
+    UniformLatency,
+)
+from saic_ismart_client_ng.mock.gateway import MockGateway, MockResponse
+from saic_ismart_client_ng.mock.simulator import SimulatedVehicle, SimulationTiming
+from saic_ismart_client_ng.mock.transport import MockGatewayTransport
+from saic_ismart_client_ng.mock.vehicle import MockVehicle, StaticVehicle, mock_vin
+
+__all__ = [
+    "ErrorRule",
+    "FixedLatency",
+    "LatencyModel",
+    "LogNormalLatency",
+    "MockGateway",
+    "MockGatewayTransport",
+    "MockResponse",
+    "MockVehicle",
+    "SimulatedVehicle",
+    "SimulationTiming",
+    "StaticVehicle",
+    "UniformLatency",
+    "mock_vin",
+]
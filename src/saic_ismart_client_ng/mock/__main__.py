@@ -0,0 +1,5 @@
+from __future__ import annotations
+
+from saic_ismart_client_ng.mock.server import main
+
+main()
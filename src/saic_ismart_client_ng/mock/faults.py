@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+from typing import TYPE_CHECKING, Protocol
+
+if TYPE_CHECKING:
+    import random
+
+
+class LatencyModel(Protocol):
+    def sample(self, rng: random.Random) -> float:
+        """Return a delay in seconds."""
+
+
+@dataclass(frozen=True, slots=True)
+class FixedLatency:
+    seconds: float = 0.0
+
+    def sample(self, _rng: random.Random) -> float:
+        return self.seconds
+
+
+@dataclass(frozen=True, slots=True)
+class UniformLatency:
+    low: float
+    high: float
+
+    def sample(self, rng: random.Random) -> float:
+        return rng.uniform(self.low, self.high)
+
+
+@dataclass(frozen=True, slots=True)
+class LogNormalLatency:
+    """Long tailed delays, as seen on the real gateway, capped at `maximum`."""
+
+    median: float
+    sigma: float = 0.5
+    maximum: float = math.inf
+
+    def sample(self, rng: random.Random) -> float:
+        return min(rng.lognormvariate(math.log(self.median), self.sigma), self.maximum)
+
+
+@dataclass(frozen=True, slots=True)
+class ErrorRule:
+    """Fails a share of the requests to some paths.
+
+    `code` is the return code of the JSON body, `http_status` the status of the
+    response. Paths are matched by prefix, e.g. "/vehicle/charging/", and an
+    empty tuple matches every path.
+    """
+
+    rate: float
+    code: int = 500
+    http_status: int = 200
+    message: str = "Injected error"
+    paths: tuple[str, ...] = ()
+
+    def applies_to(self, path: str) -> bool:
+        return not self.paths or path.startswith(self.paths)
@@ -0,0 +1,550 @@
+"""An in-process emulation of the SAIC gateway, for load and integration tests.
+
+Requests are decrypted and their APP-VERIFICATION-STRING checked exactly like
+the real gateway would, and responses are encrypted with the same scheme, so
+the whole client pipeline is exercised. Slow endpoints answer through the
+event-id handshake: the first call returns an event id, and the data is only
+handed out once the event is ready.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, deque
+from dataclasses import dataclass, field
+import datetime
+import hmac
+import itertools
+import json
+import logging
+import random
+import secrets
+import time
+from typing import TYPE_CHECKING, Any
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+
+from saic_ismart_client_ng.api.message.schema import MessageEntity, MessageResp
+from saic_ismart_client_ng.api.schema import LoginResp
+from saic_ismart_client_ng.api.vehicle.schema import VehicleListResp
+from saic_ismart_client_ng.crypto_utils import sha1_hex_digest, sha256_hex_digest
+from saic_ismart_client_ng.mock.faults import FixedLatency
+from saic_ismart_client_ng.mock.vehicle import StaticVehicle, mock_vin
+from saic_ismart_client_ng.net.codec import to_json_dict
+from saic_ismart_client_ng.net.crypto import (
+    decrypt_request,
+    encrypt_response,
+    get_app_verification_string,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterable, Mapping
+
+    from saic_ismart_client_ng.mock.faults import ErrorRule, LatencyModel
+    from saic_ismart_client_ng.mock.vehicle import MockVehicle
+
+    Handler = Callable[["_Request"], Any]
+    VehicleHandler = Callable[["MockVehicle", "_Request"], Any]
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_GROUPS = ("ALARM", "COMMAND", "NEWS")
+MESSAGE_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Return codes of the gateway
+CODE_SUCCESS = 0
+CODE_FAILURE = 2
+CODE_BAD_REQUEST = 400
+CODE_UNAUTHORIZED = 401
+
+
+@dataclass(frozen=True, slots=True)
+class MockResponse:
+    status: int
+    headers: dict[str, str]
+    content: bytes
+
+
+@dataclass(slots=True)
+class _Account:
+    username: str
+    password_hash: str
+    vehicles: dict[str, MockVehicle] = field(default_factory=dict)
+    messages: dict[str, list[MessageEntity]] = field(
+        default_factory=lambda: {group: [] for group in MESSAGE_GROUPS}
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class _Request:
+    account: _Account | None
+    params: dict[str, str]
+    body: bytes
+    now: float
+
+    def json(self) -> dict[str, Any]:
+        return json.loads(self.body) if self.body else {}
+
+
+@dataclass(slots=True)
+class _Event:
+    ready_at: float
+    payload: Any
+
+
+class _GatewayError(Exception):
+    def __init__(self, code: int, message: str, *, http_status: int = 200) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.http_status = http_status
+
+
+class MockGateway:
+    """Serves a population of mock accounts and vehicles.
+
+    Vehicles are created by `vehicle_factory` from generated VINs. Every
+    request first waits for a delay drawn from `latency`, and events become
+    ready after a delay drawn from `event_delay`. `errors` are tried in order
+    and the first matching rule that fires replaces the response.
+    """
+
+    def __init__(
+        self,
+        *,
+        base_path: str = "/api.app/v1/",
+        tenant_id: str = "459771",
+        vehicle_factory: Callable[[str], MockVehicle] = StaticVehicle,
+        latency: LatencyModel | None = None,
+        event_delay: LatencyModel | None = None,
+        errors: Iterable[ErrorRule] = (),
+        seed: int | None = None,
+        token_lifetime: int = 86400,
+        event_lifetime: float = 60.0,
+        verify_signatures: bool = True,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], Awaitable[Any]] | None = None,
+    ) -> None:
+        self.__base_path = base_path
+        self.__tenant_id = tenant_id
+        self.__vehicle_factory = vehicle_factory
+        self.__latency = latency or FixedLatency()
+        self.__event_delay = event_delay or FixedLatency()
+        self.__errors = tuple(errors)
+        self.__rng = random.Random(seed)  # noqa: S311
+        self.__token_lifetime = token_lifetime
+        self.__event_lifetime = event_lifetime
+        self.__verify_signatures = verify_signatures
+        self.__clock = clock
+        self.__sleep = sleep or asyncio.sleep
+        self.__accounts: dict[str, _Account] = {}
+        self.__vehicles: dict[str, MockVehicle] = {}
+        self.__tokens: dict[str, tuple[_Account, float]] = {}
+        self.__events: dict[str, _Event] = {}
+        self.__event_expiry: deque[tuple[float, str]] = deque()
+        self.__vin_numbers = itertools.count(1)
+        self.__event_numbers = itertools.count(1)
+        self.__message_numbers = itertools.count(1)
+        self.__request_counts: Counter[str] = Counter()
+        self.__error_counts: Counter[str] = Counter()
+        self.__routes: dict[tuple[str, str], Handler] = {
+            ("POST", "/oauth/token"): self.__login,
+            ("GET", "/vehicle/list"): self.__vehicle_list,
+            ("GET", "/message/list"): self.__message_list,
+            ("GET", "/message/unreadCount"): self.__unread_count,
+            ("PUT", "/message/status"): self.__message_status,
+        }
+        self.__event_routes: dict[tuple[str, str], VehicleHandler] = {
+            ("GET", "/vehicle/status"): self.__vehicle_status,
+            ("POST", "/vehicle/control"): self.__vehicle_control,
+            ("GET", "/vehicle/charging/status"): self.__charging_status,
+            ("GET", "/vehicle/charging/mgmtData"): self.__charging_management_data,
+            ("POST", "/vehicle/charging/control"): self.__charging_control,
+            ("POST", "/vehicle/charging/reservation"): self.__acknowledge,
+            ("POST", "/vehicle/charging/ptcHeat"): self.__acknowledge,
+            ("POST", "/vehicle/charging/setting"): self.__acknowledge,
+        }
+
+    @property
+    def request_counts(self) -> dict[str, int]:
+        """Return the number of requests received per path."""
+        return dict(self.__request_counts)
+
+    @property
+    def error_counts(self) -> dict[str, int]:
+        """Return the number of injected errors per path."""
+        return dict(self.__error_counts)
+
+    def add_account(
+        self,
+        username: str,
+        password: str,
+        *,
+        vehicles: int | Iterable[MockVehicle] = 1,
+    ) -> list[MockVehicle]:
+        """Register an account owning new vehicles, or the given ones."""
+        account = _Account(username, sha1_hex_digest(password))
+        if isinstance(vehicles, int):
+            vehicles = [
+                self.__vehicle_factory(mock_vin(next(self.__vin_numbers)))
+                for _ in range(vehicles)
+            ]
+        for vehicle in vehicles:
+            vin_hash = sha256_hex_digest(vehicle.vin)
+            account.vehicles[vin_hash] = vehicle
+            self.__vehicles[vin_hash] = vehicle
+        self.__accounts[username] = account
+        return list(account.vehicles.values())
+
+    def add_accounts(
+        self,
+        count: int,
+        *,
+        password: str = "password",  # noqa: S107
+        vehicles_per_account: int = 1,
+    ) -> list[str]:
+        """Register numbered accounts sharing a password, return their usernames."""
+        usernames = [
+            f"user{len(self.__accounts) + i:06d}@mock.local" for i in range(count)
+        ]
+        for username in usernames:
+            self.add_account(username, password, vehicles=vehicles_per_account)
+        return usernames
+
+    def vehicle(self, vin: str) -> MockVehicle | None:
+        return self.__vehicles.get(sha256_hex_digest(vin))
+
+    def add_message(
+        self,
+        username: str,
+        *,
+        group: str,
+        title: str,
+        content: str = "",
+        vin: str | None = None,
+        sender: str = "iSMART",
+    ) -> MessageEntity:
+        """Deliver a message to an account, as the newest of its group."""
+        if group not in MESSAGE_GROUPS:
+            msg = f"Unknown message group {group}"
+            raise ValueError(msg)
+        return self.__deliver(
+            self.__accounts[username],
+            group=group,
+            title=title,
+            content=content,
+            vin=vin,
+            sender=sender,
+        )
+
+    async def handle(
+        self,
+        method: str,
+        url: str,
+        headers: Mapping[str, str],
+        content: bytes,
+    ) -> MockResponse:
+        """Answer an encrypted request, `url` being the full URL with the query."""
+        parts = urlsplit(url)
+        base_uri = f"{parts.scheme}://{parts.netloc}{self.__base_path}"
+        path = "/" + parts.path.removeprefix(self.__base_path)
+        self.__request_counts[path] += 1
+        delay = self.__latency.sample(self.__rng)
+        if delay > 0:
+            await self.__sleep(delay)
+        request_headers = httpx.Headers(headers)
+        user_token = request_headers.get("blade-auth", "")
+        try:
+            if not parts.path.startswith(self.__base_path):
+                raise _GatewayError(404, "Not found", http_status=404)
+            body = self.__decrypt(url, base_uri, request_headers, content)
+            self.__inject_errors(path)
+            now = self.__clock()
+            request = _Request(
+                self.__authenticate(path, user_token, now),
+                dict(parse_qsl(parts.query)),
+                body,
+                now,
+            )
+            handler = self.__routes.get((method, path))
+            if handler is not None:
+                return self.__reply(url, base_uri, user_token, data=handler(request))
+            vehicle_handler = self.__event_routes.get((method, path))
+            if vehicle_handler is None:
+                raise _GatewayError(404, "Not found", http_status=404)
+            return self.__handle_event(
+                vehicle_handler,
+                request,
+                url=url,
+                base_uri=base_uri,
+                user_token=user_token,
+                event_id=request_headers.get("event-id", "0"),
+            )
+        except _GatewayError as e:
+            if e.http_status != 200:
+                return _plain_response(e.http_status, e.code, e.message)
+            return self.__reply(
+                url, base_uri, user_token, code=e.code, message=e.message
+            )
+
+    def __decrypt(
+        self, url: str, base_uri: str, headers: httpx.Headers, content: bytes
+    ) -> bytes:
+        try:
+            body = decrypt_request(
+                original_request_url=url,
+                original_request_headers=headers,
+                original_request_content=content.decode("utf-8"),
+                base_uri=base_uri,
+            ).strip()
+        except (KeyError, ValueError, UnicodeDecodeError) as e:
+            raise _GatewayError(
+                CODE_BAD_REQUEST, "Malformed request", http_status=400
+            ) from e
+        if self.__verify_signatures:
+            expected = get_app_verification_string(
+                request_path=url.replace(base_uri, "/"),
+                current_ts=headers.get("APP-SEND-DATE", ""),
+                tenant_id=headers.get("tenant-id", ""),
+                content_type=headers.get("ORIGINAL-CONTENT-TYPE", ""),
+                request_content=body.decode("utf-8"),
+                user_token=headers.get("blade-auth", ""),
+            )
+            signature = headers.get("APP-VERIFICATION-STRING", "")
+            if not hmac.compare_digest(expected, signature):
+                raise _GatewayError(
+                    CODE_BAD_REQUEST, "Invalid signature", http_status=400
+                )
+        return body
+
+    def __inject_errors(self, path: str) -> None:
+        for rule in self.__errors:
+            if rule.applies_to(path) and self.__rng.random() < rule.rate:
+                self.__error_counts[path] += 1
+                raise _GatewayError(
+                    rule.code, rule.message, http_status=rule.http_status
+                )
+
+    def __authenticate(self, path: str, user_token: str, now: float) -> _Account | None:
+        if path == "/oauth/token":
+            return None
+        account, expires_at = self.__tokens.get(user_token, (None, 0.0))
+        if account is None or expires_at < now:
+            raise _GatewayError(CODE_UNAUTHORIZED, "Unauthorized")
+        return account
+
+    def __handle_event(
+        self,
+        handler: VehicleHandler,
+        request: _Request,
+        *,
+        url: str,
+        base_uri: str,
+        user_token: str,
+        event_id: str,
+    ) -> MockResponse:
+        now = request.now
+        self.__expire_events(now)
+        if event_id == "0":
+            # The request reaches the vehicle now, the answer is collected later
+            vehicle = self.__vehicle_of(request)
+            event_id = str(next(self.__event_numbers))
+            ready_at = (
+                now
+                + self.__event_delay.sample(self.__rng)
+                + vehicle.response_delay(now)
+            )
+            self.__events[event_id] = _Event(ready_at, handler(vehicle, request))
+            self.__event_expiry.append((ready_at + self.__event_lifetime, event_id))
+            return self.__reply(url, base_uri, user_token, event_id=event_id)
+        event = self.__events.get(event_id)
+        if event is None:
+            raise _GatewayError(CODE_FAILURE, "Unknown or expired event")
+        if event.ready_at > now:
+            return self.__reply(url, base_uri, user_token, event_id=event_id)
+        del self.__events[event_id]
+        return self.__reply(url, base_uri, user_token, data=event.payload)
+
+    def __expire_events(self, now: float) -> None:
+        expiry = self.__event_expiry
+        while expiry and expiry[0][0] < now:
+            self.__events.pop(expiry.popleft()[1], None)
+
+    def __reply(
+        self,
+        url: str,
+        base_uri: str,
+        user_token: str,
+        *,
+        code: int = CODE_SUCCESS,
+        message: str = "success",
+        data: Any = None,
+        event_id: str | None = None,
+    ) -> MockResponse:
+        body: dict[str, Any] = {"code": code, "message": message}
+        if data is not None:
+            body["data"] = to_json_dict(data)
+        content, headers = encrypt_response(
+            original_request_url=url,
+            original_response_headers={"Content-Type": "application/json"},
+            original_response_content=json.dumps(body, separators=(",", ":")),
+            response_timestamp_ms=int(self.__clock() * 1000),
+            base_uri=base_uri,
+            tenant_id=self.__tenant_id,
+            user_token=user_token,
+        )
+        if event_id is not None:
+            headers["event-id"] = event_id
+        return MockResponse(
+            200,
+            dict(headers),
+            content if isinstance(content, bytes) else content.encode("utf-8"),
+        )
+
+    def __vehicle_of(self, request: _Request) -> MockVehicle:
+        account = request.account
+        vin_hash = request.params.get("vin") or request.json().get("vin")
+        vehicle = account.vehicles.get(vin_hash or "") if account is not None else None
+        if vehicle is None:
+            raise _GatewayError(CODE_FAILURE, "Vehicle not found")
+        return vehicle
+
+    def __login(self, request: _Request) -> LoginResp:
+        form = dict(parse_qsl(request.body.decode("utf-8")))
+        account = self.__accounts.get(form.get("username", ""))
+        if account is None or not hmac.compare_digest(
+            account.password_hash, form.get("password", "")
+        ):
+            raise _GatewayError(CODE_FAILURE, "Wrong username or password")
+        token = secrets.token_hex(16)
+        self.__tokens[token] = (account, request.now + self.__token_lifetime)
+        return LoginResp(
+            access_token=token,
+            account=account.username,
+            expires_in=self.__token_lifetime,
+            tenant_id=self.__tenant_id,
+            token_type="bearer",  # noqa: S106
+            user_name=account.username,
+        )
+
+    def __vehicle_list(self, request: _Request) -> VehicleListResp:
+        account = request.account
+        vehicles = account.vehicles.values() if account is not None else ()
+        return VehicleListResp(vinList=[vehicle.vin_info() for vehicle in vehicles])
+
+    def __vehicle_status(self, vehicle: MockVehicle, request: _Request) -> Any:
+        return vehicle.vehicle_status(request.now)
+
+    def __vehicle_control(self, vehicle: MockVehicle, request: _Request) -> Any:
+        body = request.json()
+        result = vehicle.control(body, request.now)
+        if request.account is not None:
+            self.__deliver(
+                request.account,
+                group="COMMAND",
+                title="Remote control",
+                content=f"Command {body.get('rvcReqType')} executed successfully",
+                vin=vehicle.vin,
+            )
+        return result
+
+    def __charging_status(self, vehicle: MockVehicle, request: _Request) -> Any:
+        return vehicle.charging_status(request.now)
+
+    def __charging_management_data(
+        self, vehicle: MockVehicle, request: _Request
+    ) -> Any:
+        return vehicle.charging_management_data(request.now)
+
+    def __charging_control(self, vehicle: MockVehicle, request: _Request) -> Any:
+        return vehicle.charging_control(request.json(), request.now)
+
+    def __acknowledge(self, _vehicle: MockVehicle, _request: _Request) -> Any:
+        return {}
+
+    def __message_list(self, request: _Request) -> MessageResp:
+        group = request.params.get("messageGroup", "")
+        messages = (
+            request.account.messages.get(group, [])
+            if request.account is not None
+            else []
+        )
+        page_num = max(1, int(request.params.get("pageNum", "1")))
+        page_size = max(1, int(request.params.get("pageSize", "20")))
+        # Stored oldest first, listed newest first
+        end = max(0, len(messages) - (page_num - 1) * page_size)
+        page = messages[max(0, end - page_size) : end][::-1]
+        return MessageResp(
+            messages=page, recordsNumber=len(page), totalNumber=len(messages)
+        )
+
+    def __unread_count(self, request: _Request) -> MessageResp:
+        account = request.account
+        unread = {
+            group: sum(1 for m in messages if m.readStatus == 0)
+            for group, messages in (account.messages.items() if account else ())
+        }
+        return MessageResp(
+            alarmNumber=unread.get("ALARM", 0),
+            commandNumber=unread.get("COMMAND", 0),
+            newsNumber=unread.get("NEWS", 0),
+        )
+
+    def __message_status(self, request: _Request) -> None:
+        account = request.account
+        if account is None:
+            return
+        body = request.json()
+        action = body.get("actionType")
+        message_id = str(body.get("messageId"))
+        if action and action.startswith("DELETE_"):
+            account.messages[action.removeprefix("DELETE_")] = []
+            return
+        for messages in account.messages.values():
+            for index, message in enumerate(messages):
+                if str(message.messageId) != message_id:
+                    continue
+                if action == "READ":
+                    message.readStatus = 1
+                elif action == "DELETE":
+                    del messages[index]
+                else:
+                    raise _GatewayError(CODE_FAILURE, f"Unknown action {action}")
+                return
+        raise _GatewayError(CODE_FAILURE, "Message not found")
+
+    def __deliver(
+        self,
+        account: _Account,
+        *,
+        group: str,
+        title: str,
+        content: str,
+        vin: str | None,
+        sender: str = "iSMART",
+    ) -> MessageEntity:
+        now = self.__clock()
+        message = MessageEntity(
+            content=content,
+            createTime=int(now * 1000),
+            messageId=str(next(self.__message_numbers)),
+            messageTime=datetime.datetime.fromtimestamp(now, tz=datetime.UTC).strftime(
+                MESSAGE_TIME_FORMAT
+            ),
+            messageType=group,
+            readStatus=0,
+            sender=sender,
+            title=title,
+            vin=sha256_hex_digest(vin) if vin is not None else None,
+        )
+        account.messages[group].append(message)
+        return message
+
+
+def _plain_response(status: int, code: int, message: str) -> MockResponse:
+    return MockResponse(
+        status,
+        {"Content-Type": "application/json;charset=utf-8"},
+        json.dumps({"code": code, "message": message}).encode("utf-8"),
+    )
@@ -0,0 +1,135 @@
+"""Serve a MockGateway over HTTP, for load tests from other processes.
+
+Run `python -m saic_ismart_client_ng.mock --accounts 1000` and point the
+clients at http://127.0.0.1:8080/api.app/v1/ with the printed credentials.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+from http import HTTPStatus
+import logging
+from typing import TYPE_CHECKING
+
+from saic_ismart_client_ng.mock.faults import ErrorRule, LogNormalLatency
+from saic_ismart_client_ng.mock.gateway import MockGateway
+from saic_ismart_client_ng.mock.simulator import SimulatedVehicle
+from saic_ismart_client_ng.mock.vehicle import StaticVehicle
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_LINES = 100
+
+
+async def serve(
+    gateway: MockGateway, host: str = "127.0.0.1", port: int = 8080
+) -> asyncio.Server:
+    """Start serving the gateway, with HTTP/1.1 keep-alive connections."""
+
+    async def on_connection(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while await _serve_one(gateway, reader, writer):
+                pass
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError:
+            logger.exception("Malformed request")
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(on_connection, host, port)
+
+
+async def _serve_one(
+    gateway: MockGateway, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> bool:
+    request_line = await reader.readline()
+    if not request_line:
+        return False
+    method, target, version = request_line.decode("latin-1").split()
+    headers: dict[str, str] = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = (await reader.readline()).decode("latin-1").rstrip("\r\n")
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip()] = value.strip()
+    lower = {name.lower(): value for name, value in headers.items()}
+    content = await reader.readexactly(int(lower.get("content-length", "0")))
+    host = lower.get("host", "localhost")
+    response = await gateway.handle(method, f"http://{host}{target}", headers, content)
+
+    keep_alive = (
+        lower.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+    )
+    head = [f"HTTP/1.1 {response.status} {HTTPStatus(response.status).phrase}"]
+    head.extend(
+        f"{name}: {value}"
+        for name, value in response.headers.items()
+        if name.lower() not in ("content-length", "connection")
+    )
+    head.append(f"Content-Length: {len(response.content)}")
+    head.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + response.content)
+    await writer.drain()
+    return keep_alive
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a mock SAIC gateway")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--accounts", type=int, default=1)
+    parser.add_argument("--vehicles-per-account", type=int, default=1)
+    parser.add_argument("--password", default="password")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="median delay in seconds"
+    )
+    parser.add_argument(
+        "--event-delay", type=float, default=0.0, help="median event delay in seconds"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument(
+        "--simulated",
+        action="store_true",
+        help="vehicles react to commands instead of always reporting the same status",
+    )
+    args = parser.parse_args(argv)
+
+    gateway = MockGateway(
+        vehicle_factory=SimulatedVehicle if args.simulated else StaticVehicle,
+        latency=LogNormalLatency(args.latency) if args.latency > 0 else None,
+        event_delay=LogNormalLatency(args.event_delay)
+        if args.event_delay > 0
+        else None,
+        errors=[ErrorRule(args.error_rate)] if args.error_rate > 0 else (),
+        seed=args.seed,
+    )
+    usernames = gateway.add_accounts(
+        args.accounts,
+        password=args.password,
+        vehicles_per_account=args.vehicles_per_account,
+    )
+    print(  # noqa: T201
+        f"{len(usernames)} accounts, from {usernames[0]} to {usernames[-1]}, "
+        f"password {args.password!r}"
+        if usernames
+        else "No accounts"
+    )
+
+    async def run() -> None:
+        server = await serve(gateway, args.host, args.port)
+        print(f"Listening on http://{args.host}:{args.port}/api.app/v1/")  # noqa: T201
+        async with server:
+            await server.serve_forever()
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(run())
@@ -0,0 +1,464 @@
+"""A mock vehicle that reacts to the commands it receives.
+
+Commands take effect after the delays a real vehicle shows, the vehicle falls
+asleep when left alone and charging moves the state of charge over time. The
+state only depends on the times of the requests, so a run against a gateway
+with a fake clock is reproducible.
+"""
+
+from __future__ import annotations
+
+import base64
+from dataclasses import dataclass
+import heapq
+import itertools
+from typing import TYPE_CHECKING, Any
+
+from saic_ismart_client_ng.api.vehicle.locks.schema import VehicleLockId
+from saic_ismart_client_ng.api.vehicle.schema import (
+    BasicVehicleStatus,
+    RvcParamsId,
+    RvcReqType,
+    VehicleControlResp,
+    VehicleStatusResp,
+)
+from saic_ismart_client_ng.api.vehicle_charging.schema import (
+    BmsChargingStatusCode,
+    ChargeStatusResp,
+    ChargingControlResp,
+    ChargingStatus,
+    ChrgMgmtData,
+    ChrgMgmtDataResp,
+    RvsChargeStatus,
+    TargetBatteryCode,
+)
+from saic_ismart_client_ng.mock.vehicle import (
+    DEFAULT_LATITUDE,
+    DEFAULT_LONGITUDE,
+    StaticVehicle,
+    encode_rvc_value,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+# remoteClimateStatus values
+CLIMATE_OFF = 0
+CLIMATE_BLOWING = 1
+CLIMATE_ON = 2
+CLIMATE_FRONT_DEFROST = 5
+
+_WINDOW_FIELDS = {
+    RvcParamsId.WINDOW_SUNROOF.value: "sunroof",
+    RvcParamsId.WINDOW_DRIVER.value: "driver_window",
+    RvcParamsId.WINDOW_2.value: "passenger_window",
+    RvcParamsId.WINDOW_3.value: "rear_left_window",
+    RvcParamsId.WINDOW_4.value: "rear_right_window",
+}
+_CHARGING = BmsChargingStatusCode.CHARGING_1.value
+_COMFORT_TEMPERATURE = 22.0
+# Degrees per second
+_CLIMATE_RATE = 0.5 / 60
+_DRIFT_RATE = 0.05 / 60
+_RANGE_KM_PER_PERCENT = 4.1
+
+
+@dataclass(frozen=True, slots=True)
+class SimulationTiming:
+    """Delays of the simulated vehicle, in seconds."""
+
+    wake_up: float = 10.0
+    stay_awake: float = 300.0
+    actuation: float = 2.0
+    climate: float = 30.0
+    charge_start: float = 20.0
+
+
+@dataclass(slots=True)
+class _State:
+    soc: float
+    plugged_in: bool
+    target_soc_code: int
+    lock_status: int = 1
+    boot_status: int = 0
+    driver_window: int = 0
+    passenger_window: int = 0
+    rear_left_window: int = 0
+    rear_right_window: int = 0
+    sunroof: int = 0
+    front_left_seat_heat: int = 0
+    front_right_seat_heat: int = 0
+    rear_window_heat: int = 0
+    climate: int = CLIMATE_OFF
+    exterior_temperature: float = 18.0
+    interior_temperature: float = 18.0
+    charging_status: int = BmsChargingStatusCode.CONNECTED_NOT_CHARGING.value
+    charge_port_locked: int = 0
+    energy_since_charge_kwh: float = 0.0
+
+
+class SimulatedVehicle(StaticVehicle):
+    """A vehicle whose status follows the commands sent to it.
+
+    Locks, windows, heated seats, rear window heating and climate commands
+    change the reported status after `timing.actuation`, or `timing.climate`
+    for the climate. Starting a charge moves bmsChrgSts to connecting, then to
+    charging after `timing.charge_start`; the state of charge then grows with
+    `charging_power_kw` until the target is reached. A new command for a part
+    of the vehicle replaces the changes still pending for that part.
+
+    The vehicle falls asleep `timing.stay_awake` seconds after the last
+    request, and needs `timing.wake_up` more seconds to answer the next one.
+    """
+
+    def __init__(
+        self,
+        vin: str,
+        *,
+        timing: SimulationTiming | None = None,
+        soc: float = 50.0,
+        capacity_kwh: float = 64.0,
+        charging_power_kw: float = 7.0,
+        plugged_in: bool = True,
+        latitude: int = DEFAULT_LATITUDE,
+        longitude: int = DEFAULT_LONGITUDE,
+    ) -> None:
+        super().__init__(vin, soc=soc, latitude=latitude, longitude=longitude)
+        self.__timing = timing or SimulationTiming()
+        self.__capacity_kwh = capacity_kwh
+        self.__charging_power_kw = charging_power_kw
+        self.__state = _State(
+            soc=soc,
+            plugged_in=plugged_in,
+            target_soc_code=TargetBatteryCode.P_100.value,
+            charging_status=(
+                BmsChargingStatusCode.CONNECTED_NOT_CHARGING.value
+                if plugged_in
+                else BmsChargingStatusCode.UNPLUGGED.value
+            ),
+        )
+        self.__pending: list[tuple[float, int, str, Any]] = []
+        self.__sequence = itertools.count()
+        self.__time: float | None = None
+        self.__awake_until = float("-inf")
+        self.__reachable_at = float("-inf")
+
+    def is_awake(self, now: float) -> bool:
+        return now < self.__awake_until
+
+    def soc(self, now: float) -> float:
+        self.__advance(now)
+        return self.__state.soc
+
+    def plug_in(self, now: float, *, plugged_in: bool = True) -> None:
+        """Connect or disconnect the charging cable."""
+        self.__advance(now)
+        self.__state.plugged_in = plugged_in
+        self.__schedule(
+            now,
+            charging_status=(
+                BmsChargingStatusCode.CONNECTED_NOT_CHARGING.value
+                if plugged_in
+                else BmsChargingStatusCode.UNPLUGGED.value
+            ),
+        )
+
+    def response_delay(self, now: float) -> float:
+        self.__advance(now)
+        delay = 0.0 if self.is_awake(now) else self.__timing.wake_up
+        self.__reachable_at = now + delay
+        self.__awake_until = self.__reachable_at + self.__timing.stay_awake
+        return delay
+
+    def vehicle_status(self, now: float) -> VehicleStatusResp:
+        self.__advance(now)
+        return VehicleStatusResp(
+            basicVehicleStatus=self.basic_vehicle_status_at(now),
+            gpsPosition=self.gps_position(now),
+            statusTime=int(now),
+        )
+
+    def basic_vehicle_status_at(self, now: float) -> BasicVehicleStatus:
+        state = self.__state
+        return BasicVehicleStatus(
+            batteryVoltage=142,
+            bonnetStatus=0,
+            bootStatus=state.boot_status,
+            canBusActive=1 if self.is_awake(now) else 0,
+            driverDoor=0,
+            driverWindow=state.driver_window,
+            engineStatus=0,
+            exteriorTemperature=round(state.exterior_temperature),
+            frontLeftSeatHeatLevel=state.front_left_seat_heat,
+            frontRightSeatHeatLevel=state.front_right_seat_heat,
+            fuelRangeElec=self.__range_km() * 10,
+            handBrake=1,
+            interiorTemperature=round(state.interior_temperature),
+            lockStatus=state.lock_status,
+            mileage=123456,
+            passengerDoor=0,
+            passengerWindow=state.passenger_window,
+            powerMode=0,
+            rearLeftWindow=state.rear_left_window,
+            rearRightWindow=state.rear_right_window,
+            remoteClimateStatus=state.climate,
+            rmtHtdRrWndSt=state.rear_window_heat,
+            sunroofStatus=state.sunroof,
+            vehicleAlarmStatus=2 if state.lock_status else 0,
+        )
+
+    def charging_status(self, now: float) -> ChargeStatusResp:
+        self.__advance(now)
+        state = self.__state
+        return ChargeStatusResp(
+            chargingStatus=ChargingStatus(
+                chargingGunState=int(state.plugged_in),
+                chargingState=int(state.charging_status == _CHARGING),
+                chargingType=1 if state.plugged_in else 0,
+                fuelRangeElec=self.__range_km() * 10,
+                mileage=123456,
+                powerLevelPrc=round(state.soc),
+                powerUsageSinceLastCharge=round(state.energy_since_charge_kwh * 10),
+                realtimePower=round(self.__power_kw() * 10),
+                totalBatteryCapacity=round(self.__capacity_kwh * 10),
+            ),
+            gpsPosition=self.gps_position(now),
+            statusTime=int(now),
+        )
+
+    def charging_management_data(self, now: float) -> ChrgMgmtDataResp:
+        self.__advance(now)
+        state = self.__state
+        charging = state.charging_status == _CHARGING
+        voltage = 350.0 + state.soc * 0.6
+        # Current flowing into the pack is negative
+        current = -self.__power_kw() * 1000.0 / voltage
+        remaining_minutes = (
+            round(
+                (self.__target_soc() - state.soc)
+                / 100
+                * self.__capacity_kwh
+                / self.__charging_power_kw
+                * 60
+            )
+            if charging
+            else 0
+        )
+        return ChrgMgmtDataResp(
+            chrgMgmtData=ChrgMgmtData(
+                bmsChrgSts=state.charging_status,
+                bmsEstdElecRng=self.__range_km(),
+                bmsOnBdChrgTrgtSOCDspCmd=state.target_soc_code,
+                bmsPackCrnt=round((current + 1000.0) / 0.05),
+                bmsPackSOCDsp=round(state.soc * 10),
+                bmsPackVol=round(voltage / 0.25),
+                ccuEleccLckCtrlDspCmd=state.charge_port_locked,
+                ccuOffBdChrgrPlugOn=0,
+                ccuOnbdChrgrPlugOn=int(state.plugged_in),
+                chrgngRmnngTime=remaining_minutes,
+            ),
+            rvsChargeStatus=RvsChargeStatus(
+                chargingGunState=int(state.plugged_in),
+                fuelRangeElec=self.__range_km() * 10,
+                mileage=123456,
+                powerUsageSinceLastCharge=round(state.energy_since_charge_kwh * 10),
+                realtimePower=round(self.__power_kw() * 10),
+                totalBatteryCapacity=round(self.__capacity_kwh * 10),
+            ),
+        )
+
+    def control(self, request: Mapping[str, Any], now: float) -> VehicleControlResp:
+        self.__advance(now)
+        req_type = str(request.get("rvcReqType"))
+        params = _decode_params(request.get("rvcParams"))
+        # Commands reach the vehicle once it is awake
+        reached = max(now, self.__reachable_at)
+        at = reached + self.__timing.actuation
+        match req_type:
+            case RvcReqType.CLOSE_LOCKS.value:
+                self.__schedule(at, lock_status=1, boot_status=0)
+            case RvcReqType.OPEN_LOCKS.value:
+                if (
+                    params.get(RvcParamsId.LOCK_ID.value)
+                    == VehicleLockId.TAILGATE.value
+                ):
+                    self.__schedule(at, boot_status=1)
+                else:
+                    self.__schedule(at, lock_status=0)
+            case RvcReqType.WINDOWS.value:
+                position = (
+                    1 if params.get(RvcParamsId.WINDOW_OPEN_CLOSE.value, 0) else 0
+                )
+                self.__schedule(
+                    at,
+                    **{
+                        name: position
+                        for param_id, name in _WINDOW_FIELDS.items()
+                        if params.get(param_id)
+                    },
+                )
+            case RvcReqType.HEATED_SEATS.value:
+                self.__schedule(
+                    at,
+                    front_left_seat_heat=params.get(
+                        RvcParamsId.HEATED_SEAT_DRIVER.value, 0
+                    ),
+                    front_right_seat_heat=params.get(
+                        RvcParamsId.HEATED_SEAT_PASSENGER.value, 0
+                    ),
+                )
+            case RvcReqType.REMOTE_HEAT_REAR_WINDOW.value:
+                self.__schedule(
+                    at,
+                    rear_window_heat=params.get(
+                        RvcParamsId.REMOTE_HEAT_REAR_WINDOW.value, 0
+                    ),
+                )
+            case RvcReqType.CLIMATE.value:
+                climate = _climate_status(params)
+                self.__schedule(
+                    reached + self.__timing.climate if climate else at,
+                    climate=climate,
+                )
+            case _:
+                pass
+        return VehicleControlResp(
+            basicVehicleStatus=self.basic_vehicle_status_at(now),
+            failureType=0,
+            gpsPosition=self.gps_position(now),
+            rvcReqSts=encode_rvc_value(1),
+            rvcReqType=encode_rvc_value(int(req_type) if req_type.isdigit() else 0),
+        )
+
+    def charging_control(
+        self, request: Mapping[str, Any], now: float
+    ) -> ChargingControlResp:
+        self.__advance(now)
+        state = self.__state
+        at = max(now, self.__reachable_at) + self.__timing.actuation
+        match request.get("chrgCtrlReq"):
+            case 1 if state.plugged_in and state.soc < self.__target_soc():
+                self.__schedule(at, energy_since_charge_kwh=0.0)
+                self.__schedule_sequence(
+                    "charging_status",
+                    (at, BmsChargingStatusCode.CONNECTING.value),
+                    (at + self.__timing.charge_start, _CHARGING),
+                )
+            case 2 if state.plugged_in:
+                self.__schedule(
+                    at,
+                    charging_status=BmsChargingStatusCode.CONNECTED_NOT_CHARGING.value,
+                )
+            case _:
+                pass
+        match request.get("tboxEleccLckCtrlReq"):
+            case 1:
+                self.__schedule(at, charge_port_locked=1)
+            case 2:
+                self.__schedule(at, charge_port_locked=0)
+            case _:
+                pass
+        return ChargingControlResp(
+            bmsChrgSts=state.charging_status,
+            bmsOnBdChrgTrgtSOCDspCmd=state.target_soc_code,
+            bmsPackSOCDsp=round(state.soc * 10),
+            ccuEleccLckCtrlDspCmd=state.charge_port_locked,
+        )
+
+    def __schedule(self, at: float, **changes: Any) -> None:
+        for name, value in changes.items():
+            self.__schedule_sequence(name, (at, value))
+
+    def __schedule_sequence(self, name: str, *changes: tuple[float, Any]) -> None:
+        # The last command for a part of the vehicle wins
+        pending = [change for change in self.__pending if change[2] != name]
+        if len(pending) != len(self.__pending):
+            heapq.heapify(pending)
+            self.__pending = pending
+        for at, value in changes:
+            heapq.heappush(self.__pending, (at, next(self.__sequence), name, value))
+
+    def __advance(self, now: float) -> None:
+        if self.__time is None:
+            self.__time = now
+        pending = self.__pending
+        while pending and pending[0][0] <= now:
+            at, _, name, value = heapq.heappop(pending)
+            self.__integrate(at)
+            setattr(self.__state, name, value)
+        self.__integrate(now)
+
+    def __integrate(self, until: float) -> None:
+        """Evolve the continuous parts of the state up to a time."""
+        since = self.__time if self.__time is not None else until
+        elapsed = until - since
+        if elapsed <= 0:
+            return
+        self.__time = until
+        state = self.__state
+        if state.climate in (CLIMATE_ON, CLIMATE_FRONT_DEFROST):
+            state.interior_temperature = _approach(
+                state.interior_temperature,
+                _COMFORT_TEMPERATURE,
+                _CLIMATE_RATE * elapsed,
+            )
+        else:
+            state.interior_temperature = _approach(
+                state.interior_temperature,
+                state.exterior_temperature,
+                _DRIFT_RATE * elapsed,
+            )
+        if state.charging_status != _CHARGING:
+            return
+        target = self.__target_soc()
+        energy_kwh = self.__charging_power_kw * elapsed / 3600
+        gain = energy_kwh / self.__capacity_kwh * 100
+        if state.soc + gain >= target:
+            energy_kwh = (target - state.soc) / 100 * self.__capacity_kwh
+            state.soc = target
+            state.charging_status = BmsChargingStatusCode.CHARGE_DONE.value
+        else:
+            state.soc += gain
+        state.energy_since_charge_kwh += energy_kwh
+
+    def __target_soc(self) -> float:
+        return float(TargetBatteryCode(self.__state.target_soc_code).percentage)
+
+    def __power_kw(self) -> float:
+        return (
+            self.__charging_power_kw
+            if self.__state.charging_status == _CHARGING
+            else 0.0
+        )
+
+    def __range_km(self) -> int:
+        return round(self.__state.soc * _RANGE_KM_PER_PERCENT)
+
+
+def _decode_params(params: Any) -> dict[int, int]:
+    if not params:
+        return {}
+    return {
+        int(param["paramId"]): int.from_bytes(
+            base64.b64decode(param["paramValue"]), "big"
+        )
+        for param in params
+    }
+
+
+def _climate_status(params: Mapping[int, int]) -> int:
+    fan_speed = params.get(RvcParamsId.FAN_SPEED.value, 0)
+    ac_on = params.get(RvcParamsId.AC_ON_OFF.value)
+    if fan_speed == 0:
+        return CLIMATE_OFF
+    if ac_on == 0:
+        return CLIMATE_BLOWING
+    if fan_speed == 5 and ac_on == 1:
+        return CLIMATE_FRONT_DEFROST
+    return CLIMATE_ON
+
+
+def _approach(value: float, target: float, step: float) -> float:
+    if value < target:
+        return min(value + step, target)
+    return max(value - step, target)
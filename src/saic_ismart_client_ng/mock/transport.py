@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import httpx
+
+if TYPE_CHECKING:
+    from saic_ismart_client_ng.mock.gateway import MockGateway
+
+
+class MockGatewayTransport(httpx.AsyncBaseTransport):
+    """Routes the requests of an httpx client to a MockGateway, without sockets.
+
+    Pass it as the `transport` of the API to run it against the gateway.
+    """
+
+    def __init__(self, gateway: MockGateway) -> None:
+        self.__gateway = gateway
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        content = await request.aread()
+        response = await self.__gateway.handle(
+            request.method, str(request.url), request.headers, content
+        )
+        return httpx.Response(
+            response.status,
+            headers=response.headers,
+            content=response.content,
+            request=request,
+        )
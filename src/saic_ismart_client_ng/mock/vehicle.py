@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import base64
+from typing import TYPE_CHECKING, Any, Protocol
+
+from saic_ismart_client_ng.api.schema import GpsPosition
+from saic_ismart_client_ng.api.vehicle.schema import (
+    BasicVehicleStatus,
+    VehicleControlResp,
+    VehicleModelConfiguration,
+    VehicleStatusResp,
+    VinInfo,
+)
+from saic_ismart_client_ng.api.vehicle_charging.schema import (
+    ChargeStatusResp,
+    ChargingControlResp,
+    ChargingStatus,
+    ChrgMgmtData,
+    ChrgMgmtDataResp,
+    RvsChargeStatus,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+
+class MockVehicle(Protocol):
+    """A vehicle served by the mock gateway.
+
+    `now` is the wall clock time of the request in seconds. Requests are the
+    decrypted JSON bodies sent by the client.
+    """
+
+    @property
+    def vin(self) -> str: ...
+
+    def response_delay(self, now: float) -> float:
+        """Return the extra time needed to answer a request, e.g. to wake up."""
+
+    def vin_info(self) -> VinInfo: ...
+
+    def vehicle_status(self, now: float) -> VehicleStatusResp: ...
+
+    def charging_status(self, now: float) -> ChargeStatusResp: ...
+
+    def charging_management_data(self, now: float) -> ChrgMgmtDataResp: ...
+
+    def control(self, request: Mapping[str, Any], now: float) -> VehicleControlResp: ...
+
+    def charging_control(
+        self, request: Mapping[str, Any], now: float
+    ) -> ChargingControlResp: ...
+
+
+def mock_vin(index: int) -> str:
+    """Return the VIN of the index-th generated vehicle."""
+    return f"LSJWMOCK{index:09d}"
+
+
+def encode_rvc_value(value: int) -> str:
+    """Encode an integer the way the gateway reports rvcReqType and rvcReqSts."""
+    return base64.b64encode(
+        value.to_bytes(max(1, (value.bit_length() + 7) // 8), "big")
+    ).decode("ascii")
+
+
+# Ready to drive, parked in Milan
+DEFAULT_LATITUDE = 45485072
+DEFAULT_LONGITUDE = 9160267
+
+
+class StaticVehicle:
+    """A parked vehicle whose status never changes.
+
+    Commands are acknowledged as successful without any effect, which is
+    enough to exercise the request pipeline.
+    """
+
+    def __init__(
+        self,
+        vin: str,
+        *,
+        soc: float = 80.0,
+        mileage_km: float = 12345.6,
+        latitude: int = DEFAULT_LATITUDE,
+        longitude: int = DEFAULT_LONGITUDE,
+    ) -> None:
+        self.__vin = vin
+        self.__soc = soc
+        self.__mileage_km = mileage_km
+        self.__latitude = latitude
+        self.__longitude = longitude
+
+    @property
+    def vin(self) -> str:
+        return self.__vin
+
+    def response_delay(self, _now: float) -> float:
+        return 0.0
+
+    def vin_info(self) -> VinInfo:
+        return VinInfo(
+            vin=self.__vin,
+            brandName="MG",
+            modelName="MG4 ELECTRIC",
+            modelYear="2023",
+            name=f"Mock {self.__vin[-4:]}",
+            series="EH32 S",
+            isActivate=True,
+            isCurrentVehicle=False,
+            isSubaccount=False,
+            vehicleModelConfiguration=[
+                VehicleModelConfiguration("BATTERY", "BATTERY", "1"),
+                VehicleModelConfiguration("BType", "Battery", "1"),
+                VehicleModelConfiguration("J17", "Heated seats", "1"),
+                VehicleModelConfiguration("S35", "Sunroof", "0"),
+            ],
+        )
+
+    def basic_vehicle_status(self) -> BasicVehicleStatus:
+        return BasicVehicleStatus(
+            batteryVoltage=142,
+            bonnetStatus=0,
+            bootStatus=0,
+            canBusActive=0,
+            driverDoor=0,
+            driverWindow=0,
+            engineStatus=0,
+            exteriorTemperature=18,
+            fuelRangeElec=round(self.__soc * 4.1 * 10),
+            handBrake=1,
+            interiorTemperature=21,
+            lockStatus=1,
+            mileage=round(self.__mileage_km * 10),
+            passengerDoor=0,
+            passengerWindow=0,
+            powerMode=0,
+            remoteClimateStatus=0,
+            sunroofStatus=0,
+            vehicleAlarmStatus=2,
+        )
+
+    def gps_position(self, now: float) -> GpsPosition:
+        return GpsPosition(
+            gpsStatus=2,
+            timeStamp=int(now),
+            wayPoint=GpsPosition.WayPoint(
+                heading=0,
+                hdop=7,
+                satellites=10,
+                speed=0,
+                position=GpsPosition.WayPoint.Position(
+                    altitude=115, latitude=self.__latitude, longitude=self.__longitude
+                ),
+            ),
+        )
+
+    def vehicle_status(self, now: float) -> VehicleStatusResp:
+        return VehicleStatusResp(
+            basicVehicleStatus=self.basic_vehicle_status(),
+            gpsPosition=self.gps_position(now),
+            statusTime=int(now),
+        )
+
+    def charging_status(self, now: float) -> ChargeStatusResp:
+        return ChargeStatusResp(
+            chargingStatus=ChargingStatus(
+                chargingGunState=0,
+                chargingState=0,
+                chargingType=0,
+                fuelRangeElec=round(self.__soc * 4.1 * 10),
+                mileage=round(self.__mileage_km * 10),
+                powerLevelPrc=round(self.__soc),
+                totalBatteryCapacity=640,
+            ),
+            gpsPosition=self.gps_position(now),
+            statusTime=int(now),
+        )
+
+    def charging_management_data(self, _now: float) -> ChrgMgmtDataResp:
+        return ChrgMgmtDataResp(
+            chrgMgmtData=ChrgMgmtData(
+                bmsChrgSts=0,
+                bmsPackCrnt=20000,
+                bmsPackVol=1600,
+                bmsPackSOCDsp=round(self.__soc * 10),
+                bmsEstdElecRng=round(self.__soc * 4.1),
+                bmsOnBdChrgTrgtSOCDspCmd=7,
+                ccuOffBdChrgrPlugOn=0,
+            ),
+            rvsChargeStatus=RvsChargeStatus(
+                chargingGunState=0,
+                fuelRangeElec=round(self.__soc * 4.1 * 10),
+                mileage=round(self.__mileage_km * 10),
+                powerUsageOfDay=0,
+                powerUsageSinceLastCharge=0,
+                realtimePower=0,
+                totalBatteryCapacity=640,
+            ),
+        )
+
+    def control(self, request: Mapping[str, Any], now: float) -> VehicleControlResp:
+        return VehicleControlResp(
+            basicVehicleStatus=self.basic_vehicle_status(),
+            failureType=0,
+            gpsPosition=self.gps_position(now),
+            rvcReqSts=encode_rvc_value(1),
+            rvcReqType=encode_rvc_value(int(request.get("rvcReqType") or 0)),
+        )
+
+    def charging_control(
+        self,
+        _request: Mapping[str, Any],
+        _now: float,
+    ) -> ChargingControlResp:
+        return ChargingControlResp(
+            bmsChrgSts=0, bmsPackCrntV=0, ccuEleccLckCtrlDspCmd=1
+        )
@@ -1,5 +1,12 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
+from saic_ismart_client_ng.net.codec import default_json_codec
+
+if TYPE_CHECKING:
+    from saic_ismart_client_ng.net.codec import JsonCodec
+
 
 class SaicApiConfiguration:
     # pylint: disable=too-many-positional-arguments
@@ -14,6 +21,9 @@ class SaicApiConfiguration:
         region: str = "eu",
         sms_delivery_delay: float = 3.0,
         read_timeout: float = 5.0,
+        *,
+        lazy_decode: bool = False,
+        json_codec: JsonCodec | None = None,
     ) -> None:
         self.__username = username
         self.__password = password
@@ -24,6 +34,8 @@ class SaicApiConfiguration:
         self.__region = region
         self.__sms_delivery_delay = sms_delivery_delay
         self.__read_timeout = read_timeout
+        self.__lazy_decode = lazy_decode
+        self.__json_codec = json_codec or default_json_codec()
 
     @property
     def username(self) -> str:
@@ -60,3 +72,12 @@ class SaicApiConfiguration:
     @property
     def read_timeout(self) -> float:
         return self.__read_timeout
+
+    @property
+    def lazy_decode(self) -> bool:
+        """Whether responses are decoded into lazy views instead of plain dataclasses."""
+        return self.__lazy_decode
+
+    @property
+    def json_codec(self) -> JsonCodec:
+        return self.__json_codec
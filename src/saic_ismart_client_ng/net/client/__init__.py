@@ -22,6 +22,8 @@ class SaicApiClient:
         self,
         configuration: SaicApiConfiguration,
         listener: SaicApiListener | None = None,
+        *,
+        transport: httpx.AsyncBaseTransport | None = None,
     ) -> None:
         self.__configuration = configuration
         self.__listener = listener
@@ -29,6 +31,7 @@ class SaicApiClient:
         self.__user_token: str = ""
         self.__client = httpx.AsyncClient(
             timeout=Timeout(timeout=configuration.read_timeout),
+            transport=transport,
             event_hooks={
                 "request": [self.__invoke_request_listener, self.__encrypt_request],
                 "response": [decrypt_httpx_response, self.__invoke_response_listener],
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from dataclasses import fields, is_dataclass
+import importlib
+import json
+from typing import Any, Protocol
+
+
+class JsonCodec(Protocol):
+    def dumps(self, value: Any) -> bytes: ...
+
+    def loads(self, data: bytes | str) -> Any: ...
+
+
+class StdlibJsonCodec:
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode(
+            "utf-8"
+        )
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+class OrjsonJsonCodec:
+    """Faster codec based on orjson, available through the `orjson` extra.
+
+    Its output differs from the standard library codec for some values, e.g.
+    it rejects integers that do not fit in 64 bits.
+    """
+
+    def __init__(self) -> None:
+        try:
+            self.__orjson = importlib.import_module("orjson")
+        except ImportError as e:
+            msg = "orjson is required for OrjsonJsonCodec, install saic_ismart_client_ng[orjson]"
+            raise ImportError(msg) from e
+
+    def dumps(self, value: Any) -> bytes:
+        result: bytes = self.__orjson.dumps(value)
+        return result
+
+    def loads(self, data: bytes | str) -> Any:
+        return self.__orjson.loads(data)
+
+
+def default_json_codec() -> JsonCodec:
+    """Return the codec used when none is configured, the standard library one.
+
+    OrjsonJsonCodec is only used when passed explicitly, so requests are
+    serialized the same way whatever happens to be installed.
+    """
+    return StdlibJsonCodec()
+
+
+def to_json_dict(value: Any) -> Any:
+    """Convert a request dataclass into JSON compatible values, omitting None fields.
+
+    Unlike dataclasses.asdict this does not deep-copy leaf values.
+    """
+    if is_dataclass(value) and not isinstance(value, type):
+        result = {}
+        for dataclass_field in fields(value):
+            field_value = getattr(value, dataclass_field.name)
+            if field_value is not None:
+                result[dataclass_field.name] = to_json_dict(field_value)
+        return result
+    if isinstance(value, list | tuple):
+        return [to_json_dict(item) for item in value]
+    if isinstance(value, dict):
+        return {
+            key: to_json_dict(item) for key, item in value.items() if item is not None
+        }
+    return value
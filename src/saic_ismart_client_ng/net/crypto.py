@@ -21,6 +21,25 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+def request_key_and_iv(
+    *,
+    request_path: str,
+    current_ts: str,
+    tenant_id: str,
+    content_type: str,
+    user_token: str,
+) -> tuple[str, str]:
+    """Return the hex AES key and IV of a request body."""
+    key_hex = md5_hex_digest(
+        md5_hex_digest(request_path + tenant_id + user_token + "app", False)
+        + current_ts
+        + "1"
+        + content_type,
+        False,
+    )
+    return key_hex, md5_hex_digest(current_ts, False)
+
+
 def get_app_verification_string(
     *,
     request_path: str,
@@ -35,11 +54,13 @@ def get_app_verification_string(
     #    if (len(request_path) == 0 or "?" not in request_path)
     #    else request_path.split("?")[0]
     # )
-    origin_key_part_one = request_path + tenant_id + user_token + "app"
-    encrypt_key_part_one = md5_hex_digest(origin_key_part_one, False)
-    origin_key_part_two = current_ts + "1" + content_type
-    encrypt_key = md5_hex_digest(encrypt_key_part_one + origin_key_part_two, False)
-    encrypt_iv = md5_hex_digest(current_ts, False)
+    encrypt_key, encrypt_iv = request_key_and_iv(
+        request_path=request_path,
+        current_ts=current_ts,
+        tenant_id=tenant_id,
+        content_type=content_type,
+        user_token=user_token,
+    )
     encrypt_req = (
         encrypt_aes_cbc_pkcs5_padding(request_content, encrypt_key, encrypt_iv)
         if len(request_content) > 0
@@ -98,14 +119,13 @@ def encrypt_request(
         modified_content_type = normalize_content_type(original_content_type)
         request_content = request_body.strip()
         if request_content:
-            key_hex = md5_hex_digest(
-                md5_hex_digest(request_path + tenant_id + user_token + "app", False)
-                + current_ts
-                + "1"
-                + modified_content_type,
-                False,
+            key_hex, iv_hex = request_key_and_iv(
+                request_path=request_path,
+                current_ts=current_ts,
+                tenant_id=tenant_id,
+                content_type=modified_content_type,
+                user_token=user_token,
             )
-            iv_hex = md5_hex_digest(current_ts, False)
             if key_hex and iv_hex:
                 new_content = encrypt_aes_cbc_pkcs5_padding(
                     request_content, key_hex, iv_hex
@@ -154,14 +174,13 @@ def decrypt_request(
             tenant_id = original_request_headers["tenant-id"]
             user_token = original_request_headers.get("blade-auth", "")
             request_path = original_request_url.replace(base_uri, "/")
-            key = md5_hex_digest(
-                md5_hex_digest(request_path + tenant_id + user_token + "app", False)
-                + app_send_date
-                + "1"
-                + original_content_type,
-                False,
+            key, iv = request_key_and_iv(
+                request_path=request_path,
+                current_ts=app_send_date,
+                tenant_id=tenant_id,
+                content_type=original_content_type,
+                user_token=user_token,
             )
-            iv = md5_hex_digest(app_send_date, False)
             decrypted = decrypt_aes_cbc_pkcs5_padding(req_content, key, iv)
             if decrypted:
                 return decrypted.encode(charset)
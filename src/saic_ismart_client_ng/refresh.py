@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+from typing import TYPE_CHECKING
+
+from saic_ismart_client_ng.api.message.sync import MessageSync
+from saic_ismart_client_ng.exceptions import SaicApiException, SaicLogoutException
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterable
+
+    from saic_ismart_client_ng import SaicApi
+    from saic_ismart_client_ng.api.message.schema import MessageEntity
+    from saic_ismart_client_ng.api.vehicle.schema import VehicleStatusResp
+    from saic_ismart_client_ng.api.vehicle_charging.schema import ChrgMgmtDataResp
+    from saic_ismart_client_ng.registry import VehicleHandle
+
+logger = logging.getLogger(__name__)
+
+# The gateway writes an entry in these groups whenever something happens to a car
+DEFAULT_TRIGGER_GROUPS = ("ALARM", "COMMAND")
+
+
+@dataclass(frozen=True, slots=True)
+class VehicleRefresh:
+    """The outcome of refreshing a vehicle named in new messages."""
+
+    vehicle: VehicleHandle
+    messages: tuple[MessageEntity, ...]
+    vehicle_status: VehicleStatusResp | None = None
+    charging_status: ChrgMgmtDataResp | None = None
+    error: SaicApiException | None = None
+
+
+class MessageTriggeredRefresh:
+    """Refreshes vehicles only when new messages mention them.
+
+    Each poll costs a single unread count call when nothing happened. When new
+    messages arrive, the status (and optionally the charging data) of every
+    vehicle named in them is fetched once and handed to the callback. Messages
+    name vehicles by VIN hash: an unknown hash triggers one vehicle list call,
+    messages of vehicles still unknown after it are ignored.
+
+    The first poll primes the groups that have no cursor yet at their newest
+    message, so the message history does not trigger refreshes. The cursors
+    live in the store of the MessageSync, which is in memory by default: pass
+    a MessageSync with a persistent store, e.g. JsonFileMessageCursorStore, so
+    that the messages received while the process was down trigger refreshes
+    after a restart.
+    """
+
+    def __init__(
+        self,
+        api: SaicApi,
+        *,
+        sync: MessageSync | None = None,
+        on_refresh: Callable[[VehicleRefresh], Awaitable[None]] | None = None,
+        refresh_charging: bool = True,
+        message_groups: Iterable[str] = DEFAULT_TRIGGER_GROUPS,
+        interval: float = 30.0,
+    ) -> None:
+        self.__api = api
+        self.__sync = sync or MessageSync(api)
+        self.__on_refresh = on_refresh
+        self.__refresh_charging = refresh_charging
+        self.__message_groups = tuple(message_groups)
+        self.__interval = interval
+        self.__primed = False
+
+    async def poll_once(self) -> list[VehicleRefresh]:
+        if not self.__primed:
+            await self.__sync.prime(self.__message_groups)
+            self.__primed = True
+        new_messages = await self.__sync.sync_all(self.__message_groups)
+        messages = [m for group in new_messages.values() for m in group if m.vin]
+        registry = self.__api.vehicle_registry
+        if any(registry.by_hash(m.vin) is None for m in messages if m.vin):
+            # Messages name vehicles by VIN hash, only the vehicle list maps them
+            await self.__api.vehicle_list()
+        by_vehicle: dict[VehicleHandle, list[MessageEntity]] = {}
+        for message in messages:
+            vehicle = registry.by_hash(message.vin) if message.vin else None
+            if vehicle is None:
+                logger.debug("Ignoring message %s of an unknown vehicle", message)
+                continue
+            by_vehicle.setdefault(vehicle, []).append(message)
+        if not by_vehicle:
+            return []
+
+        refreshes = await asyncio.gather(
+            *(
+                self.__refresh(vehicle, tuple(messages))
+                for vehicle, messages in by_vehicle.items()
+            )
+        )
+        if self.__on_refresh is not None:
+            for refresh in refreshes:
+                await self.__on_refresh(refresh)
+        return refreshes
+
+    async def run(self) -> None:
+        """Poll until cancelled or logged out."""
+        while True:
+            try:
+                await self.poll_once()
+            except SaicLogoutException:
+                raise
+            except SaicApiException as e:
+                logger.warning("Message triggered refresh failed: %s", e)
+            await asyncio.sleep(self.__interval)
+
+    async def __refresh(
+        self, vehicle: VehicleHandle, messages: tuple[MessageEntity, ...]
+    ) -> VehicleRefresh:
+        logger.debug("Refreshing %s after %d new messages", vehicle.vin, len(messages))
+        try:
+            vehicle_status = await self.__api.get_vehicle_status(vehicle)
+            charging_status = (
+                await self.__api.get_vehicle_charging_management_data(vehicle)
+                if self.__refresh_charging
+                else None
+            )
+        except SaicLogoutException:
+            raise
+        except SaicApiException as e:
+            return VehicleRefresh(vehicle, messages, error=e)
+        return VehicleRefresh(vehicle, messages, vehicle_status, charging_status)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from saic_ismart_client_ng.capabilities import VehicleCapabilities
+from saic_ismart_client_ng.crypto_utils import sha256_hex_digest
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from saic_ismart_client_ng.api.vehicle.schema import VinInfo
+
+
+@dataclass(frozen=True, slots=True)
+class VehicleHandle:
+    """A vehicle known to the client, carrying its precomputed VIN hash.
+
+    The API identifies vehicles by the SHA-256 of their VIN. Passing a handle
+    instead of a plain VIN to the API methods avoids hashing it on every call.
+    Handles built from a VinInfo also carry the capability index of the vehicle.
+    """
+
+    vin: str
+    vin_hash: str
+    info: VinInfo | None = field(default=None, compare=False, repr=False)
+    capabilities: VehicleCapabilities | None = field(
+        default=None, compare=False, repr=False
+    )
+
+    @classmethod
+    def of(
+        cls, vin: str, info: VinInfo | None = None, *, vin_hash: str | None = None
+    ) -> VehicleHandle:
+        return cls(
+            vin=vin,
+            vin_hash=vin_hash or sha256_hex_digest(vin),
+            info=info,
+            capabilities=VehicleCapabilities(info.vehicleModelConfiguration)
+            if info is not None
+            else None,
+        )
+
+
+def vin_of(vin: str | VehicleHandle) -> str:
+    """Return the plain VIN of a VIN or vehicle handle."""
+    return vin.vin if isinstance(vin, VehicleHandle) else vin
+
+
+class VehicleRegistry:
+    """Maps VINs to vehicle handles and hashed VINs back to them."""
+
+    def __init__(self) -> None:
+        self.__by_vin: dict[str, VehicleHandle] = {}
+        self.__by_hash: dict[str, VehicleHandle] = {}
+
+    def update(self, vin_list: Iterable[VinInfo]) -> list[VehicleHandle]:
+        return [self.register(info.vin, info=info) for info in vin_list if info.vin]
+
+    def register(self, vin: str, *, info: VinInfo | None = None) -> VehicleHandle:
+        existing = self.__by_vin.get(vin)
+        if existing is not None and (info is None or existing.info is info):
+            return existing
+        handle = VehicleHandle.of(
+            vin, info=info, vin_hash=existing.vin_hash if existing else None
+        )
+        self.__by_vin[vin] = handle
+        self.__by_hash[handle.vin_hash] = handle
+        return handle
+
+    def resolve(self, vin: str | VehicleHandle) -> VehicleHandle:
+        if isinstance(vin, VehicleHandle):
+            return vin
+        return self.__by_vin.get(vin) or self.register(vin)
+
+    def by_vin(self, vin: str) -> VehicleHandle | None:
+        return self.__by_vin.get(vin)
+
+    def by_hash(self, vin_hash: str) -> VehicleHandle | None:
+        return self.__by_hash.get(vin_hash)
+
+    def __contains__(self, vin: object) -> bool:
+        if isinstance(vin, VehicleHandle):
+            vin = vin.vin
+        return vin in self.__by_vin
+
+    def __iter__(self) -> Iterator[VehicleHandle]:
+        return iter(self.__by_vin.values())
+
+    def __len__(self) -> int:
+        return len(self.__by_vin)
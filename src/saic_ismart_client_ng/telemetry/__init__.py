@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from saic_ismart_client_ng.telemetry.delta import DeltaArchive, DeltaEncoder
+from saic_ismart_client_ng.telemetry.geofence import (
+    CircleFence,
+    GeofenceEngine,
+    GeofenceEvent,
+    GeofenceTransition,
+    PolygonFence,
+)
+from saic_ismart_client_ng.telemetry.layout import Column, schema_columns
+from saic_ismart_client_ng.telemetry.recorder import (
+    TelemetryFrame,
+    TelemetryReader,
+    TelemetryRecorder,
+)
+from saic_ismart_client_ng.telemetry.sessions import (
+    ChargingSession,
+    ChargingSessionDetector,
+    ChargingType,
+)
+from saic_ismart_client_ng.telemetry.tracks import (
+    DistanceDownsampler,
+    OpeningWindowDownsampler,
+    Track,
+    TrackPoint,
+    TrackStore,
+    douglas_peucker,
+)
+from saic_ismart_client_ng.telemetry.trips import Trip, TripBuilder, build_trips
+from saic_ismart_client_ng.telemetry.warehouse import TelemetryWarehouse
+
+__all__ = [
+    "ChargingSession",
+    "ChargingSessionDetector",
+    "ChargingType",
+    "CircleFence",
+    "Column",
+    "DeltaArchive",
+    "DeltaEncoder",
+    "DistanceDownsampler",
+    "GeofenceEngine",
+    "GeofenceEvent",
+    "GeofenceTransition",
+    "OpeningWindowDownsampler",
+    "PolygonFence",
+    "TelemetryFrame",
+    "TelemetryReader",
+    "TelemetryRecorder",
+    "TelemetryWarehouse",
+    "Track",
+    "TrackPoint",
+    "TrackStore",
+    "Trip",
+    "TripBuilder",
+    "build_trips",
+    "douglas_peucker",
+    "schema_columns",
+]
@@ -0,0 +1,204 @@
+"""Vectorized charging analytics over recorded ChrgMgmtDataResp columns.
+
+The functions mirror the per-snapshot properties of ChrgMgmtData, but work on
+whole columns at once. Missing values are NaN in the numeric arrays and None
+in the decoded enum arrays.
+
+Requires NumPy, available through the `analytics` extra.
+"""
+
+from __future__ import annotations
+
+import contextlib
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from saic_ismart_client_ng.api.vehicle_charging.schema import (
+    BMS_CHARGING_STATUSES,
+    BmsChargingStatusCode,
+    ChargingStopReason,
+    HeatingStopReason,
+)
+from saic_ismart_client_ng.telemetry.numpy_support import require_numpy
+
+with contextlib.suppress(ImportError):
+    import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    import numpy.typing as npt
+
+    from saic_ismart_client_ng.telemetry.recorder import TelemetryFrame
+
+    FloatArray = npt.NDArray[np.float64]
+    ObjectArray = npt.NDArray[np.object_]
+
+require_numpy("charging analytics")
+
+E = TypeVar("E", bound=Enum)
+
+CURRENT_COLUMN = "chrgMgmtData.bmsPackCrnt"
+VOLTAGE_COLUMN = "chrgMgmtData.bmsPackVol"
+SOC_COLUMN = "chrgMgmtData.bmsPackSOCDsp"
+CHARGING_STATUS_COLUMN = "chrgMgmtData.bmsChrgSts"
+CHARGING_STOP_REASON_COLUMN = "chrgMgmtData.bmsChrgSpRsn"
+HEATING_STOP_REASON_COLUMN = "chrgMgmtData.bmsPTCHeatResp"
+
+_CHARGING_STATUSES = sorted(BMS_CHARGING_STATUSES)
+
+
+def to_array(values: Sequence[float | None] | FloatArray) -> FloatArray:
+    """Convert a recorded column to a float array, with NaN for missing values."""
+    if isinstance(values, np.ndarray):
+        return values.astype(np.float64, copy=False)
+    return np.array(
+        [np.nan if value is None else value for value in values], dtype=np.float64
+    )
+
+
+def decoded_current(bms_pack_crnt: FloatArray) -> FloatArray:
+    """Return the pack current in A, negative while charging."""
+    return bms_pack_crnt * 0.05 - 1000.0
+
+
+def decoded_voltage(bms_pack_vol: FloatArray) -> FloatArray:
+    """Return the pack voltage in V."""
+    return bms_pack_vol * 0.25
+
+
+def decoded_power(current: FloatArray, voltage: FloatArray) -> FloatArray:
+    """Return the pack power in kW, negative while charging."""
+    return current * voltage / 1000.0
+
+
+def decoded_soc(bms_pack_soc_dsp: FloatArray) -> FloatArray:
+    """Return the displayed state of charge in %."""
+    return bms_pack_soc_dsp / 10.0
+
+
+def is_bms_charging(bms_chrg_sts: FloatArray) -> npt.NDArray[np.bool_]:
+    return np.isin(bms_chrg_sts, _CHARGING_STATUSES)
+
+
+def energy_kwh(timestamps: FloatArray, power_kw: FloatArray) -> float:
+    """Integrate power over time with the trapezoidal rule.
+
+    Intervals with a missing power at either end do not contribute.
+    """
+    if len(timestamps) < 2:
+        return 0.0
+    hours = np.diff(timestamps) / 3600.0
+    averages = (power_kw[1:] + power_kw[:-1]) / 2.0
+    return float(np.nansum(averages * hours))
+
+
+def soc_slope(timestamps: FloatArray, soc: FloatArray) -> float | None:
+    """Return the least squares slope of the state of charge, in % per hour."""
+    valid = ~np.isnan(soc) & ~np.isnan(timestamps)
+    if np.count_nonzero(valid) < 2:
+        return None
+    hours = (timestamps[valid] - timestamps[valid][0]) / 3600.0
+    if np.ptp(hours) == 0:
+        return None
+    slope, _ = np.polyfit(hours, soc[valid], 1)
+    return float(slope)
+
+
+def percentiles(
+    values: FloatArray, q: Iterable[float] = (10, 50, 90)
+) -> dict[float, float]:
+    """Return the percentiles of a column, ignoring missing values."""
+    q = tuple(q)
+    if np.all(np.isnan(values)):
+        return dict.fromkeys(q, float("nan"))
+    return dict(zip(q, np.nanpercentile(values, q).tolist(), strict=True))
+
+
+_LOOKUPS: dict[tuple[type[Enum], Any], ObjectArray] = {}
+
+
+def _lookup_table(enum_type: type[E], default: E | None) -> ObjectArray:
+    key = (enum_type, default)
+    if (table := _LOOKUPS.get(key)) is None:
+        size = max(member.value for member in enum_type) + 1
+        # The extra last slot catches the codes outside of the enum range
+        table = np.full(size + 1, default, dtype=object)
+        for member in enum_type:
+            table[member.value] = member
+        _LOOKUPS[key] = table
+    return table
+
+
+def decode_codes(
+    raw: FloatArray, enum_type: type[E], default: E | None = None
+) -> ObjectArray:
+    """Map raw codes to enum members through a lookup array.
+
+    Codes that are not part of the enum map to `default`, missing values to None.
+    """
+    table = _lookup_table(enum_type, default)
+    missing = np.isnan(raw)
+    codes = np.where(missing, 0, raw).astype(np.int64)
+    out_of_range = (codes < 0) | (codes >= len(table) - 1)
+    codes[out_of_range] = len(table) - 1
+    result: ObjectArray = table[codes]
+    result[missing] = None
+    return result
+
+
+def bms_charging_status(bms_chrg_sts: FloatArray) -> ObjectArray:
+    return decode_codes(bms_chrg_sts, BmsChargingStatusCode)
+
+
+def charging_stop_reason(bms_chrg_sp_rsn: FloatArray) -> ObjectArray:
+    return decode_codes(
+        bms_chrg_sp_rsn, ChargingStopReason, ChargingStopReason.OTHER_REASON
+    )
+
+
+def heating_stop_reason(bms_ptc_heat_resp: FloatArray) -> ObjectArray:
+    return decode_codes(bms_ptc_heat_resp, HeatingStopReason)
+
+
+@dataclass(frozen=True, slots=True)
+class ChargingCurve:
+    """Decoded charging columns of a recorded ChrgMgmtDataResp history."""
+
+    timestamps: FloatArray
+    current: FloatArray
+    voltage: FloatArray
+    power: FloatArray
+    soc: FloatArray
+    charging_status: FloatArray
+
+    @classmethod
+    def from_frame(cls, frame: TelemetryFrame) -> ChargingCurve:
+        current = decoded_current(to_array(frame.column(CURRENT_COLUMN)))
+        voltage = decoded_voltage(to_array(frame.column(VOLTAGE_COLUMN)))
+        return cls(
+            timestamps=to_array(frame.timestamps),
+            current=current,
+            voltage=voltage,
+            power=decoded_power(current, voltage),
+            soc=decoded_soc(to_array(frame.column(SOC_COLUMN))),
+            charging_status=to_array(frame.column(CHARGING_STATUS_COLUMN)),
+        )
+
+    @property
+    def is_charging(self) -> npt.NDArray[np.bool_]:
+        return is_bms_charging(self.charging_status)
+
+    def energy_kwh(self) -> float:
+        """Return the energy that went into the battery, positive while charging."""
+        return -energy_kwh(self.timestamps, self.power)
+
+    def soc_slope(self) -> float | None:
+        return soc_slope(self.timestamps, self.soc)
+
+    def charge_rate_percentiles(
+        self, q: Iterable[float] = (10, 50, 90)
+    ) -> dict[float, float]:
+        """Return the percentiles of the charging power in kW while charging."""
+        return percentiles(-self.power[self.is_charging], q)
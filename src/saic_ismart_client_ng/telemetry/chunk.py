@@ -0,0 +1,161 @@
+"""Binary layout of a flushed telemetry chunk.
+
+A chunk starts with a magic, the length of a JSON header and the header
+itself, followed by 8-byte aligned sections: the timestamps (int64, sorted),
+then for each column its values and its null bitmap (one bit per row, set
+when the value is missing). Sections can be sliced straight out of a memory
+mapped file, so reading a time range only touches the pages it needs.
+"""
+
+from __future__ import annotations
+
+from array import array
+import bisect
+import json
+import struct
+import sys
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Collection, Sequence
+
+    from saic_ismart_client_ng.telemetry.layout import Column
+
+MAGIC = b"SAICTLM1"
+_HEADER_LENGTH = struct.Struct("<I")
+_ALIGNMENT = 8
+
+
+def encode_chunk(
+    timestamps: array[int],
+    columns: Sequence[tuple[Column, array[Any], bytearray]],
+) -> bytes:
+    rows = len(timestamps)
+    order = sorted(range(rows), key=timestamps.__getitem__)
+    if order == list(range(rows)):
+        order = []
+
+    sections: list[bytes] = []
+    offset = 0
+
+    def add_section(data: bytes) -> int:
+        nonlocal offset
+        section_offset = offset
+        padding = -len(data) % _ALIGNMENT
+        sections.append(data + b"\0" * padding)
+        offset += len(data) + padding
+        return section_offset
+
+    header_columns = []
+    timestamps_offset = add_section(_reorder(timestamps, order).tobytes())
+    for column, values, nulls in columns:
+        header_columns.append(
+            {
+                "name": column.name,
+                "typecode": column.typecode,
+                "values": add_section(_reorder(values, order).tobytes()),
+                "nulls": add_section(bytes(_reorder_bits(nulls, order, rows))),
+            }
+        )
+    header = json.dumps(
+        {
+            "rows": rows,
+            "start": min(timestamps) if rows else 0,
+            "end": max(timestamps) if rows else 0,
+            "byteorder": sys.byteorder,
+            "timestamps": timestamps_offset,
+            "columns": header_columns,
+        }
+    ).encode("utf-8")
+    preamble = MAGIC + _HEADER_LENGTH.pack(len(header)) + header
+    preamble += b"\0" * (-len(preamble) % _ALIGNMENT)
+    return preamble + b"".join(sections)
+
+
+def _reorder(values: array[Any], order: list[int]) -> array[Any]:
+    if not order:
+        return values
+    return array(values.typecode, (values[i] for i in order))
+
+
+def _reorder_bits(bits: bytearray, order: list[int], rows: int) -> bytearray:
+    if not order:
+        return bits
+    result = bytearray(len(bits))
+    for row in range(rows):
+        source = order[row]
+        if bits[source >> 3] & (1 << (source & 7)):
+            result[row >> 3] |= 1 << (row & 7)
+    return result
+
+
+def _read_header(buffer: memoryview) -> tuple[dict[str, Any], int]:
+    if bytes(buffer[: len(MAGIC)]) != MAGIC:
+        msg = "Not a telemetry chunk"
+        raise ValueError(msg)
+    (header_length,) = _HEADER_LENGTH.unpack_from(buffer, len(MAGIC))
+    header_start = len(MAGIC) + _HEADER_LENGTH.size
+    header = json.loads(bytes(buffer[header_start : header_start + header_length]))
+    data_start = header_start + header_length
+    data_start += -data_start % _ALIGNMENT
+    return header, data_start
+
+
+def read_chunk(
+    data: Any,
+    *,
+    start: int | None = None,
+    end: int | None = None,
+    names: Collection[str] | None = None,
+) -> tuple[list[int], dict[str, list[Any]]]:
+    """Read the rows of a chunk with start <= timestamp <= end.
+
+    `data` is any buffer holding the chunk, e.g. bytes or an mmap.
+    """
+    views: list[memoryview] = []
+    try:
+        buffer = memoryview(data)
+        views.append(buffer)
+        header, data_start = _read_header(buffer)
+        rows = header["rows"]
+        native = header["byteorder"] == sys.byteorder
+
+        def section(offset: int, typecode: str) -> Any:
+            size = array(typecode).itemsize
+            item_format: Any = typecode
+            view = buffer[data_start + offset :][: size * rows].cast(item_format)
+            views.append(view)
+            if native:
+                return view
+            swapped = array(typecode, view.tobytes())
+            swapped.byteswap()
+            return swapped
+
+        timestamps = section(header["timestamps"], "q")
+        lo = 0 if start is None else bisect.bisect_left(timestamps, start)
+        hi = rows if end is None else bisect.bisect_right(timestamps, end)
+
+        columns: dict[str, list[Any]] = {}
+        for column in header["columns"]:
+            if names is not None and column["name"] not in names:
+                continue
+            values = section(column["values"], column["typecode"])[lo:hi].tolist()
+            if column["typecode"] == "b":
+                values = [bool(value) for value in values]
+            nulls = bytes(buffer[data_start + column["nulls"] :][: (rows + 7) // 8])
+            for row in range(lo, hi):
+                if nulls[row >> 3] & (1 << (row & 7)):
+                    values[row - lo] = None
+            columns[column["name"]] = values
+        for name in names or ():
+            columns.setdefault(name, [None] * (hi - lo))
+        return timestamps[lo:hi].tolist(), columns
+    finally:
+        for view in reversed(views):
+            view.release()
+
+
+def chunk_time_range(data: Any) -> tuple[int, int]:
+    with memoryview(data) as buffer:
+        header, _ = _read_header(buffer)
+    return header["start"], header["end"]
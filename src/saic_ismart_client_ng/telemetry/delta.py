@@ -0,0 +1,274 @@
+"""Delta encoding of snapshot sequences.
+
+Snapshots are split into blocks of `block_size` rows, each block decodable on
+its own. Every row starts with the zig-zag varint delta of its timestamp and a
+bitmap of the columns whose value changed since the previous row of the
+block (the first row compares against an all-missing row). Each changed
+integer column follows as a varint: 0 for a missing value, otherwise the
+zig-zag delta plus one. Changed float columns are a 0 or 1 marker byte,
+followed by the 8-byte value when present.
+
+An archive starts with a magic, the length of a JSON header and the header,
+which lists the columns and, for each block, its offset, size, row count
+and time range.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from typing import TYPE_CHECKING, Any
+
+from saic_ismart_client_ng.telemetry.layout import schema_columns, schema_kind
+from saic_ismart_client_ng.telemetry.recorder import TelemetryFrame
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from saic_ismart_client_ng.telemetry.layout import Column
+
+MAGIC = b"SAICDLT1"
+_HEADER_LENGTH = struct.Struct("<I")
+_FLOAT = struct.Struct("<d")
+
+
+def zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else ((-value) << 1) - 1
+
+
+def unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data: bytes | memoryview, position: int) -> tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
+
+
+class DeltaEncoder:
+    """Appends snapshots of one schema kind into delta encoded blocks."""
+
+    def __init__(self, data_class: type[Any], *, block_size: int = 256) -> None:
+        if block_size <= 0:
+            msg = "block_size must be positive"
+            raise ValueError(msg)
+        self.__kind = schema_kind(data_class).__name__
+        self.__columns = schema_columns(data_class)
+        self.__floats = [column.typecode == "d" for column in self.__columns]
+        self.__bitmap_size = (len(self.__columns) + 7) // 8
+        self.__block_size = block_size
+        self.__blocks: list[bytes] = []
+        self.__index: list[dict[str, int]] = []
+        self.__block = bytearray()
+        self.__rows = 0
+        self.__previous: list[Any] = []
+        self.__previous_timestamp = 0
+        self.__start = 0
+        self.__end = 0
+
+    @property
+    def columns(self) -> tuple[Column, ...]:
+        return self.__columns
+
+    def append(self, timestamp: int, snapshot: Any) -> None:
+        if self.__rows == 0:
+            self.__previous = [None] * len(self.__columns)
+            self.__previous_timestamp = 0
+            self.__start = self.__end = timestamp
+        out = self.__block
+        write_varint(out, zigzag(timestamp - self.__previous_timestamp))
+        bitmap_position = len(out)
+        out.extend(bytes(self.__bitmap_size))
+
+        previous = self.__previous
+        for index, column in enumerate(self.__columns):
+            value = _normalize(column.value_of(snapshot), is_float=self.__floats[index])
+            old = previous[index]
+            if value == old:
+                continue
+            out[bitmap_position + (index >> 3)] |= 1 << (index & 7)
+            previous[index] = value
+            if self.__floats[index]:
+                if value is None:
+                    out.append(0)
+                else:
+                    out.append(1)
+                    out.extend(_FLOAT.pack(value))
+            elif value is None:
+                out.append(0)
+            else:
+                write_varint(out, zigzag(value - (old or 0)) + 1)
+
+        self.__previous_timestamp = timestamp
+        self.__start = min(self.__start, timestamp)
+        self.__end = max(self.__end, timestamp)
+        self.__rows += 1
+        if self.__rows >= self.__block_size:
+            self.__seal_block()
+
+    def extend(self, snapshots: Iterable[tuple[int, Any]]) -> None:
+        for timestamp, snapshot in snapshots:
+            self.append(timestamp, snapshot)
+
+    def to_bytes(self) -> bytes:
+        """Return the archive of all the snapshots appended so far."""
+        self.__seal_block()
+        header = json.dumps(
+            {
+                "kind": self.__kind,
+                "columns": [[c.name, c.typecode] for c in self.__columns],
+                "blocks": self.__index,
+            }
+        ).encode("utf-8")
+        return b"".join(
+            [MAGIC, _HEADER_LENGTH.pack(len(header)), header, *self.__blocks]
+        )
+
+    def __seal_block(self) -> None:
+        if self.__rows == 0:
+            return
+        offset = (
+            self.__index[-1]["offset"] + self.__index[-1]["size"] if self.__index else 0
+        )
+        self.__index.append(
+            {
+                "offset": offset,
+                "size": len(self.__block),
+                "rows": self.__rows,
+                "start": self.__start,
+                "end": self.__end,
+            }
+        )
+        self.__blocks.append(bytes(self.__block))
+        self.__block = bytearray()
+        self.__rows = 0
+
+
+def _normalize(value: Any, *, is_float: bool) -> Any:
+    if value is None:
+        return None
+    if is_float:
+        return float(value)
+    return int(value)
+
+
+class DeltaArchive:
+    """Random access reader of an archive written by a DeltaEncoder."""
+
+    def __init__(self, data: bytes) -> None:
+        if data[: len(MAGIC)] != MAGIC:
+            msg = "Not a delta encoded archive"
+            raise ValueError(msg)
+        (header_length,) = _HEADER_LENGTH.unpack_from(data, len(MAGIC))
+        header_start = len(MAGIC) + _HEADER_LENGTH.size
+        header = json.loads(data[header_start : header_start + header_length])
+        self.__data = memoryview(data)[header_start + header_length :]
+        self.__kind: str = header["kind"]
+        self.__names: list[str] = [name for name, _ in header["columns"]]
+        self.__floats = [typecode == "d" for _, typecode in header["columns"]]
+        self.__bools = [typecode == "b" for _, typecode in header["columns"]]
+        self.__blocks: list[dict[str, int]] = header["blocks"]
+
+    @property
+    def kind(self) -> str:
+        return self.__kind
+
+    @property
+    def column_names(self) -> list[str]:
+        return list(self.__names)
+
+    @property
+    def block_count(self) -> int:
+        return len(self.__blocks)
+
+    def __len__(self) -> int:
+        return sum(block["rows"] for block in self.__blocks)
+
+    def block(self, index: int) -> TelemetryFrame:
+        """Decode a single block."""
+        block = self.__blocks[index]
+        data = self.__data[block["offset"] : block["offset"] + block["size"]]
+        column_count = len(self.__names)
+        bitmap_size = (column_count + 7) // 8
+        floats = self.__floats
+        values: list[Any] = [None] * column_count
+        timestamps: list[int] = []
+        columns: list[list[Any]] = [[] for _ in range(column_count)]
+        timestamp = 0
+        position = 0
+        for _ in range(block["rows"]):
+            delta, position = read_varint(data, position)
+            timestamp += unzigzag(delta)
+            timestamps.append(timestamp)
+            bitmap = data[position : position + bitmap_size]
+            position += bitmap_size
+            for byte_index, bitmap_byte in enumerate(bitmap):
+                remaining = bitmap_byte
+                while remaining:
+                    bit = remaining & -remaining
+                    remaining ^= bit
+                    column_index = (byte_index << 3) + bit.bit_length() - 1
+                    if floats[column_index]:
+                        present = data[position]
+                        position += 1
+                        if present:
+                            (values[column_index],) = _FLOAT.unpack_from(data, position)
+                            position += _FLOAT.size
+                        else:
+                            values[column_index] = None
+                    else:
+                        encoded, position = read_varint(data, position)
+                        values[column_index] = (
+                            None
+                            if encoded == 0
+                            else (values[column_index] or 0) + unzigzag(encoded - 1)
+                        )
+            for column, value in zip(columns, values, strict=True):
+                column.append(value)
+
+        for column_index, is_bool in enumerate(self.__bools):
+            if is_bool:
+                columns[column_index] = [
+                    None if v is None else bool(v) for v in columns[column_index]
+                ]
+        return TelemetryFrame(timestamps, dict(zip(self.__names, columns, strict=True)))
+
+    def read(
+        self, *, start: int | None = None, end: int | None = None
+    ) -> TelemetryFrame:
+        """Decode the rows in a time range, skipping the blocks outside of it."""
+        frame = TelemetryFrame()
+        for block_index, block in enumerate(self.__blocks):
+            if (end is not None and block["start"] > end) or (
+                start is not None and block["end"] < start
+            ):
+                continue
+            decoded = self.block(block_index)
+            keep = [
+                row
+                for row, timestamp in enumerate(decoded.timestamps)
+                if (start is None or timestamp >= start)
+                and (end is None or timestamp <= end)
+            ]
+            frame.extend(
+                [decoded.timestamps[row] for row in keep],
+                {
+                    name: [values[row] for row in keep]
+                    for name, values in decoded.columns.items()
+                },
+            )
+        return frame
@@ -0,0 +1,448 @@
+"""Local geofence evaluation.
+
+Fences are circles and polygons in degrees. Distances are measured on a plane
+tangent at a reference point of each fence, which is accurate for fences up to
+a few tens of kilometers across. A vehicle enters a fence when it is inside
+of it and exits only once it is further than `hysteresis_m` outside, so GPS
+jitter along a border does not produce a stream of events.
+"""
+
+from __future__ import annotations
+
+import contextlib
+from dataclasses import dataclass, field
+from enum import Enum
+import math
+from typing import TYPE_CHECKING, Protocol
+
+from saic_ismart_client_ng.registry import VehicleHandle, vin_of
+from saic_ismart_client_ng.telemetry.numpy_support import require_numpy
+from saic_ismart_client_ng.telemetry.tracks import (
+    COORDINATE_SCALE,
+    EARTH_RADIUS_M,
+    TrackPoint,
+)
+
+with contextlib.suppress(ImportError):
+    import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    import numpy.typing as npt
+
+    from saic_ismart_client_ng.api.schema import GpsPosition
+    from saic_ismart_client_ng.telemetry.tracks import Track
+
+    FloatArray = npt.NDArray[np.float64]
+
+METERS_PER_DEGREE = math.radians(1.0) * EARTH_RADIUS_M
+
+
+class Geofence(Protocol):
+    @property
+    def fence_id(self) -> str: ...
+
+    def bounds(self) -> tuple[float, float, float, float]:
+        """Return the (min latitude, min longitude, max latitude, max longitude)."""
+
+    def distance_m(self, latitude: float, longitude: float) -> float:
+        """Return the distance to the border, negative inside of the fence."""
+
+    def distances_m(self, latitudes: FloatArray, longitudes: FloatArray) -> FloatArray:
+        """Return the distances of NumPy arrays of coordinates to the border."""
+
+
+@dataclass(frozen=True, slots=True)
+class CircleFence:
+    fence_id: str
+    latitude: float
+    longitude: float
+    radius_m: float
+
+    def bounds(self) -> tuple[float, float, float, float]:
+        latitude_margin = self.radius_m / METERS_PER_DEGREE
+        longitude_margin = latitude_margin / max(
+            math.cos(math.radians(self.latitude)), 1e-6
+        )
+        return (
+            self.latitude - latitude_margin,
+            self.longitude - longitude_margin,
+            self.latitude + latitude_margin,
+            self.longitude + longitude_margin,
+        )
+
+    def distance_m(self, latitude: float, longitude: float) -> float:
+        x = (
+            (longitude - self.longitude)
+            * math.cos(math.radians(self.latitude))
+            * METERS_PER_DEGREE
+        )
+        y = (latitude - self.latitude) * METERS_PER_DEGREE
+        return math.hypot(x, y) - self.radius_m
+
+    def distances_m(self, latitudes: FloatArray, longitudes: FloatArray) -> FloatArray:
+        require_numpy("geofence arrays")
+        x = (
+            (longitudes - self.longitude)
+            * math.cos(math.radians(self.latitude))
+            * METERS_PER_DEGREE
+        )
+        y = (latitudes - self.latitude) * METERS_PER_DEGREE
+        return np.hypot(x, y) - self.radius_m
+
+
+@dataclass(frozen=True, slots=True)
+class PolygonFence:
+    """A simple polygon given by its (latitude, longitude) vertices."""
+
+    fence_id: str
+    vertices: tuple[tuple[float, float], ...]
+    _projected: tuple[tuple[float, float], ...] = field(
+        init=False, repr=False, compare=False
+    )
+    _origin: tuple[float, float, float] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if len(self.vertices) < 3:
+            msg = "A polygon needs at least 3 vertices"
+            raise ValueError(msg)
+        latitude = sum(vertex[0] for vertex in self.vertices) / len(self.vertices)
+        longitude = sum(vertex[1] for vertex in self.vertices) / len(self.vertices)
+        origin = (latitude, longitude, math.cos(math.radians(latitude)))
+        object.__setattr__(self, "_origin", origin)
+        object.__setattr__(
+            self,
+            "_projected",
+            tuple(_project(origin, vertex[0], vertex[1]) for vertex in self.vertices),
+        )
+
+    def bounds(self) -> tuple[float, float, float, float]:
+        latitudes = [vertex[0] for vertex in self.vertices]
+        longitudes = [vertex[1] for vertex in self.vertices]
+        return min(latitudes), min(longitudes), max(latitudes), max(longitudes)
+
+    def distance_m(self, latitude: float, longitude: float) -> float:
+        px, py = _project(self._origin, latitude, longitude)
+        inside = False
+        nearest = math.inf
+        previous = self._projected[-1]
+        for current in self._projected:
+            (ax, ay), (bx, by) = previous, current
+            if (ay > py) != (by > py) and px < (bx - ax) * (py - ay) / (by - ay) + ax:
+                inside = not inside
+            ex, ey = bx - ax, by - ay
+            length_squared = ex * ex + ey * ey
+            t = (
+                max(0.0, min(1.0, ((px - ax) * ex + (py - ay) * ey) / length_squared))
+                if length_squared
+                else 0.0
+            )
+            nearest = min(nearest, math.hypot(px - ax - t * ex, py - ay - t * ey))
+            previous = current
+        return -nearest if inside else nearest
+
+    def distances_m(self, latitudes: FloatArray, longitudes: FloatArray) -> FloatArray:
+        require_numpy("geofence arrays")
+        origin_latitude, origin_longitude, cos_latitude = self._origin
+        px = (longitudes - origin_longitude) * cos_latitude * METERS_PER_DEGREE
+        py = (latitudes - origin_latitude) * METERS_PER_DEGREE
+        inside = np.zeros(px.shape, dtype=bool)
+        nearest = np.full(px.shape, np.inf)
+        previous = self._projected[-1]
+        for current in self._projected:
+            (ax, ay), (bx, by) = previous, current
+            previous = current
+            ex, ey = bx - ax, by - ay
+            if ay != by:
+                crosses = ((ay > py) != (by > py)) & (px < ex * (py - ay) / ey + ax)
+                inside ^= crosses
+            length_squared = ex * ex + ey * ey
+            t = (
+                np.clip(((px - ax) * ex + (py - ay) * ey) / length_squared, 0.0, 1.0)
+                if length_squared
+                else 0.0
+            )
+            nearest = np.minimum(nearest, np.hypot(px - ax - t * ex, py - ay - t * ey))
+        return np.where(inside, -nearest, nearest)
+
+
+def _project(
+    origin: tuple[float, float, float], latitude: float, longitude: float
+) -> tuple[float, float]:
+    origin_latitude, origin_longitude, cos_latitude = origin
+    return (
+        (longitude - origin_longitude) * cos_latitude * METERS_PER_DEGREE,
+        (latitude - origin_latitude) * METERS_PER_DEGREE,
+    )
+
+
+class GeofenceTransition(Enum):
+    ENTER = "ENTER"
+    EXIT = "EXIT"
+
+
+# Exits are reported before enters for the same point
+_TRANSITION_ORDER = {GeofenceTransition.EXIT: 0, GeofenceTransition.ENTER: 1}
+
+
+@dataclass(frozen=True, slots=True)
+class GeofenceEvent:
+    vin: str
+    fence_id: str
+    transition: GeofenceTransition
+    timestamp: int
+    latitude: float
+    longitude: float
+
+
+def _event_key(event: GeofenceEvent) -> tuple[int, int, str]:
+    return event.timestamp, _TRANSITION_ORDER[event.transition], event.fence_id
+
+
+class GeofenceIndex:
+    """Uniform grid over the bounds of the fences, widened by a margin in meters."""
+
+    def __init__(self, *, cell_size_deg: float = 0.01, margin_m: float = 0.0) -> None:
+        if cell_size_deg <= 0:
+            msg = "cell_size_deg must be positive"
+            raise ValueError(msg)
+        self.__cell_size = cell_size_deg
+        self.__margin_m = margin_m
+        self.__fences: dict[str, Geofence] = {}
+        self.__cells: dict[tuple[int, int], set[str]] = {}
+        self.__fence_cells: dict[str, list[tuple[int, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__fences)
+
+    def __iter__(self) -> Iterator[Geofence]:
+        return iter(self.__fences.values())
+
+    def __contains__(self, fence_id: object) -> bool:
+        return fence_id in self.__fences
+
+    def get(self, fence_id: str) -> Geofence | None:
+        return self.__fences.get(fence_id)
+
+    def add(self, fence: Geofence) -> None:
+        """Index a fence, replacing the fence with the same id."""
+        self.remove(fence.fence_id)
+        min_row, min_column, max_row, max_column = self.__cell_range(
+            self.widened_bounds(fence)
+        )
+        cells = [
+            (row, column)
+            for row in range(min_row, max_row + 1)
+            for column in range(min_column, max_column + 1)
+        ]
+        for cell in cells:
+            self.__cells.setdefault(cell, set()).add(fence.fence_id)
+        self.__fences[fence.fence_id] = fence
+        self.__fence_cells[fence.fence_id] = cells
+
+    def remove(self, fence_id: str) -> bool:
+        if self.__fences.pop(fence_id, None) is None:
+            return False
+        for cell in self.__fence_cells.pop(fence_id):
+            fence_ids = self.__cells[cell]
+            fence_ids.discard(fence_id)
+            if not fence_ids:
+                del self.__cells[cell]
+        return True
+
+    def candidates(self, latitude: float, longitude: float) -> set[str]:
+        """Return the ids of the fences whose widened bounds may hold the point."""
+        return self.__cells.get(self.__cell_of(latitude, longitude), set())
+
+    def widened_bounds(self, fence: Geofence) -> tuple[float, float, float, float]:
+        min_latitude, min_longitude, max_latitude, max_longitude = fence.bounds()
+        latitude_margin = self.__margin_m / METERS_PER_DEGREE
+        widest = max(abs(min_latitude), abs(max_latitude)) + latitude_margin
+        longitude_margin = latitude_margin / max(math.cos(math.radians(widest)), 1e-6)
+        return (
+            min_latitude - latitude_margin,
+            min_longitude - longitude_margin,
+            max_latitude + latitude_margin,
+            max_longitude + longitude_margin,
+        )
+
+    def __cell_of(self, latitude: float, longitude: float) -> tuple[int, int]:
+        return (
+            math.floor(latitude / self.__cell_size),
+            math.floor(longitude / self.__cell_size),
+        )
+
+    def __cell_range(
+        self, bounds: tuple[float, float, float, float]
+    ) -> tuple[int, int, int, int]:
+        min_row, min_column = self.__cell_of(bounds[0], bounds[1])
+        max_row, max_column = self.__cell_of(bounds[2], bounds[3])
+        return min_row, min_column, max_row, max_column
+
+
+class GeofenceEngine:
+    """Emits enter and exit events as vehicles move across fences.
+
+    Each position is only tested against the fences indexed in its grid cell
+    and the fences the vehicle is currently in, so the cost of an evaluation
+    does not grow with the number of fences. Positions of a vehicle must be
+    evaluated in time order.
+    """
+
+    def __init__(
+        self,
+        fences: Iterable[Geofence] = (),
+        *,
+        hysteresis_m: float = 25.0,
+        cell_size_deg: float = 0.01,
+        on_event: Callable[[GeofenceEvent], None] | None = None,
+    ) -> None:
+        self.__hysteresis_m = hysteresis_m
+        self.__on_event = on_event
+        self.__index = GeofenceIndex(cell_size_deg=cell_size_deg, margin_m=hysteresis_m)
+        self.__inside: dict[str, set[str]] = {}
+        for fence in fences:
+            self.__index.add(fence)
+
+    @property
+    def fences(self) -> list[Geofence]:
+        return list(self.__index)
+
+    def add_fence(self, fence: Geofence) -> None:
+        self.__index.add(fence)
+
+    def remove_fence(self, fence_id: str) -> bool:
+        """Remove a fence, forgetting the vehicles in it without exit events."""
+        for fence_ids in self.__inside.values():
+            fence_ids.discard(fence_id)
+        return self.__index.remove(fence_id)
+
+    def inside(self, vin: str | VehicleHandle) -> frozenset[str]:
+        """Return the ids of the fences the vehicle is in."""
+        return frozenset(self.__inside.get(vin_of(vin), ()))
+
+    def evaluate(
+        self,
+        vin: str | VehicleHandle,
+        timestamp: int,
+        position: GpsPosition | GpsPosition.WayPoint | None,
+    ) -> list[GeofenceEvent]:
+        """Evaluate a waypoint, returning the events it caused."""
+        point = TrackPoint.of(timestamp, position)
+        if point is None:
+            return []
+        return self.evaluate_point(vin, point)
+
+    def evaluate_point(
+        self, vin: str | VehicleHandle, point: TrackPoint
+    ) -> list[GeofenceEvent]:
+        key = vin_of(vin)
+        latitude = point.latitude * COORDINATE_SCALE
+        longitude = point.longitude * COORDINATE_SCALE
+        inside = self.__inside.setdefault(key, set())
+        events = []
+        for fence_id in self.__index.candidates(latitude, longitude) | inside:
+            fence = self.__index.get(fence_id)
+            if fence is None:
+                continue
+            distance = fence.distance_m(latitude, longitude)
+            if fence_id in inside:
+                if distance > self.__hysteresis_m:
+                    inside.discard(fence_id)
+                    events.append(
+                        GeofenceEvent(
+                            key,
+                            fence_id,
+                            GeofenceTransition.EXIT,
+                            point.timestamp,
+                            latitude,
+                            longitude,
+                        )
+                    )
+            elif distance <= 0:
+                inside.add(fence_id)
+                events.append(
+                    GeofenceEvent(
+                        key,
+                        fence_id,
+                        GeofenceTransition.ENTER,
+                        point.timestamp,
+                        latitude,
+                        longitude,
+                    )
+                )
+        return self.__emit(sorted(events, key=_event_key))
+
+    def evaluate_track(
+        self, vin: str | VehicleHandle, track: Track
+    ) -> list[GeofenceEvent]:
+        """Evaluate a recorded track at once, with NumPy.
+
+        Produces the same events as evaluating its points one by one, and
+        leaves the vehicle in the same state.
+        """
+        require_numpy("geofence track evaluation")
+        key = vin_of(vin)
+        inside = self.__inside.setdefault(key, set())
+        if len(track) == 0:
+            return []
+        columns = track.to_numpy()
+        timestamps = columns["timestamps"]
+        latitudes = columns["latitudes"]
+        longitudes = columns["longitudes"]
+        track_bounds = (
+            float(latitudes.min()),
+            float(longitudes.min()),
+            float(latitudes.max()),
+            float(longitudes.max()),
+        )
+        rows = np.arange(len(track))
+
+        events: list[GeofenceEvent] = []
+        for fence in self.__index:
+            was_inside = fence.fence_id in inside
+            if not was_inside and not _overlaps(
+                self.__index.widened_bounds(fence), track_bounds
+            ):
+                continue
+            distances = fence.distances_m(latitudes, longitudes)
+            # 1 inside, 0 outside beyond the hysteresis, -1 keeps the previous state
+            state = np.where(
+                distances <= 0, 1, np.where(distances > self.__hysteresis_m, 0, -1)
+            )
+            last_decided = np.maximum.accumulate(np.where(state >= 0, rows, -1))
+            states = np.where(
+                last_decided >= 0, state[last_decided], 1 if was_inside else 0
+            )
+            previous = np.concatenate(([1 if was_inside else 0], states[:-1]))
+            events.extend(
+                GeofenceEvent(
+                    key,
+                    fence.fence_id,
+                    GeofenceTransition.ENTER
+                    if states[row]
+                    else GeofenceTransition.EXIT,
+                    int(timestamps[row]),
+                    float(latitudes[row]),
+                    float(longitudes[row]),
+                )
+                for row in np.flatnonzero(states != previous).tolist()
+            )
+            if states[-1]:
+                inside.add(fence.fence_id)
+            else:
+                inside.discard(fence.fence_id)
+        return self.__emit(sorted(events, key=_event_key))
+
+    def __emit(self, events: list[GeofenceEvent]) -> list[GeofenceEvent]:
+        if self.__on_event is not None:
+            for event in events:
+                self.__on_event(event)
+        return events
+
+
+def _overlaps(
+    a: tuple[float, float, float, float], b: tuple[float, float, float, float]
+) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
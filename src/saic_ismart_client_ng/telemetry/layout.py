@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields, is_dataclass
+import types
+from typing import Any, Union, get_args, get_origin, get_type_hints
+
+from saic_ismart_client_ng.api.lazy import LazyView
+
+_TYPECODES: dict[Any, str] = {bool: "b", int: "q", float: "d"}
+
+
+@dataclass(frozen=True, slots=True)
+class Column:
+    """A numeric leaf field of a schema dataclass, e.g. basicVehicleStatus.mileage."""
+
+    name: str
+    path: tuple[str, ...]
+    typecode: str
+
+    def value_of(self, snapshot: Any) -> Any:
+        value = snapshot
+        for attribute in self.path:
+            value = getattr(value, attribute, None)
+            if value is None:
+                return None
+        return value
+
+
+_LAYOUTS: dict[type[Any], tuple[Column, ...]] = {}
+
+
+def schema_kind(data_class: type[Any]) -> type[Any]:
+    """Return the schema dataclass behind a lazy view type."""
+    if issubclass(data_class, LazyView):
+        return data_class._lazy_data_class  # pylint: disable=protected-access # noqa: SLF001
+    return data_class
+
+
+def schema_columns(data_class: type[Any]) -> tuple[Column, ...]:
+    """Flatten the numeric fields of a schema dataclass into columns.
+
+    Strings and lists are not recorded.
+    """
+    data_class = schema_kind(data_class)
+    if (columns := _LAYOUTS.get(data_class)) is None:
+        columns = tuple(_collect_columns(data_class, ()))
+        _LAYOUTS[data_class] = columns
+    return columns
+
+
+def _collect_columns(data_class: type[Any], prefix: tuple[str, ...]) -> list[Column]:
+    hints = get_type_hints(data_class)
+    columns: list[Column] = []
+    for dataclass_field in fields(data_class):
+        path = (*prefix, dataclass_field.name)
+        hint = _strip_optional(hints[dataclass_field.name])
+        if isinstance(hint, type) and is_dataclass(hint):
+            columns.extend(_collect_columns(hint, path))
+        elif (typecode := _TYPECODES.get(hint)) is not None:
+            columns.append(Column(".".join(path), path, typecode))
+    return columns
+
+
+def _strip_optional(hint: Any) -> Any:
+    if get_origin(hint) in (Union, types.UnionType):
+        args = [arg for arg in get_args(hint) if arg is not types.NoneType]
+        if len(args) == 1:
+            return args[0]
+    return hint
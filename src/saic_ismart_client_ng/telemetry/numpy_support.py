@@ -0,0 +1,29 @@
+"""The optional NumPy dependency of the telemetry analytics.
+
+NumPy is installed by the `analytics` extra. The modules that only work with it
+fail on import, the others call require_numpy before their vectorized code.
+Every module imports NumPy the same way::
+
+    with contextlib.suppress(ImportError):
+        import numpy as np
+"""
+
+from __future__ import annotations
+
+import importlib
+
+try:
+    importlib.import_module("numpy")
+except ImportError:
+    HAS_NUMPY = False
+else:
+    HAS_NUMPY = True
+
+
+def require_numpy(feature: str) -> None:
+    """Raise an ImportError naming the `analytics` extra when NumPy is missing."""
+    if not HAS_NUMPY:
+        msg = (
+            f"NumPy is required for {feature}, install saic_ismart_client_ng[analytics]"
+        )
+        raise ImportError(msg)
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+import itertools
+import logging
+import mmap
+from pathlib import Path
+import time
+from typing import TYPE_CHECKING, Any
+
+from saic_ismart_client_ng.registry import VehicleHandle, vin_of
+from saic_ismart_client_ng.telemetry.chunk import (
+    chunk_time_range,
+    encode_chunk,
+    read_chunk,
+)
+from saic_ismart_client_ng.telemetry.layout import schema_columns, schema_kind
+
+if TYPE_CHECKING:
+    from collections.abc import Collection, Iterator
+    import os
+
+    from saic_ismart_client_ng.telemetry.layout import Column
+    from saic_ismart_client_ng.telemetry.rollup import TelemetryRollups
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SUFFIX = ".chunk"
+
+
+@dataclass(slots=True)
+class TelemetryFrame:
+    """Rows of recorded snapshots, one list per column, None for missing values."""
+
+    timestamps: list[int] = field(default_factory=list)
+    columns: dict[str, list[Any]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def column(self, name: str) -> list[Any]:
+        return self.columns.get(name, [None] * len(self.timestamps))
+
+    def extend(self, timestamps: list[int], columns: dict[str, list[Any]]) -> None:
+        rows = len(self.timestamps)
+        for name in columns.keys() - self.columns.keys():
+            self.columns[name] = [None] * rows
+        for name, values in self.columns.items():
+            values.extend(columns.get(name, [None] * len(timestamps)))
+        self.timestamps.extend(timestamps)
+
+    def sorted(self) -> TelemetryFrame:
+        order = sorted(range(len(self.timestamps)), key=self.timestamps.__getitem__)
+        return TelemetryFrame(
+            [self.timestamps[i] for i in order],
+            {name: [values[i] for i in order] for name, values in self.columns.items()},
+        )
+
+
+class _ColumnBuffer:
+    """Typed columns and null bitmaps of the snapshots not flushed yet."""
+
+    def __init__(self, columns: tuple[Column, ...]) -> None:
+        self.columns = columns
+        self.timestamps: array[int] = array("q")
+        self.values: list[array[Any]] = [array(c.typecode) for c in columns]
+        self.nulls: list[bytearray] = [bytearray() for _ in columns]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def append(self, timestamp: int, snapshot: Any) -> None:
+        row = len(self.timestamps)
+        if row % 8 == 0:
+            for nulls in self.nulls:
+                nulls.append(0)
+        self.timestamps.append(timestamp)
+        for column, values, nulls in zip(
+            self.columns, self.values, self.nulls, strict=True
+        ):
+            value = column.value_of(snapshot)
+            try:
+                values.append(value)
+            except (TypeError, OverflowError):
+                if value is not None:
+                    logger.debug("Cannot record %s=%r", column.name, value)
+                values.append(0)
+                nulls[row >> 3] |= 1 << (row & 7)
+
+    def encode(self) -> bytes:
+        return encode_chunk(
+            self.timestamps,
+            list(zip(self.columns, self.values, self.nulls, strict=True)),
+        )
+
+
+def _next_sequence(directory: Path) -> int:
+    return max(
+        (
+            int(path.stem.rsplit("-", 1)[1]) + 1
+            for path in directory.glob(f"*{CHUNK_SUFFIX}")
+        ),
+        default=0,
+    )
+
+
+def _kind_name(kind: type[Any] | str) -> str:
+    return kind if isinstance(kind, str) else schema_kind(kind).__name__
+
+
+class TelemetryReader:
+    """Reads the chunks flushed by a TelemetryRecorder.
+
+    Chunks are laid out as <directory>/<VIN>/<kind>/<start>-<end>-<seq>.chunk,
+    so the chunks outside a time range are skipped without opening them.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str]) -> None:
+        self.__directory = Path(directory)
+
+    def read(
+        self,
+        vin: str | VehicleHandle,
+        kind: type[Any] | str,
+        *,
+        start: int | None = None,
+        end: int | None = None,
+        names: Collection[str] | None = None,
+    ) -> TelemetryFrame:
+        frame = TelemetryFrame()
+        for path in self.chunk_paths(vin, kind, start=start, end=end):
+            with (
+                path.open("rb") as file,
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data,
+            ):
+                frame.extend(*read_chunk(data, start=start, end=end, names=names))
+        return frame.sorted()
+
+    def chunk_paths(
+        self,
+        vin: str | VehicleHandle,
+        kind: type[Any] | str,
+        *,
+        start: int | None = None,
+        end: int | None = None,
+    ) -> Iterator[Path]:
+        directory = self.__directory / vin_of(vin) / _kind_name(kind)
+        if not directory.is_dir():
+            return
+        for path in sorted(directory.glob(f"*{CHUNK_SUFFIX}")):
+            chunk_start, chunk_end, _ = path.stem.split("-")
+            if (end is None or int(chunk_start) <= end) and (
+                start is None or int(chunk_end) >= start
+            ):
+                yield path
+
+
+class TelemetryRecorder:
+    """Records vehicle and charging snapshots into per VIN typed columns.
+
+    Each numeric field of the snapshot schema becomes a column, missing values
+    are tracked in a null bitmap. Every `chunk_size` rows the columns of a VIN
+    are flushed into a chunk file, or kept as an in-memory chunk when no
+    directory is given. Recorded snapshots also update the rollups, if any.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str] | None = None,
+        *,
+        chunk_size: int = 4096,
+        rollups: TelemetryRollups | None = None,
+    ) -> None:
+        self.__directory = Path(directory) if directory is not None else None
+        self.__chunk_size = chunk_size
+        self.__rollups = rollups
+        self.__buffers: dict[tuple[str, str], _ColumnBuffer] = {}
+        self.__memory_chunks: dict[tuple[str, str], list[bytes]] = {}
+        self.__sequences: dict[tuple[str, str], Iterator[int]] = {}
+
+    def record(
+        self,
+        vin: str | VehicleHandle,
+        snapshot: Any,
+        *,
+        timestamp: int | None = None,
+    ) -> None:
+        """Append a snapshot, by default at its statusTime or the current time."""
+        if timestamp is None:
+            timestamp = getattr(snapshot, "statusTime", None)
+        if timestamp is None:
+            timestamp = int(time.time())
+        key = (vin_of(vin), _kind_name(type(snapshot)))
+        buffer = self.__buffers.get(key)
+        if buffer is None:
+            buffer = _ColumnBuffer(schema_columns(type(snapshot)))
+            self.__buffers[key] = buffer
+        buffer.append(timestamp, snapshot)
+        if self.__rollups is not None:
+            self.__rollups.add(vin, snapshot, timestamp=timestamp)
+        if len(buffer) >= self.__chunk_size:
+            self.__flush(key)
+
+    def flush(self) -> None:
+        for key in list(self.__buffers):
+            self.__flush(key)
+
+    def read(
+        self,
+        vin: str | VehicleHandle,
+        kind: type[Any] | str,
+        *,
+        start: int | None = None,
+        end: int | None = None,
+        names: Collection[str] | None = None,
+    ) -> TelemetryFrame:
+        """Read the recorded rows in a time range, flushed or not."""
+        key = (vin_of(vin), _kind_name(kind))
+        if self.__directory is not None:
+            frame = TelemetryReader(self.__directory).read(
+                vin, kind, start=start, end=end, names=names
+            )
+        else:
+            frame = TelemetryFrame()
+        chunks = list(self.__memory_chunks.get(key, []))
+        if (buffer := self.__buffers.get(key)) is not None:
+            chunks.append(buffer.encode())
+        for chunk in chunks:
+            chunk_start, chunk_end = chunk_time_range(chunk)
+            if (end is None or chunk_start <= end) and (
+                start is None or chunk_end >= start
+            ):
+                frame.extend(*read_chunk(chunk, start=start, end=end, names=names))
+        return frame.sorted()
+
+    def __flush(self, key: tuple[str, str]) -> None:
+        buffer = self.__buffers.pop(key, None)
+        if buffer is None or len(buffer) == 0:
+            return
+        chunk = buffer.encode()
+        if self.__directory is None:
+            self.__memory_chunks.setdefault(key, []).append(chunk)
+            return
+        chunk_start, chunk_end = chunk_time_range(chunk)
+        directory = self.__directory.joinpath(*key)
+        directory.mkdir(parents=True, exist_ok=True)
+        sequence = self.__sequences.get(key)
+        if sequence is None:
+            # Continue after the chunks of earlier recorders, never replace them
+            sequence = itertools.count(_next_sequence(directory))
+            self.__sequences[key] = sequence
+        path = directory / (
+            f"{chunk_start:012d}-{chunk_end:012d}-{next(sequence):06d}{CHUNK_SUFFIX}"
+        )
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(chunk)
+        tmp_path.replace(path)
@@ -0,0 +1,323 @@
+"""Precomputed rollups of recorded telemetry, for charting long time ranges.
+
+Every numeric field of BasicVehicleStatus, ChargingStatus and ChrgMgmtData is
+summarized in 1 minute, 1 hour and 1 day buckets as snapshots arrive. A query
+for any bucket size that is a multiple of a minute is answered from the
+coarsest tier that divides it, so a month of samples becomes a few thousand
+buckets before any arithmetic happens.
+
+Requires NumPy, available through the `analytics` extra.
+"""
+
+from __future__ import annotations
+
+from array import array
+import bisect
+import contextlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from saic_ismart_client_ng.registry import VehicleHandle, vin_of
+from saic_ismart_client_ng.telemetry.layout import schema_columns, schema_kind
+from saic_ismart_client_ng.telemetry.numpy_support import require_numpy
+
+with contextlib.suppress(ImportError):
+    import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    import numpy.typing as npt
+
+    from saic_ismart_client_ng.telemetry.layout import Column
+    from saic_ismart_client_ng.telemetry.recorder import TelemetryFrame
+
+    FloatArray = npt.NDArray[np.float64]
+    IntArray = npt.NDArray[np.int64]
+
+require_numpy("telemetry rollups")
+
+TIERS = (60, 3600, 86400)
+
+# The parts of the snapshots that are rolled up, by snapshot kind
+DEFAULT_PREFIXES = {
+    "VehicleStatusResp": "basicVehicleStatus.",
+    "ChargeStatusResp": "chargingStatus.",
+    "ChrgMgmtDataResp": "chrgMgmtData.",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Aggregate:
+    """Summary of a column per bucket, keyed by the start time of the bucket."""
+
+    timestamps: IntArray
+    minimum: FloatArray
+    maximum: FloatArray
+    average: FloatArray
+    last: FloatArray
+    count: IntArray
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+@dataclass(frozen=True, slots=True)
+class BucketStats:
+    starts: IntArray
+    minimum: FloatArray
+    maximum: FloatArray
+    total: FloatArray
+    count: IntArray
+    last: FloatArray
+    last_time: IntArray
+
+
+def bucket_stats(
+    timestamps: Sequence[int] | IntArray,
+    values: Sequence[float | None] | FloatArray,
+    bucket: int,
+) -> BucketStats:
+    """Summarize raw samples per bucket, missing values do not count."""
+    times = np.asarray(timestamps, dtype=np.int64)
+    data = np.array(
+        [np.nan if value is None else value for value in values]
+        if not isinstance(values, np.ndarray)
+        else values,
+        dtype=np.float64,
+    )
+    valid = ~np.isnan(data)
+    times, data = times[valid], data[valid]
+    order = np.argsort(times, kind="stable")
+    times, data = times[order], data[order]
+    samples = BucketStats(
+        times, data, data, data, np.ones(len(data), dtype=np.int64), data, times
+    )
+    return _reduce(times - times % bucket, samples)
+
+
+def _reduce(keys: IntArray, stats: BucketStats) -> BucketStats:
+    """Merge the rows of stats with equal keys, which must be sorted."""
+    if len(keys) == 0:
+        empty_int = np.empty(0, dtype=np.int64)
+        empty = np.empty(0, dtype=np.float64)
+        return BucketStats(empty_int, empty, empty, empty, empty_int, empty, empty_int)
+    firsts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    lasts = np.concatenate((firsts[1:], [len(keys)])) - 1
+    return BucketStats(
+        starts=keys[firsts],
+        minimum=np.minimum.reduceat(stats.minimum, firsts),
+        maximum=np.maximum.reduceat(stats.maximum, firsts),
+        total=np.add.reduceat(stats.total, firsts),
+        count=np.add.reduceat(stats.count, firsts),
+        last=stats.last[lasts],
+        last_time=stats.last_time[lasts],
+    )
+
+
+class _Series:
+    """The buckets of one column in one tier, sorted by start time."""
+
+    __slots__ = ("count", "last", "last_time", "maximum", "minimum", "starts", "total")
+
+    def __init__(self) -> None:
+        self.starts = array("q")
+        self.minimum = array("d")
+        self.maximum = array("d")
+        self.total = array("d")
+        self.count = array("q")
+        self.last = array("d")
+        self.last_time = array("q")
+
+    def merge(
+        self,
+        start: int,
+        stats: tuple[float, float, float, int, float, int],
+    ) -> None:
+        minimum, maximum, total, count, last, last_time = stats
+        starts = self.starts
+        if starts and start <= starts[-1]:
+            index = bisect.bisect_left(starts, start)
+            if starts[index] == start:
+                self.minimum[index] = min(self.minimum[index], minimum)
+                self.maximum[index] = max(self.maximum[index], maximum)
+                self.total[index] += total
+                self.count[index] += count
+                if last_time >= self.last_time[index]:
+                    self.last[index] = last
+                    self.last_time[index] = last_time
+                return
+        else:
+            index = len(starts)
+        # A new bucket, usually at the end
+        columns: tuple[array[Any], ...] = (
+            starts,
+            self.minimum,
+            self.maximum,
+            self.total,
+            self.count,
+            self.last,
+            self.last_time,
+        )
+        values = (start, minimum, maximum, total, count, last, last_time)
+        for column, value in zip(columns, values, strict=True):
+            column.insert(index, value)
+
+    def range(self, start: int | None, end: int | None) -> BucketStats:
+        """Return a copy of the buckets starting in a time range."""
+        lo = 0 if start is None else bisect.bisect_left(self.starts, start)
+        hi = len(self.starts) if end is None else bisect.bisect_right(self.starts, end)
+        return BucketStats(
+            starts=np.frombuffer(self.starts[lo:hi], dtype=np.int64),
+            minimum=np.frombuffer(self.minimum[lo:hi], dtype=np.float64),
+            maximum=np.frombuffer(self.maximum[lo:hi], dtype=np.float64),
+            total=np.frombuffer(self.total[lo:hi], dtype=np.float64),
+            count=np.frombuffer(self.count[lo:hi], dtype=np.int64),
+            last=np.frombuffer(self.last[lo:hi], dtype=np.float64),
+            last_time=np.frombuffer(self.last_time[lo:hi], dtype=np.int64),
+        )
+
+
+class TelemetryRollups:
+    """Keeps the min, max, sum, count and last value of columns per time bucket.
+
+    Snapshots are added one by one as they arrive, typically by passing the
+    rollups to a TelemetryRecorder, or in bulk from recorded frames. Both
+    update the same tiers, in any time order.
+    """
+
+    def __init__(
+        self,
+        *,
+        prefixes: dict[str, str] | None = None,
+        tiers: Iterable[int] = TIERS,
+    ) -> None:
+        self.__prefixes = DEFAULT_PREFIXES if prefixes is None else dict(prefixes)
+        self.__tiers = tuple(sorted(tiers))
+        if not self.__tiers or any(
+            coarse % fine
+            for fine, coarse in zip(self.__tiers, self.__tiers[1:], strict=False)
+        ):
+            msg = "Each tier must be a multiple of the finer ones"
+            raise ValueError(msg)
+        self.__columns: dict[type[Any], tuple[Column, ...]] = {}
+        self.__series: dict[tuple[str, str, int], _Series] = {}
+
+    @property
+    def tiers(self) -> tuple[int, ...]:
+        return self.__tiers
+
+    def add(self, vin: str | VehicleHandle, snapshot: Any, *, timestamp: int) -> None:
+        """Add a snapshot of one of the rolled up kinds, other kinds are ignored."""
+        columns = self.__columns_of(type(snapshot))
+        if not columns:
+            return
+        key = vin_of(vin)
+        for column in columns:
+            value = column.value_of(snapshot)
+            if value is None:
+                continue
+            value = float(value)
+            stats = (value, value, value, 1, value, timestamp)
+            for tier in self.__tiers:
+                self.__series_of(key, column.name, tier).merge(
+                    timestamp - timestamp % tier, stats
+                )
+
+    def feed_frame(
+        self, vin: str | VehicleHandle, kind: type[Any] | str, frame: TelemetryFrame
+    ) -> None:
+        """Add recorded rows, e.g. read back from a TelemetryReader."""
+        prefix = self.__prefixes.get(
+            kind if isinstance(kind, str) else schema_kind(kind).__name__
+        )
+        if prefix is None:
+            return
+        key = vin_of(vin)
+        for name, values in frame.columns.items():
+            if not name.startswith(prefix):
+                continue
+            stats = bucket_stats(frame.timestamps, values, self.__tiers[0])
+            for tier in self.__tiers:
+                if tier != self.__tiers[0]:
+                    stats = _rebucket(stats, tier)
+                series = self.__series_of(key, name, tier)
+                for row in zip(
+                    stats.starts.tolist(),
+                    zip(
+                        stats.minimum.tolist(),
+                        stats.maximum.tolist(),
+                        stats.total.tolist(),
+                        stats.count.tolist(),
+                        stats.last.tolist(),
+                        stats.last_time.tolist(),
+                        strict=True,
+                    ),
+                    strict=True,
+                ):
+                    series.merge(*row)
+
+    def columns(self, vin: str | VehicleHandle) -> list[str]:
+        """Return the names of the columns with data for a vehicle."""
+        key = vin_of(vin)
+        tier = self.__tiers[0]
+        return sorted(name for (v, name, t) in self.__series if v == key and t == tier)
+
+    def aggregate(
+        self,
+        vin: str | VehicleHandle,
+        column: str,
+        *,
+        bucket: int,
+        start: int | None = None,
+        end: int | None = None,
+    ) -> Aggregate:
+        """Summarize a column in buckets of `bucket` seconds, within a time range.
+
+        `bucket` must be a multiple of the finest tier. Buckets are aligned on
+        multiples of their size, the ones overlapping the range are included.
+        """
+        tier = max((t for t in self.__tiers if bucket % t == 0), default=None)
+        if tier is None:
+            msg = f"bucket must be a multiple of {self.__tiers[0]} seconds"
+            raise ValueError(msg)
+        series = self.__series.get((vin_of(vin), column, tier))
+        stats = (
+            series.range(
+                None if start is None else start - start % bucket,
+                end,
+            )
+            if series is not None
+            else bucket_stats([], [], bucket)
+        )
+        if bucket != tier:
+            stats = _rebucket(stats, bucket)
+        return Aggregate(
+            timestamps=stats.starts,
+            minimum=stats.minimum,
+            maximum=stats.maximum,
+            average=stats.total / np.maximum(stats.count, 1),
+            last=stats.last,
+            count=stats.count,
+        )
+
+    def __columns_of(self, kind: type[Any]) -> tuple[Column, ...]:
+        columns = self.__columns.get(kind)
+        if columns is None:
+            prefix = self.__prefixes.get(schema_kind(kind).__name__)
+            columns = self.__columns[kind] = (
+                tuple(c for c in schema_columns(kind) if c.name.startswith(prefix))
+                if prefix is not None
+                else ()
+            )
+        return columns
+
+    def __series_of(self, vin: str, column: str, tier: int) -> _Series:
+        series = self.__series.get((vin, column, tier))
+        if series is None:
+            series = self.__series[vin, column, tier] = _Series()
+        return series
+
+
+def _rebucket(stats: BucketStats, bucket: int) -> BucketStats:
+    return _reduce(stats.starts - stats.starts % bucket, stats)
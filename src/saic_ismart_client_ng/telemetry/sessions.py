@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING, Any
+
+from saic_ismart_client_ng.api.vehicle_charging.schema import (
+    BMS_CHARGING_STATUSES,
+    BmsChargingStatusCode,
+    ChargingStopReason,
+)
+from saic_ismart_client_ng.registry import VehicleHandle, vin_of
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from saic_ismart_client_ng.api.vehicle_charging.schema import ChrgMgmtDataResp
+    from saic_ismart_client_ng.telemetry.recorder import TelemetryFrame
+
+_DC_STATUS = BmsChargingStatusCode.CHARGING_10.value
+
+
+class ChargingType(Enum):
+    AC = "AC"
+    DC = "DC"
+
+
+@dataclass(frozen=True, slots=True)
+class ChargingSession:
+    """A completed charging session.
+
+    Energies are in kWh and powers in kW. `energy_kwh` integrates the pack power
+    over the session, the reported values come from RvsChargeStatus.
+    """
+
+    vin: str
+    start: int
+    end: int
+    samples: int
+    charging_type: ChargingType
+    energy_kwh: float
+    peak_power_kw: float
+    start_soc: float | None
+    end_soc: float | None
+    stop_reason: ChargingStopReason | None
+    last_charge_ending_energy_kwh: float | None
+    used_since_previous_charge_kwh: float | None
+
+    @property
+    def duration(self) -> int:
+        return self.end - self.start
+
+
+@dataclass(frozen=True, slots=True)
+class _Sample:
+    timestamp: int
+    bms_chrg_sts: int | None
+    bms_pack_crnt: int | None
+    bms_pack_vol: int | None
+    bms_pack_soc_dsp: int | None
+    bms_chrg_sp_rsn: int | None
+    ccu_off_bd_chrgr_plug_on: int | None
+    charging_gun_state: int | None
+    last_charge_ending_power: int | None
+    power_usage_since_last_charge: int | None
+
+    @property
+    def is_charging(self) -> bool:
+        if self.charging_gun_state == 0:
+            return False
+        return self.bms_chrg_sts in BMS_CHARGING_STATUSES
+
+    @property
+    def is_dc(self) -> bool:
+        return self.bms_chrg_sts == _DC_STATUS or bool(self.ccu_off_bd_chrgr_plug_on)
+
+    @property
+    def power_kw(self) -> float | None:
+        """Charging power, positive while charging."""
+        if self.bms_pack_crnt is None or self.bms_pack_vol is None:
+            return None
+        current = self.bms_pack_crnt * 0.05 - 1000.0
+        voltage = self.bms_pack_vol * 0.25
+        return -current * voltage / 1000.0
+
+    @property
+    def soc(self) -> float | None:
+        return (
+            self.bms_pack_soc_dsp / 10.0 if self.bms_pack_soc_dsp is not None else None
+        )
+
+
+_FRAME_COLUMNS = {
+    "bms_chrg_sts": "chrgMgmtData.bmsChrgSts",
+    "bms_pack_crnt": "chrgMgmtData.bmsPackCrnt",
+    "bms_pack_vol": "chrgMgmtData.bmsPackVol",
+    "bms_pack_soc_dsp": "chrgMgmtData.bmsPackSOCDsp",
+    "bms_chrg_sp_rsn": "chrgMgmtData.bmsChrgSpRsn",
+    "ccu_off_bd_chrgr_plug_on": "chrgMgmtData.ccuOffBdChrgrPlugOn",
+    "charging_gun_state": "rvsChargeStatus.chargingGunState",
+    "last_charge_ending_power": "rvsChargeStatus.lastChargeEndingPower",
+    "power_usage_since_last_charge": "rvsChargeStatus.powerUsageSinceLastCharge",
+}
+
+
+class _OpenSession:
+    """The running totals of a session in progress."""
+
+    __slots__ = (
+        "dc",
+        "energy_kwh",
+        "last_power",
+        "last_soc",
+        "last_timestamp",
+        "peak_power_kw",
+        "samples",
+        "start",
+        "start_soc",
+        "used_since_previous_charge",
+    )
+
+    def __init__(self, sample: _Sample, used_since_previous_charge: int | None) -> None:
+        self.start = sample.timestamp
+        self.last_timestamp = sample.timestamp
+        self.last_power = sample.power_kw
+        self.start_soc = sample.soc
+        self.last_soc = sample.soc
+        self.dc = sample.is_dc
+        self.energy_kwh = 0.0
+        self.peak_power_kw = sample.power_kw or 0.0
+        self.samples = 1
+        self.used_since_previous_charge = used_since_previous_charge
+
+    def add(self, sample: _Sample) -> None:
+        power = sample.power_kw
+        if power is not None and self.last_power is not None:
+            hours = (sample.timestamp - self.last_timestamp) / 3600.0
+            self.energy_kwh += (power + self.last_power) / 2.0 * hours
+        if power is not None:
+            self.peak_power_kw = max(self.peak_power_kw, power)
+            self.last_power = power
+        if sample.soc is not None:
+            self.last_soc = sample.soc
+        self.dc = self.dc or sample.is_dc
+        self.last_timestamp = sample.timestamp
+        self.samples += 1
+
+    def close(self, vin: str, end_sample: _Sample | None) -> ChargingSession:
+        ending_power = end_sample.last_charge_ending_power if end_sample else None
+        stop_reason = (
+            ChargingStopReason.to_code(end_sample.bms_chrg_sp_rsn)
+            if end_sample is not None and end_sample.bms_chrg_sp_rsn is not None
+            else None
+        )
+        return ChargingSession(
+            vin=vin,
+            start=self.start,
+            end=self.last_timestamp,
+            samples=self.samples,
+            charging_type=ChargingType.DC if self.dc else ChargingType.AC,
+            energy_kwh=self.energy_kwh,
+            peak_power_kw=self.peak_power_kw,
+            start_soc=self.start_soc,
+            end_soc=self.last_soc,
+            stop_reason=stop_reason,
+            last_charge_ending_energy_kwh=ending_power / 10.0
+            if ending_power is not None
+            else None,
+            used_since_previous_charge_kwh=self.used_since_previous_charge / 10.0
+            if self.used_since_previous_charge is not None
+            else None,
+        )
+
+
+class _VehicleState:
+    __slots__ = ("last_timestamp", "last_usage", "session")
+
+    def __init__(self) -> None:
+        self.session: _OpenSession | None = None
+        self.last_timestamp: int | None = None
+        self.last_usage: int | None = None
+
+
+class ChargingSessionDetector:
+    """Reconstructs charging sessions from a stream of charging snapshots.
+
+    A session starts when bmsChrgSts turns to a charging state with the gun
+    plugged in and ends with the first sample that is not charging, or when
+    no sample arrived for `max_gap` seconds. The charging states are the ones
+    ChrgMgmtData.is_bms_charging accepts, so SUPER_OFFBOARD_CHARGING samples
+    do not open a session. Only the running totals of the open session are
+    kept per vehicle, so snapshots can be fed live or in a single pass over
+    an archive. Snapshots of a vehicle must be fed in time order.
+    """
+
+    def __init__(
+        self,
+        *,
+        on_session: Callable[[ChargingSession], None] | None = None,
+        max_gap: int | None = 3600,
+    ) -> None:
+        self.__on_session = on_session
+        self.__max_gap = max_gap
+        self.__vehicles: dict[str, _VehicleState] = {}
+
+    def feed(
+        self, vin: str | VehicleHandle, timestamp: int, snapshot: ChrgMgmtDataResp
+    ) -> ChargingSession | None:
+        """Consume a snapshot, returning the session it completed, if any."""
+        data = snapshot.chrgMgmtData
+        status = snapshot.rvsChargeStatus
+        return self.__feed(
+            vin_of(vin),
+            _Sample(
+                timestamp=timestamp,
+                bms_chrg_sts=data.bmsChrgSts if data else None,
+                bms_pack_crnt=data.bmsPackCrnt if data else None,
+                bms_pack_vol=data.bmsPackVol if data else None,
+                bms_pack_soc_dsp=data.bmsPackSOCDsp if data else None,
+                bms_chrg_sp_rsn=data.bmsChrgSpRsn if data else None,
+                ccu_off_bd_chrgr_plug_on=data.ccuOffBdChrgrPlugOn if data else None,
+                charging_gun_state=status.chargingGunState if status else None,
+                last_charge_ending_power=status.lastChargeEndingPower
+                if status
+                else None,
+                power_usage_since_last_charge=status.powerUsageSinceLastCharge
+                if status
+                else None,
+            ),
+        )
+
+    def feed_frame(
+        self, vin: str | VehicleHandle, frame: TelemetryFrame
+    ) -> list[ChargingSession]:
+        """Consume the rows of a recorded ChrgMgmtDataResp frame."""
+        vin = vin_of(vin)
+        columns: dict[str, list[Any]] = {
+            key: frame.column(name) for key, name in _FRAME_COLUMNS.items()
+        }
+        sessions = []
+        for row, timestamp in enumerate(frame.timestamps):
+            sample = _Sample(
+                timestamp, **{key: values[row] for key, values in columns.items()}
+            )
+            if (session := self.__feed(vin, sample)) is not None:
+                sessions.append(session)
+        return sessions
+
+    def flush(self, vin: str | VehicleHandle | None = None) -> list[ChargingSession]:
+        """Close the sessions still in progress, e.g. at the end of an archive."""
+        vins = list(self.__vehicles) if vin is None else [vin_of(vin)]
+        sessions = []
+        for key in vins:
+            state = self.__vehicles.get(key)
+            if state is not None and state.session is not None:
+                sessions.append(self.__close(key, state, state.session, None))
+        return sessions
+
+    def __feed(self, vin: str, sample: _Sample) -> ChargingSession | None:
+        state = self.__vehicles.get(vin)
+        if state is None:
+            state = self.__vehicles[vin] = _VehicleState()
+
+        completed = None
+        if (
+            state.session is not None
+            and self.__max_gap is not None
+            and state.last_timestamp is not None
+            and sample.timestamp - state.last_timestamp > self.__max_gap
+        ):
+            completed = self.__close(vin, state, state.session, None)
+
+        if sample.is_charging:
+            if state.session is None:
+                state.session = _OpenSession(sample, state.last_usage)
+            else:
+                state.session.add(sample)
+        elif state.session is not None:
+            completed = self.__close(vin, state, state.session, sample)
+
+        state.last_timestamp = sample.timestamp
+        if sample.power_usage_since_last_charge is not None:
+            state.last_usage = sample.power_usage_since_last_charge
+        return completed
+
+    def __close(
+        self,
+        vin: str,
+        state: _VehicleState,
+        open_session: _OpenSession,
+        end_sample: _Sample | None,
+    ) -> ChargingSession:
+        session = open_session.close(vin, end_sample)
+        state.session = None
+        if self.__on_session is not None:
+            self.__on_session(session)
+        return session
@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+from array import array
+import bisect
+import contextlib
+from dataclasses import dataclass, field
+import math
+import mmap
+from pathlib import Path
+import struct
+from typing import TYPE_CHECKING, Any, NamedTuple, Protocol
+
+from saic_ismart_client_ng.api.schema import GpsPosition
+from saic_ismart_client_ng.registry import VehicleHandle, vin_of
+from saic_ismart_client_ng.telemetry.numpy_support import require_numpy
+
+with contextlib.suppress(ImportError):
+    import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Sequence
+    import os
+
+    import numpy.typing as npt
+
+# Latitudes and longitudes are reported in millionths of a degree
+COORDINATE_SCALE = 1e-6
+EARTH_RADIUS_M = 6_371_000.0
+TRACK_SUFFIX = ".track"
+_RECORD = struct.Struct("<qiiiii")
+
+
+class TrackPoint(NamedTuple):
+    timestamp: int
+    latitude: int
+    longitude: int
+    altitude: int
+    speed: int
+    heading: int
+
+    @classmethod
+    def of(
+        cls, timestamp: int, position: GpsPosition | GpsPosition.WayPoint | None
+    ) -> TrackPoint | None:
+        """Build a point from a GPS position, None when it carries no coordinates."""
+        way_point = position.wayPoint if isinstance(position, GpsPosition) else position
+        if way_point is None or way_point.position is None:
+            return None
+        latitude = way_point.position.latitude
+        longitude = way_point.position.longitude
+        if latitude is None or longitude is None or (latitude == 0 and longitude == 0):
+            return None
+        return cls(
+            timestamp,
+            latitude,
+            longitude,
+            way_point.position.altitude or 0,
+            way_point.speed or 0,
+            way_point.heading or 0,
+        )
+
+
+def distance_m(a: TrackPoint, b: TrackPoint) -> float:
+    """Equirectangular distance, accurate enough between nearby points."""
+    x, y = _project(a, b)
+    return math.hypot(x, y)
+
+
+def _project(origin: TrackPoint, point: TrackPoint) -> tuple[float, float]:
+    """Project a point on a plane tangent at origin, in meters."""
+    scale = math.radians(COORDINATE_SCALE) * EARTH_RADIUS_M
+    mean_latitude = math.radians(
+        (origin.latitude + point.latitude) / 2 * COORDINATE_SCALE
+    )
+    return (
+        (point.longitude - origin.longitude) * scale * math.cos(mean_latitude),
+        (point.latitude - origin.latitude) * scale,
+    )
+
+
+def _segment_distance_m(point: TrackPoint, start: TrackPoint, end: TrackPoint) -> float:
+    px, py = _project(start, point)
+    ex, ey = _project(start, end)
+    length_squared = ex * ex + ey * ey
+    if length_squared == 0:
+        return math.hypot(px, py)
+    t = max(0.0, min(1.0, (px * ex + py * ey) / length_squared))
+    return math.hypot(px - t * ex, py - t * ey)
+
+
+def douglas_peucker(points: Sequence[TrackPoint], epsilon_m: float) -> list[TrackPoint]:
+    """Simplify a whole track, keeping the points further than epsilon_m from it."""
+    if len(points) < 3:
+        return list(points)
+    keep = bytearray(len(points))
+    keep[0] = keep[-1] = 1
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        farthest, max_distance = first, 0.0
+        for index in range(first + 1, last):
+            distance = _segment_distance_m(points[index], points[first], points[last])
+            if distance > max_distance:
+                farthest, max_distance = index, distance
+        if max_distance > epsilon_m:
+            keep[farthest] = 1
+            stack.extend(((first, farthest), (farthest, last)))
+    return [point for point, kept in zip(points, keep, strict=True) if kept]
+
+
+class Downsampler(Protocol):
+    def push(self, point: TrackPoint) -> list[TrackPoint]:
+        """Consume a point, returning the points that are now final."""
+
+    def pending(self) -> TrackPoint | None:
+        """Return the latest point, kept until a later point decides its fate."""
+
+
+class DistanceDownsampler:
+    """Drops the points closer than min_distance_m to the last kept point."""
+
+    def __init__(self, min_distance_m: float) -> None:
+        self.__min_distance_m = min_distance_m
+        self.__last: TrackPoint | None = None
+
+    def push(self, point: TrackPoint) -> list[TrackPoint]:
+        if (
+            self.__last is not None
+            and distance_m(self.__last, point) < self.__min_distance_m
+        ):
+            return []
+        self.__last = point
+        return [point]
+
+    def pending(self) -> TrackPoint | None:
+        return None
+
+
+class OpeningWindowDownsampler:
+    """Online Douglas-Peucker approximation using an opening window.
+
+    Points are buffered while every buffered point stays within epsilon_m of
+    the segment from the last kept point to the newest one. When that fails,
+    or the window is full, the point before the newest one is kept.
+    """
+
+    def __init__(self, epsilon_m: float, *, max_window: int = 64) -> None:
+        if max_window < 2:
+            msg = f"The window must hold at least 2 points, not {max_window}"
+            raise ValueError(msg)
+        self.__epsilon_m = epsilon_m
+        self.__max_window = max_window
+        self.__anchor: TrackPoint | None = None
+        self.__window: list[TrackPoint] = []
+
+    def push(self, point: TrackPoint) -> list[TrackPoint]:
+        if self.__anchor is None:
+            self.__anchor = point
+            return [point]
+        anchor = self.__anchor
+        if len(self.__window) >= self.__max_window or any(
+            _segment_distance_m(p, anchor, point) > self.__epsilon_m
+            for p in self.__window
+        ):
+            self.__anchor = self.__window[-1]
+            self.__window = [point]
+            return [self.__anchor]
+        self.__window.append(point)
+        return []
+
+    def pending(self) -> TrackPoint | None:
+        return self.__window[-1] if self.__window else None
+
+
+@dataclass(slots=True)
+class Track:
+    """Waypoints of a vehicle in packed integer columns."""
+
+    timestamps: array[int] = field(default_factory=lambda: array("q"))
+    latitudes: array[int] = field(default_factory=lambda: array("i"))
+    longitudes: array[int] = field(default_factory=lambda: array("i"))
+    altitudes: array[int] = field(default_factory=lambda: array("i"))
+    speeds: array[int] = field(default_factory=lambda: array("i"))
+    headings: array[int] = field(default_factory=lambda: array("i"))
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __columns(self) -> tuple[array[int], ...]:
+        return (
+            self.timestamps,
+            self.latitudes,
+            self.longitudes,
+            self.altitudes,
+            self.speeds,
+            self.headings,
+        )
+
+    def append(self, point: TrackPoint) -> None:
+        for column, value in zip(self.__columns(), point, strict=True):
+            column.append(value)
+
+    def extend(self, points: Iterable[TrackPoint]) -> None:
+        for point in points:
+            self.append(point)
+
+    def points(self) -> list[TrackPoint]:
+        return [TrackPoint(*row) for row in zip(*self.__columns(), strict=True)]
+
+    def slice(self, start: int | None = None, end: int | None = None) -> Track:
+        """Return the points with start <= timestamp <= end, timestamps being sorted."""
+        lo = 0 if start is None else bisect.bisect_left(self.timestamps, start)
+        hi = len(self) if end is None else bisect.bisect_right(self.timestamps, end)
+        return Track(*(column[lo:hi] for column in self.__columns()))
+
+    def latitudes_deg(self) -> list[float]:
+        return [value * COORDINATE_SCALE for value in self.latitudes]
+
+    def longitudes_deg(self) -> list[float]:
+        return [value * COORDINATE_SCALE for value in self.longitudes]
+
+    def to_numpy(self) -> dict[str, npt.NDArray[Any]]:
+        """Return the columns as NumPy arrays, with coordinates in degrees.
+
+        The integer columns share the memory of the track.
+        """
+        require_numpy("track arrays")
+        return {
+            "timestamps": np.frombuffer(self.timestamps, dtype=np.int64),
+            "latitudes": np.frombuffer(self.latitudes, dtype=np.int32)
+            * COORDINATE_SCALE,
+            "longitudes": np.frombuffer(self.longitudes, dtype=np.int32)
+            * COORDINATE_SCALE,
+            "altitudes": np.frombuffer(self.altitudes, dtype=np.int32),
+            "speeds": np.frombuffer(self.speeds, dtype=np.int32),
+            "headings": np.frombuffer(self.headings, dtype=np.int32),
+        }
+
+
+class _MappedTimestamps:
+    """Sequence view of the timestamps of a memory mapped track file."""
+
+    def __init__(self, data: mmap.mmap) -> None:
+        self.__data = data
+
+    def __len__(self) -> int:
+        return len(self.__data) // _RECORD.size
+
+    def __getitem__(self, index: int) -> int:
+        (timestamp,) = struct.unpack_from("<q", self.__data, index * _RECORD.size)
+        return int(timestamp)
+
+
+def read_track_file(
+    path: str | os.PathLike[str], *, start: int | None = None, end: int | None = None
+) -> Track:
+    """Read the points of a track file in a time range, via a memory map."""
+    track = Track()
+    path = Path(path)
+    if not path.exists() or path.stat().st_size == 0:
+        return track
+    with (
+        path.open("rb") as file,
+        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data,
+    ):
+        timestamps = _MappedTimestamps(data)
+        lo = 0 if start is None else bisect.bisect_left(timestamps, start)
+        hi = len(timestamps) if end is None else bisect.bisect_right(timestamps, end)
+        track.extend(
+            TrackPoint(*row)
+            for row in _RECORD.iter_unpack(data[lo * _RECORD.size : hi * _RECORD.size])
+        )
+    return track
+
+
+class TrackStore:
+    """Keeps the waypoints of each vehicle in packed integer columns.
+
+    Points can be downsampled as they arrive. With a directory, flush appends
+    the points of each vehicle to <directory>/<VIN>.track as fixed size
+    records, so time ranges are read from a memory map without loading the
+    whole file. Points of a vehicle are expected in time order.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str] | None = None,
+        *,
+        downsampler: Callable[[], Downsampler] | None = None,
+    ) -> None:
+        self.__directory = Path(directory) if directory is not None else None
+        self.__downsampler = downsampler
+        self.__tracks: dict[str, Track] = {}
+        self.__downsamplers: dict[str, Downsampler] = {}
+
+    def append(
+        self,
+        vin: str | VehicleHandle,
+        timestamp: int,
+        position: GpsPosition | GpsPosition.WayPoint | None,
+    ) -> bool:
+        """Add a waypoint, returning False when it has no coordinates."""
+        point = TrackPoint.of(timestamp, position)
+        if point is None:
+            return False
+        self.append_point(vin, point)
+        return True
+
+    def append_point(self, vin: str | VehicleHandle, point: TrackPoint) -> None:
+        key = vin_of(vin)
+        track = self.__tracks.get(key)
+        if track is None:
+            track = self.__tracks[key] = Track()
+        if self.__downsampler is None:
+            track.append(point)
+            return
+        downsampler = self.__downsamplers.get(key)
+        if downsampler is None:
+            downsampler = self.__downsamplers[key] = self.__downsampler()
+        track.extend(downsampler.push(point))
+
+    def read(
+        self,
+        vin: str | VehicleHandle,
+        *,
+        start: int | None = None,
+        end: int | None = None,
+    ) -> Track:
+        """Return the points in a time range, flushed or not, including the pending one."""
+        key = vin_of(vin)
+        track = (
+            read_track_file(_track_path(self.__directory, key), start=start, end=end)
+            if self.__directory is not None
+            else Track()
+        )
+        if (buffered := self.__tracks.get(key)) is not None:
+            track.extend(buffered.slice(start, end).points())
+        downsampler = self.__downsamplers.get(key)
+        pending = downsampler.pending() if downsampler is not None else None
+        if (
+            pending is not None
+            and (start is None or pending.timestamp >= start)
+            and (end is None or pending.timestamp <= end)
+        ):
+            track.append(pending)
+        return track
+
+    def flush(self) -> None:
+        """Append the final points to the track files and drop them from memory."""
+        if self.__directory is None:
+            return
+        self.__directory.mkdir(parents=True, exist_ok=True)
+        for key, track in self.__tracks.items():
+            if len(track) == 0:
+                continue
+            with _track_path(self.__directory, key).open("ab") as file:
+                file.write(b"".join(_RECORD.pack(*point) for point in track.points()))
+        self.__tracks.clear()
+
+
+def _track_path(directory: Path, vin: str) -> Path:
+    return directory / f"{vin}{TRACK_SUFFIX}"
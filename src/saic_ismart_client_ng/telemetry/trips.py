@@ -0,0 +1,397 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from saic_ismart_client_ng.registry import VehicleHandle, vin_of
+from saic_ismart_client_ng.telemetry.recorder import TelemetryReader
+from saic_ismart_client_ng.telemetry.tracks import (
+    OpeningWindowDownsampler,
+    TrackPoint,
+    distance_m,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    import os
+
+    from saic_ismart_client_ng.api.vehicle.schema import VehicleStatusResp
+    from saic_ismart_client_ng.api.vehicle_charging.schema import ChrgMgmtDataResp
+    from saic_ismart_client_ng.telemetry.recorder import TelemetryFrame
+
+STATUS_KIND = "VehicleStatusResp"
+CHARGING_KIND = "ChrgMgmtDataResp"
+POWER_USAGE_COLUMN = "rvsChargeStatus.powerUsageOfDay"
+
+_FRAME_COLUMNS = {
+    "journey_id": "basicVehicleStatus.currentJourneyId",
+    "journey_distance": "basicVehicleStatus.currentJourneyDistance",
+    "mileage": "basicVehicleStatus.mileage",
+    "engine_status": "basicVehicleStatus.engineStatus",
+    "hand_brake": "basicVehicleStatus.handBrake",
+    "latitude": "gpsPosition.wayPoint.position.latitude",
+    "longitude": "gpsPosition.wayPoint.position.longitude",
+    "altitude": "gpsPosition.wayPoint.position.altitude",
+    "speed": "gpsPosition.wayPoint.speed",
+    "heading": "gpsPosition.wayPoint.heading",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Trip:
+    """A completed trip.
+
+    Distances are in km, taken from the odometer when reported, then from
+    currentJourneyDistance, then from the GPS fixes. `energy_kwh` sums the
+    powerUsageOfDay deltas seen during the trip, None without charging data.
+    """
+
+    vin: str
+    journey_id: int | None
+    start: int
+    end: int
+    samples: int
+    distance_km: float
+    start_mileage_km: float | None
+    end_mileage_km: float | None
+    energy_kwh: float | None
+    route: tuple[TrackPoint, ...]
+
+    @property
+    def duration(self) -> int:
+        return self.end - self.start
+
+    @property
+    def consumption_kwh_per_100km(self) -> float | None:
+        if self.energy_kwh is None or self.distance_km <= 0:
+            return None
+        return self.energy_kwh / self.distance_km * 100.0
+
+
+@dataclass(frozen=True, slots=True)
+class _Sample:
+    timestamp: int
+    journey_id: int | None
+    journey_distance: int | None
+    mileage: int | None
+    engine_status: int | None
+    hand_brake: int | None
+    latitude: int | None
+    longitude: int | None
+    altitude: int | None
+    speed: int | None
+    heading: int | None
+
+    @property
+    def is_parked(self) -> bool:
+        # Same rule as BasicVehicleStatus.is_parked
+        return self.engine_status != 1 or self.hand_brake == 1
+
+    @property
+    def point(self) -> TrackPoint | None:
+        if self.latitude is None or self.longitude is None:
+            return None
+        if self.latitude == 0 and self.longitude == 0:
+            return None
+        return TrackPoint(
+            self.timestamp,
+            self.latitude,
+            self.longitude,
+            self.altitude or 0,
+            self.speed or 0,
+            self.heading or 0,
+        )
+
+
+class _OpenTrip:
+    """The running totals of a trip in progress."""
+
+    __slots__ = (
+        "energy",
+        "gps_distance_m",
+        "has_energy",
+        "journey_distance",
+        "journey_id",
+        "last_mileage",
+        "last_point",
+        "last_timestamp",
+        "route",
+        "samples",
+        "simplifier",
+        "start",
+        "start_mileage",
+    )
+
+    def __init__(self, sample: _Sample, epsilon_m: float, max_window: int) -> None:
+        self.journey_id = sample.journey_id
+        self.start = sample.timestamp
+        self.start_mileage = sample.mileage
+        self.simplifier = OpeningWindowDownsampler(epsilon_m, max_window=max_window)
+        self.route: list[TrackPoint] = []
+        self.last_point: TrackPoint | None = None
+        self.last_timestamp = sample.timestamp
+        self.last_mileage: int | None = None
+        self.journey_distance: int | None = None
+        self.gps_distance_m = 0.0
+        self.energy = 0
+        self.has_energy = False
+        self.samples = 0
+        self.add(sample)
+
+    def add(self, sample: _Sample) -> None:
+        if sample.mileage is not None:
+            if self.start_mileage is None:
+                self.start_mileage = sample.mileage
+            self.last_mileage = sample.mileage
+        if sample.journey_distance is not None:
+            self.journey_distance = sample.journey_distance
+        if (point := sample.point) is not None:
+            if self.last_point is not None:
+                self.gps_distance_m += distance_m(self.last_point, point)
+            self.last_point = point
+            self.route.extend(self.simplifier.push(point))
+        self.last_timestamp = sample.timestamp
+        self.samples += 1
+
+    def close(self, vin: str) -> Trip:
+        if (pending := self.simplifier.pending()) is not None:
+            self.route.append(pending)
+        if self.start_mileage is not None and self.last_mileage is not None:
+            distance_km = (self.last_mileage - self.start_mileage) / 10.0
+        elif self.journey_distance is not None:
+            distance_km = self.journey_distance / 10.0
+        else:
+            distance_km = self.gps_distance_m / 1000.0
+        return Trip(
+            vin=vin,
+            journey_id=self.journey_id,
+            start=self.start,
+            end=self.last_timestamp,
+            samples=self.samples,
+            distance_km=distance_km,
+            start_mileage_km=self.start_mileage / 10.0
+            if self.start_mileage is not None
+            else None,
+            end_mileage_km=self.last_mileage / 10.0
+            if self.last_mileage is not None
+            else None,
+            energy_kwh=self.energy / 10.0 if self.has_energy else None,
+            route=tuple(self.route),
+        )
+
+
+class _VehicleState:
+    __slots__ = ("last_timestamp", "last_usage", "trip")
+
+    def __init__(self) -> None:
+        self.trip: _OpenTrip | None = None
+        self.last_timestamp: int | None = None
+        self.last_usage: int | None = None
+
+
+class TripBuilder:
+    """Segments a stream of status snapshots into trips.
+
+    A trip starts with the first snapshot that is not parked and ends with
+    the next parked one, when currentJourneyId changes, or when no snapshot
+    arrived for `max_gap` seconds. The route is simplified as it arrives, so
+    only the running totals and a bounded window of fixes are kept per
+    vehicle. Snapshots of a vehicle must be fed in time order.
+    """
+
+    def __init__(
+        self,
+        *,
+        on_trip: Callable[[Trip], None] | None = None,
+        max_gap: int | None = 1800,
+        route_epsilon_m: float = 15.0,
+        max_window: int = 64,
+    ) -> None:
+        self.__on_trip = on_trip
+        self.__max_gap = max_gap
+        self.__route_epsilon_m = route_epsilon_m
+        self.__max_window = max_window
+        self.__vehicles: dict[str, _VehicleState] = {}
+
+    def feed(
+        self,
+        vin: str | VehicleHandle,
+        timestamp: int,
+        status: VehicleStatusResp,
+        charging: ChrgMgmtDataResp | None = None,
+    ) -> list[Trip]:
+        """Consume a snapshot, returning the trips it completed.
+
+        The optional charging snapshot taken at the same time provides the
+        energy used.
+        """
+        basic = status.basicVehicleStatus
+        way_point = status.gpsPosition.wayPoint if status.gpsPosition else None
+        position = way_point.position if way_point else None
+        charge_status = charging.rvsChargeStatus if charging else None
+        return self.__feed(
+            vin_of(vin),
+            _Sample(
+                timestamp=timestamp,
+                journey_id=basic.currentJourneyId if basic else None,
+                journey_distance=basic.currentJourneyDistance if basic else None,
+                mileage=basic.mileage if basic else None,
+                engine_status=basic.engineStatus if basic else None,
+                hand_brake=basic.handBrake if basic else None,
+                latitude=position.latitude if position else None,
+                longitude=position.longitude if position else None,
+                altitude=position.altitude if position else None,
+                speed=way_point.speed if way_point else None,
+                heading=way_point.heading if way_point else None,
+            ),
+            charge_status.powerUsageOfDay if charge_status else None,
+        )
+
+    def feed_frames(
+        self,
+        vin: str | VehicleHandle,
+        status_frame: TelemetryFrame,
+        charging_frame: TelemetryFrame | None = None,
+    ) -> list[Trip]:
+        """Consume recorded VehicleStatusResp rows, sorted by time.
+
+        Each status row is paired with the latest ChrgMgmtDataResp row
+        recorded at or before it.
+        """
+        key = vin_of(vin)
+        columns = {
+            name: status_frame.column(path) for name, path in _FRAME_COLUMNS.items()
+        }
+        usage_timestamps = charging_frame.timestamps if charging_frame else []
+        usages = charging_frame.column(POWER_USAGE_COLUMN) if charging_frame else []
+        usage_row = 0
+        trips = []
+        for row, timestamp in enumerate(status_frame.timestamps):
+            usage = None
+            while (
+                usage_row < len(usage_timestamps)
+                and usage_timestamps[usage_row] <= timestamp
+            ):
+                usage = usages[usage_row]
+                usage_row += 1
+            sample = _Sample(
+                timestamp, **{name: values[row] for name, values in columns.items()}
+            )
+            trips.extend(self.__feed(key, sample, usage))
+        return trips
+
+    def flush(self, vin: str | VehicleHandle | None = None) -> list[Trip]:
+        """Close the trips still in progress, e.g. at the end of an archive."""
+        vins = list(self.__vehicles) if vin is None else [vin_of(vin)]
+        trips = []
+        for key in vins:
+            state = self.__vehicles.get(key)
+            if state is not None and state.trip is not None:
+                trips.append(self.__close(key, state, state.trip))
+        return trips
+
+    def __feed(self, vin: str, sample: _Sample, usage: int | None) -> list[Trip]:
+        state = self.__vehicles.get(vin)
+        if state is None:
+            state = self.__vehicles[vin] = _VehicleState()
+
+        completed = []
+        trip = state.trip
+        if trip is not None and self.__splits(state, trip, sample):
+            completed.append(self.__close(vin, state, trip))
+            trip = None
+
+        if trip is not None:
+            trip.add(sample)
+            if usage is not None and state.last_usage is not None:
+                # powerUsageOfDay starts over at midnight
+                trip.energy += (
+                    usage - state.last_usage if usage >= state.last_usage else usage
+                )
+                trip.has_energy = True
+        elif not sample.is_parked:
+            # The energy used before the first sample belongs to the stop
+            trip = state.trip = _OpenTrip(
+                sample, self.__route_epsilon_m, self.__max_window
+            )
+            trip.has_energy = usage is not None
+
+        if usage is not None:
+            state.last_usage = usage
+        if trip is not None and sample.is_parked:
+            completed.append(self.__close(vin, state, trip))
+        state.last_timestamp = sample.timestamp
+        return completed
+
+    def __splits(self, state: _VehicleState, trip: _OpenTrip, sample: _Sample) -> bool:
+        """Tell whether the sample starts over after a gap or a new journey."""
+        if (
+            self.__max_gap is not None
+            and state.last_timestamp is not None
+            and sample.timestamp - state.last_timestamp > self.__max_gap
+        ):
+            return True
+        return (
+            sample.journey_id is not None
+            and trip.journey_id is not None
+            and sample.journey_id != trip.journey_id
+        )
+
+    def __close(self, vin: str, state: _VehicleState, open_trip: _OpenTrip) -> Trip:
+        trip = open_trip.close(vin)
+        state.trip = None
+        if self.__on_trip is not None:
+            self.__on_trip(trip)
+        return trip
+
+
+def build_trips(
+    directory: str | os.PathLike[str],
+    vins: Iterable[str] | None = None,
+    *,
+    start: int | None = None,
+    end: int | None = None,
+    max_workers: int | None = None,
+    **options: Any,
+) -> dict[str, list[Trip]]:
+    """Build the trips of archived vehicles in parallel worker processes.
+
+    `directory` is the directory of a TelemetryRecorder, by default every VIN
+    in it is processed. `options` are passed on to the TripBuilder of each
+    vehicle.
+    """
+    directory = Path(directory)
+    if vins is None:
+        vins = sorted(p.name for p in directory.iterdir() if p.is_dir())
+    vins = list(vins)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            _build_vehicle_trips,
+            [directory] * len(vins),
+            vins,
+            [start] * len(vins),
+            [end] * len(vins),
+            [options] * len(vins),
+        )
+        return dict(zip(vins, results, strict=True))
+
+
+def _build_vehicle_trips(
+    directory: Path,
+    vin: str,
+    start: int | None,
+    end: int | None,
+    options: dict[str, Any],
+) -> list[Trip]:
+    reader = TelemetryReader(directory)
+    names = [*_FRAME_COLUMNS.values()]
+    status_frame = reader.read(vin, STATUS_KIND, start=start, end=end, names=names)
+    charging_frame = reader.read(
+        vin, CHARGING_KIND, start=start, end=end, names=[POWER_USAGE_COLUMN]
+    )
+    builder = TripBuilder(**options)
+    trips = builder.feed_frames(vin, status_frame, charging_frame)
+    trips.extend(builder.flush(vin))
+    return trips
@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Self
+
+from saic_ismart_client_ng.api.lazy import lazy_view
+from saic_ismart_client_ng.api.vehicle.schema import VehicleStatusResp
+from saic_ismart_client_ng.api.vehicle_charging.schema import (
+    ChargeStatusResp,
+    ChrgMgmtDataResp,
+)
+from saic_ismart_client_ng.net.codec import to_json_dict
+from saic_ismart_client_ng.registry import VehicleHandle, vin_of
+from saic_ismart_client_ng.telemetry.layout import schema_columns, schema_kind
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    import os
+    from types import TracebackType
+
+    from saic_ismart_client_ng.telemetry.layout import Column
+
+logger = logging.getLogger(__name__)
+
+# The snapshots returned by get_vehicle_status, get_vehicle_charging_status and
+# get_vehicle_charging_management_data
+DEFAULT_KINDS: tuple[type[Any], ...] = (
+    VehicleStatusResp,
+    ChargeStatusResp,
+    ChrgMgmtDataResp,
+)
+
+_STOP = object()
+_WRITER_CHECK_INTERVAL = 0.1
+
+
+class TelemetryWarehouse:
+    """Persists snapshots into SQLite, one table per snapshot kind.
+
+    Each numeric field of a kind gets its own column next to the JSON of the
+    whole snapshot, with an index on (vin, time). `record` only enqueues the
+    row: a background thread writes the queue in batches, one transaction per
+    batch, on a database in WAL mode so reads are never blocked by the
+    writer. Queries use fixed statements that sqlite3 keeps prepared.
+
+    The database must be a file, as the writer thread uses its own
+    connection.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        kinds: Iterable[type[Any]] = DEFAULT_KINDS,
+        batch_size: int = 1024,
+    ) -> None:
+        self.__path = path
+        self.__batch_size = batch_size
+        self.__columns: dict[str, tuple[Column, ...]] = {
+            schema_kind(kind).__name__: schema_columns(kind) for kind in kinds
+        }
+        self.__kinds = {schema_kind(kind).__name__: schema_kind(kind) for kind in kinds}
+        self.__insert_statements = {
+            kind: _insert_statement(kind, columns)
+            for kind, columns in self.__columns.items()
+        }
+        self.__lock = threading.Lock()
+        self.__connection = _connect(path)
+        with self.__connection:
+            for kind, columns in self.__columns.items():
+                self.__connection.executescript(_table_schema(kind, columns))
+                _add_missing_columns(self.__connection, kind, columns)
+        self.__queue: queue.Queue[Any] = queue.Queue()
+        self.__write_error: Exception | None = None
+        self.__closed = False
+        self.__writer = threading.Thread(
+            target=self.__write_loop, name="saic-telemetry-writer", daemon=True
+        )
+        self.__writer.start()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def record(
+        self,
+        vin: str | VehicleHandle,
+        snapshot: Any,
+        *,
+        timestamp: int | None = None,
+    ) -> None:
+        """Queue a snapshot, by default at its statusTime or the current time.
+
+        Never blocks on the database, so it is safe to call from the event loop.
+        """
+        if self.__closed:
+            msg = "The warehouse is closed"
+            raise RuntimeError(msg)
+        kind = schema_kind(type(snapshot)).__name__
+        columns = self.__columns.get(kind)
+        if columns is None:
+            msg = f"{kind} snapshots are not stored in this warehouse"
+            raise ValueError(msg)
+        if timestamp is None:
+            timestamp = getattr(snapshot, "statusTime", None)
+        if timestamp is None:
+            timestamp = int(time.time())
+        row = (
+            vin_of(vin),
+            timestamp,
+            json.dumps(to_json_dict(snapshot), separators=(",", ":")),
+            *(_sql_value(column.value_of(snapshot)) for column in columns),
+        )
+        self.__queue.put((kind, row))
+
+    def flush(self) -> None:
+        """Wait until the queued snapshots are written.
+
+        Raises the error of a batch that could not be written since the last
+        flush, its snapshots are lost.
+        """
+        self.__join_queue()
+        self.__raise_write_error()
+
+    async def flush_async(self) -> None:
+        await asyncio.to_thread(self.flush)
+
+    def close(self) -> None:
+        """Write the queued snapshots and stop the writer thread."""
+        if self.__closed:
+            return
+        self.__closed = True
+        self.__queue.put(_STOP)
+        self.__writer.join()
+        with self.__lock:
+            self.__connection.close()
+        self.__raise_write_error()
+        if self.__queue.unfinished_tasks:
+            msg = "The telemetry writer stopped before writing every snapshot"
+            raise RuntimeError(msg)
+
+    def series(
+        self,
+        vin: str | VehicleHandle,
+        kind: type[Any] | str,
+        column: str,
+        *,
+        start: int | None = None,
+        end: int | None = None,
+    ) -> list[tuple[int, Any]]:
+        """Return the (time, value) pairs of a column in a time range, oldest first."""
+        table = self.__table(kind)
+        self.__check_column(table, column)
+        sql = (
+            f'SELECT time, "{column}" FROM "{table}" '  # noqa: S608
+            "WHERE vin = ? AND time >= ? AND time <= ? ORDER BY time"
+        )
+        return self.__fetch(sql, (vin_of(vin), *_time_range(start, end)))
+
+    def latest_value(
+        self,
+        vin: str | VehicleHandle,
+        kind: type[Any] | str,
+        column: str,
+        *,
+        before: int | None = None,
+    ) -> tuple[int, Any] | None:
+        """Return the last non-missing value of a column, at or before a time."""
+        table = self.__table(kind)
+        self.__check_column(table, column)
+        sql = (
+            f'SELECT time, "{column}" FROM "{table}" '  # noqa: S608
+            f'WHERE vin = ? AND time <= ? AND "{column}" IS NOT NULL '
+            "ORDER BY time DESC LIMIT 1"
+        )
+        rows = self.__fetch(sql, (vin_of(vin), _time_range(None, before)[1]))
+        return rows[0] if rows else None
+
+    def latest(
+        self,
+        vin: str | VehicleHandle,
+        kind: type[Any] | str,
+        *,
+        before: int | None = None,
+    ) -> tuple[int, Any] | None:
+        """Return the last snapshot of a kind, at or before a time."""
+        snapshots = self.snapshots(vin, kind, end=before, limit=1, newest_first=True)
+        return snapshots[0] if snapshots else None
+
+    def snapshots(
+        self,
+        vin: str | VehicleHandle,
+        kind: type[Any] | str,
+        *,
+        start: int | None = None,
+        end: int | None = None,
+        limit: int = -1,
+        newest_first: bool = False,
+    ) -> list[tuple[int, Any]]:
+        """Return the (time, snapshot) pairs in a time range.
+
+        Snapshots are lazy views over the stored JSON.
+        """
+        table = self.__table(kind)
+        data_class = self.__kinds[table]
+        order = "DESC" if newest_first else "ASC"
+        sql = (
+            f'SELECT time, data FROM "{table}" '  # noqa: S608
+            f"WHERE vin = ? AND time >= ? AND time <= ? ORDER BY time {order} LIMIT ?"
+        )
+        rows = self.__fetch(sql, (vin_of(vin), *_time_range(start, end), limit))
+        return [
+            (timestamp, lazy_view(data_class, json.loads(data)))
+            for timestamp, data in rows
+        ]
+
+    def __fetch(self, sql: str, params: tuple[Any, ...]) -> list[tuple[Any, ...]]:
+        with self.__lock:
+            return self.__connection.execute(sql, params).fetchall()
+
+    def __table(self, kind: type[Any] | str) -> str:
+        name = kind if isinstance(kind, str) else schema_kind(kind).__name__
+        if name not in self.__columns:
+            msg = f"{name} snapshots are not stored in this warehouse"
+            raise ValueError(msg)
+        return name
+
+    def __check_column(self, table: str, column: str) -> None:
+        if all(c.name != column for c in self.__columns[table]):
+            msg = f"{table} has no numeric column {column}"
+            raise ValueError(msg)
+
+    def __join_queue(self) -> None:
+        # Like Queue.join, but gives up once the writer thread is gone
+        with self.__queue.all_tasks_done:
+            while self.__queue.unfinished_tasks:
+                if not self.__writer.is_alive():
+                    self.__raise_write_error()
+                    msg = "The telemetry writer stopped"
+                    raise RuntimeError(msg)
+                self.__queue.all_tasks_done.wait(_WRITER_CHECK_INTERVAL)
+
+    def __write_loop(self) -> None:
+        try:
+            connection = _connect(self.__path)
+        except sqlite3.Error as e:
+            logger.exception("Could not open %s", self.__path)
+            self.__write_error = e
+            return
+        try:
+            stopping = False
+            while not stopping:
+                batch = [self.__queue.get()]
+                while len(batch) < self.__batch_size:
+                    try:
+                        batch.append(self.__queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stopping = _STOP in batch
+                try:
+                    self.__write_batch(connection, batch)
+                except Exception as e:
+                    logger.exception("Could not write %d snapshots", len(batch))
+                    if self.__write_error is None:
+                        self.__write_error = e
+                finally:
+                    for _ in batch:
+                        self.__queue.task_done()
+        finally:
+            connection.close()
+
+    def __raise_write_error(self) -> None:
+        error, self.__write_error = self.__write_error, None
+        if error is not None:
+            raise error
+
+    def __write_batch(self, connection: sqlite3.Connection, batch: list[Any]) -> None:
+        rows: dict[str, list[tuple[Any, ...]]] = {}
+        for item in batch:
+            if item is not _STOP:
+                kind, row = item
+                rows.setdefault(kind, []).append(row)
+        with connection:
+            for kind, kind_rows in rows.items():
+                connection.executemany(self.__insert_statements[kind], kind_rows)
+
+
+def _connect(path: str | os.PathLike[str]) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, check_same_thread=False, cached_statements=256)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+def _column_type(column: Column) -> str:
+    return "REAL" if column.typecode == "d" else "INTEGER"
+
+
+def _table_schema(kind: str, columns: tuple[Column, ...]) -> str:
+    numeric = "".join(f', "{c.name}" {_column_type(c)}' for c in columns)
+    return (
+        f'CREATE TABLE IF NOT EXISTS "{kind}" '
+        f"(vin TEXT NOT NULL, time INTEGER NOT NULL, data TEXT NOT NULL{numeric});\n"
+        f'CREATE INDEX IF NOT EXISTS "{kind}_vin_time" ON "{kind}" (vin, time);\n'
+    )
+
+
+def _add_missing_columns(
+    connection: sqlite3.Connection, kind: str, columns: tuple[Column, ...]
+) -> None:
+    """Add the columns a schema gained since the table was created."""
+    existing = {row[1] for row in connection.execute(f'PRAGMA table_info("{kind}")')}
+    for column in columns:
+        if column.name not in existing:
+            connection.execute(
+                f'ALTER TABLE "{kind}" ADD COLUMN "{column.name}" {_column_type(column)}'
+            )
+
+
+def _insert_statement(kind: str, columns: tuple[Column, ...]) -> str:
+    names = "".join(f', "{c.name}"' for c in columns)
+    placeholders = ", ?" * len(columns)
+    return (
+        f'INSERT INTO "{kind}" (vin, time, data{names}) VALUES (?, ?, ?{placeholders})'  # noqa: S608
+    )
+
+
+def _sql_value(value: Any) -> Any:
+    return int(value) if isinstance(value, bool) else value
+
+
+def _time_range(start: int | None, end: int | None) -> tuple[int, int]:
+    return (
+        start if start is not None else -(2**63),
+        end if end is not None else 2**63 - 1,
+    )
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import pytest
+
+from saic_ismart_client_ng import SaicApi
+from saic_ismart_client_ng.api.vehicle import VehicleModelConfiguration, VinInfo
+from saic_ismart_client_ng.capabilities import VehicleCapabilities, VehicleCapability
+from saic_ismart_client_ng.exceptions import SaicUnsupportedOperationException
+from saic_ismart_client_ng.model import SaicApiConfiguration
+
+VIN = "LSJWHXXXXXXXXXXXX"
+
+
+def _configuration(**items: str) -> list[VehicleModelConfiguration]:
+    return [
+        VehicleModelConfiguration(itemCode=f"J{i}", itemName=name, itemValue=value)
+        for i, (name, value) in enumerate(items.items())
+    ]
+
+
+def test_capabilities_are_indexed_by_name_and_code() -> None:
+    capabilities = VehicleCapabilities(_configuration(Sunroof="0", HeatedSeat="2"))
+
+    assert capabilities.value("Sunroof") == "0"
+    assert capabilities.value("J1") == "2"
+    assert "HeatedSeat" in capabilities
+    assert capabilities.has_sunroof is False
+    assert capabilities.has_heated_seats is True
+    assert capabilities.has_level_heated_seats is False
+
+
+def test_unreported_capabilities_are_unknown() -> None:
+    capabilities = VehicleCapabilities([])
+
+    assert capabilities.supports(VehicleCapability.V2X) is None
+    assert capabilities.has_level_heated_seats is None
+
+
+@pytest.mark.asyncio
+async def test_unsupported_commands_are_rejected_locally() -> None:
+    api = SaicApi(SaicApiConfiguration("user@example.com", "password"))
+    api.vehicle_registry.update(
+        [VinInfo(vin=VIN, vehicleModelConfiguration=_configuration(Sunroof="0"))]
+    )
+
+    with pytest.raises(SaicUnsupportedOperationException):
+        await api.control_sunroof(VIN, should_open=True)
+
+
+def test_vehicles_without_configuration_are_not_rejected() -> None:
+    api = SaicApi(SaicApiConfiguration("user@example.com", "password"))
+
+    api.ensure_supported(VIN, VehicleCapability.SUNROOF)
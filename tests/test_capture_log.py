@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+
+from saic_ismart_client_ng.capture import (
+    CaptureReader,
+    CaptureWriter,
+    Exchange,
+)
+from saic_ismart_client_ng.capture.log import INDEX_SUFFIX, SEGMENT_SUFFIX
+from saic_ismart_client_ng.crypto_utils import sha256_hex_digest
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+T0 = 1_700_000_000.0
+VINS = ["LSJWMOCK000000001", "LSJWMOCK000000002"]
+
+
+def _exchange(i: int) -> Exchange:
+    vin_hash = sha256_hex_digest(VINS[i % 2])
+    route = "/vehicle/status" if i % 3 else "/vehicle/control"
+    method = "GET" if i % 3 else "POST"
+    return Exchange(
+        started=T0 + i,
+        duration=0.25,
+        method=method,
+        path=f"{route}?vin={vin_hash}" if method == "GET" else route,
+        request_headers={"tenant-id": "459771", "blade-auth": "<redacted>"},
+        request_body=None if method == "GET" else f'{{"vin":"{vin_hash}"}}',
+        status=200,
+        response_headers={"content-type": "application/json"},
+        response_body=f'{{"code":0,"data":{{"statusTime":{i}}}}}',
+    )
+
+
+def _write(
+    directory: Path,
+    count: int,
+    *,
+    max_segment_bytes: int = 1024 * 1024,
+    sync_every: int = 256,
+) -> list[Exchange]:
+    exchanges = [_exchange(i) for i in range(count)]
+    with CaptureWriter(
+        directory,
+        max_segment_bytes=max_segment_bytes,
+        sync_every=sync_every,
+        sync_interval=3600,
+    ) as writer:
+        for exchange in exchanges:
+            writer.append(exchange)
+    return exchanges
+
+
+def test_round_trip_across_rotated_segments(tmp_path: Path) -> None:
+    exchanges = _write(tmp_path, 50, max_segment_bytes=2048)
+
+    segments = sorted(tmp_path.glob(f"*{SEGMENT_SUFFIX}"))
+    with CaptureReader(tmp_path) as reader:
+        assert len(segments) > 1
+        assert all(s.with_suffix(INDEX_SUFFIX).exists() for s in segments)
+        assert all(s.stat().st_size <= 2048 for s in segments)
+        assert len(reader) == 50
+        assert list(reader) == exchanges
+        assert reader[37] == exchanges[37]
+        assert reader[-1] == exchanges[-1]
+        with pytest.raises(IndexError):
+            reader[50]
+
+
+def test_find_by_time_route_and_vin(tmp_path: Path) -> None:
+    exchanges = _write(tmp_path, 30)
+
+    with CaptureReader(tmp_path) as reader:
+        by_time = list(reader.find(start=T0 + 10, end=T0 + 12))
+        by_route = list(reader.find(route="/vehicle/control"))
+        by_vin = list(reader.find(vin=VINS[1], route="/vehicle/status"))
+        by_hash = list(reader.find(vin_hash=sha256_hex_digest(VINS[0])))
+
+    assert by_time == exchanges[10:13]
+    assert by_route == exchanges[::3]
+    assert by_vin == [e for i, e in enumerate(exchanges) if i % 2 and i % 3]
+    assert by_hash == exchanges[::2]
+
+
+def test_fsync_is_batched(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    synced: list[int] = []
+    monkeypatch.setattr(os, "fsync", synced.append)
+
+    _write(tmp_path, 25, sync_every=10)
+
+    # Two batches of ten, then the data and index files on close
+    assert len(synced) == 6
+
+
+def test_torn_record_is_skipped(tmp_path: Path) -> None:
+    exchanges = _write(tmp_path, 5)
+    (segment,) = tmp_path.glob(f"*{SEGMENT_SUFFIX}")
+    segment.write_bytes(segment.read_bytes()[:-10])
+
+    with CaptureReader(tmp_path) as reader:
+        assert list(reader) == exchanges[:4]
+
+
+def test_new_writer_starts_a_new_segment(tmp_path: Path) -> None:
+    first = _write(tmp_path, 3)
+    second = _write(tmp_path, 2)
+
+    with CaptureReader(tmp_path) as reader:
+        assert len(list(tmp_path.glob(f"*{SEGMENT_SUFFIX}"))) == 2
+        assert list(reader) == first + second
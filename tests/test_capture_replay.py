@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import itertools
+import math
+from typing import TYPE_CHECKING
+
+import pytest
+
+from saic_ismart_client_ng import SaicApi
+from saic_ismart_client_ng.capture import (
+    ExchangeLog,
+    RecordingTransport,
+    ReplayTransport,
+    read_exchanges,
+)
+from saic_ismart_client_ng.exceptions import SaicApiException
+from saic_ismart_client_ng.mock import (
+    FixedLatency,
+    MockGateway,
+    MockGatewayTransport,
+    mock_vin,
+)
+from saic_ismart_client_ng.model import SaicApiConfiguration
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import httpx
+
+USERNAME = "driver@example.com"
+PASSWORD = "secret"  # noqa: S105
+BASE_URI = "https://gateway.mock/api.app/v1/"
+
+
+def _api(transport: httpx.AsyncBaseTransport) -> SaicApi:
+    configuration = SaicApiConfiguration(
+        USERNAME, PASSWORD, base_uri=BASE_URI, sms_delivery_delay=0
+    )
+    return SaicApi(configuration, transport=transport)
+
+
+async def _record(path: Path) -> None:
+    # Every reading of the clock moves it a second forward
+    ticks = itertools.count(1_700_000_000)
+    gateway = MockGateway(clock=lambda: next(ticks), event_delay=FixedLatency(3))
+    gateway.add_account(USERNAME, PASSWORD)
+    with ExchangeLog(path) as log:
+        api = _api(
+            RecordingTransport(
+                log, base_uri=BASE_URI, transport=MockGatewayTransport(gateway)
+            )
+        )
+        await api.login()
+        await api.vehicle_list()
+        await api.get_vehicle_status(mock_vin(1))
+
+
+@pytest.mark.asyncio
+async def test_recording_decrypts_and_redacts(tmp_path: Path) -> None:
+    await _record(tmp_path / "capture.jsonl")
+
+    exchanges = list(read_exchanges(tmp_path / "capture.jsonl"))
+
+    assert [e.route for e in exchanges[:2]] == ["/oauth/token", "/vehicle/list"]
+    assert all(e.route == "/vehicle/status" for e in exchanges[2:])
+    # The status request goes through the event-id handshake
+    assert len(exchanges) >= 4
+    assert exchanges[0].method == "POST"
+    assert exchanges[0].request_body is not None
+    assert "grant_type=password" in exchanges[0].request_body
+    assert exchanges[1].response_body is not None
+    assert mock_vin(1) in exchanges[1].response_body
+    assert exchanges[1].request_headers["blade-auth"] == "<redacted>"
+    assert dict(exchanges[-1].params)["vehStatusReqType"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_replay_serves_the_recorded_exchanges(tmp_path: Path) -> None:
+    await _record(tmp_path / "capture.jsonl")
+    delays: list[float] = []
+
+    async def sleep(delay: float) -> None:
+        delays.append(delay)
+
+    exchanges = list(read_exchanges(tmp_path / "capture.jsonl"))
+    transport = ReplayTransport(exchanges, base_uri=BASE_URI, speed=4.0, sleep=sleep)
+    api = _api(transport)
+
+    await api.login()
+    vehicles = await api.vehicle_list()
+    status = await api.get_vehicle_status(mock_vin(1))
+
+    assert [v.vin for v in vehicles.vinList] == [mock_vin(1)]
+    assert status.basicVehicleStatus is not None
+    assert status.basicVehicleStatus.lockStatus == 1
+    assert transport.served == len(exchanges)
+    assert not transport.misses
+    assert delays == pytest.approx([e.duration / 4 for e in exchanges])
+
+
+@pytest.mark.asyncio
+async def test_replay_misses(tmp_path: Path) -> None:
+    await _record(tmp_path / "capture.jsonl")
+    transport = ReplayTransport(
+        read_exchanges(tmp_path / "capture.jsonl"), base_uri=BASE_URI, speed=math.inf
+    )
+    api = _api(transport)
+    await api.login()
+
+    with pytest.raises(SaicApiException):
+        await api.get_vehicle_status(mock_vin(2))
+
+    assert transport.misses == {"GET /vehicle/status": 1}
+
+
+def test_truncated_last_line_is_skipped(tmp_path: Path) -> None:
+    path = tmp_path / "capture.jsonl"
+    path.write_bytes(b'{"started": 1')
+
+    assert list(read_exchanges(path)) == []
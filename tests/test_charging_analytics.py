@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import numpy as np
+
+from saic_ismart_client_ng.api.vehicle_charging import (
+    ChrgMgmtData,
+    ChrgMgmtDataResp,
+)
+from saic_ismart_client_ng.api.vehicle_charging.schema import (
+    BmsChargingStatusCode,
+    ChargingStopReason,
+    HeatingStopReason,
+)
+from saic_ismart_client_ng.telemetry import TelemetryRecorder
+from saic_ismart_client_ng.telemetry.charging import (
+    ChargingCurve,
+    bms_charging_status,
+    charging_stop_reason,
+    decoded_current,
+    decoded_power,
+    decoded_voltage,
+    energy_kwh,
+    heating_stop_reason,
+    soc_slope,
+    to_array,
+)
+
+SAMPLES = [
+    ChrgMgmtData(bmsPackCrnt=19915, bmsPackVol=1649, bmsChrgSts=1, bmsPackSOCDsp=500),
+    ChrgMgmtData(bmsPackCrnt=19800, bmsPackVol=1652, bmsChrgSts=1, bmsPackSOCDsp=510),
+    ChrgMgmtData(bmsPackCrnt=None, bmsPackVol=1655, bmsChrgSts=2, bmsPackSOCDsp=520),
+]
+
+
+def test_decoded_columns_match_the_snapshot_properties() -> None:
+    current = decoded_current(to_array([s.bmsPackCrnt for s in SAMPLES]))
+    voltage = decoded_voltage(to_array([s.bmsPackVol for s in SAMPLES]))
+    power = decoded_power(current, voltage)
+
+    for i, sample in enumerate(SAMPLES):
+        for vectorized, scalar in (
+            (current[i], sample.decoded_current),
+            (voltage[i], sample.decoded_voltage),
+            (power[i], sample.decoded_power),
+        ):
+            if scalar is None:
+                assert np.isnan(vectorized)
+            else:
+                assert vectorized == pytest.approx(scalar)
+
+
+def test_codes_decode_like_to_code() -> None:
+    raw = [0, 1, 10, 13, 99, None]
+
+    decoded = bms_charging_status(to_array(raw)).tolist()
+
+    assert decoded == [
+        None if code is None else BmsChargingStatusCode.to_code(code) for code in raw
+    ]
+
+
+def test_stop_reasons_use_the_to_code_fallbacks() -> None:
+    raw = to_array([0, 3, 42, None])
+
+    assert charging_stop_reason(raw).tolist() == [
+        ChargingStopReason.NO_REASON,
+        ChargingStopReason.CHARGING_GUN_NOT_PROPERLY_PLUGGED_IN,
+        ChargingStopReason.OTHER_REASON,
+        None,
+    ]
+    assert heating_stop_reason(raw).tolist() == [
+        HeatingStopReason.NO_REASON,
+        HeatingStopReason.REACHED_STOP_CONDITION,
+        None,
+        None,
+    ]
+
+
+def test_energy_is_integrated_with_the_trapezoidal_rule() -> None:
+    timestamps = to_array([0, 1800, 3600, 5400])
+    power = to_array([10.0, 10.0, 20.0, None])
+
+    assert energy_kwh(timestamps, power) == pytest.approx(5.0 + 7.5)
+
+
+def test_soc_slope_is_per_hour() -> None:
+    timestamps = to_array([0, 1800, 3600])
+    soc = to_array([50.0, None, 70.0])
+
+    assert soc_slope(timestamps, soc) == pytest.approx(20.0)
+    assert soc_slope(timestamps[:1], soc[:1]) is None
+
+
+def test_charging_curve_from_recorded_history() -> None:
+    recorder = TelemetryRecorder()
+    for i, sample in enumerate(SAMPLES):
+        recorder.record(
+            "VIN", ChrgMgmtDataResp(chrgMgmtData=sample), timestamp=i * 3600
+        )
+
+    curve = ChargingCurve.from_frame(recorder.read("VIN", ChrgMgmtDataResp))
+
+    assert curve.is_charging.tolist() == [True, True, False]
+    assert curve.soc_slope() == pytest.approx(1.0)
+    assert curve.energy_kwh() == pytest.approx(
+        -(SAMPLES[0].decoded_power + SAMPLES[1].decoded_power) / 2  # type: ignore[operator]
+    )
+    rates = curve.charge_rate_percentiles([50])
+    assert rates[50] == pytest.approx(
+        -(SAMPLES[0].decoded_power + SAMPLES[1].decoded_power) / 2  # type: ignore[operator]
+    )
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import pytest
+
+from saic_ismart_client_ng.api.vehicle_charging import (
+    ChrgMgmtData,
+    ChrgMgmtDataResp,
+    RvsChargeStatus,
+)
+from saic_ismart_client_ng.api.vehicle_charging.schema import ChargingStopReason
+from saic_ismart_client_ng.telemetry import (
+    ChargingSession,
+    ChargingSessionDetector,
+    ChargingType,
+    TelemetryRecorder,
+)
+
+# 20000 * 0.05 - 1000 = 0 A, each 200 raw steps below is -10 A
+IDLE_CURRENT = 20000
+VOLTAGE = 1600  # 400 V
+
+
+def _snapshot(
+    status: int,
+    *,
+    amps: int = 0,
+    soc: int = 500,
+    gun: int = 1,
+    stop_reason: int | None = None,
+    usage: int | None = None,
+    ending: int | None = None,
+) -> ChrgMgmtDataResp:
+    return ChrgMgmtDataResp(
+        chrgMgmtData=ChrgMgmtData(
+            bmsChrgSts=status,
+            bmsPackCrnt=IDLE_CURRENT - amps * 20,
+            bmsPackVol=VOLTAGE,
+            bmsPackSOCDsp=soc,
+            bmsChrgSpRsn=stop_reason,
+        ),
+        rvsChargeStatus=RvsChargeStatus(
+            chargingGunState=gun,
+            powerUsageSinceLastCharge=usage,
+            lastChargeEndingPower=ending,
+        ),
+    )
+
+
+STREAM = [
+    (0, _snapshot(0, gun=0, usage=123)),
+    (600, _snapshot(1, amps=25, soc=500)),  # 10 kW
+    (1200, _snapshot(1, amps=50, soc=520)),  # 20 kW
+    (1800, _snapshot(1, amps=25, soc=540)),
+    (2400, _snapshot(2, soc=550, stop_reason=0, ending=425)),
+    (3000, _snapshot(0, gun=0)),
+]
+
+
+def test_session_is_emitted_when_charging_stops() -> None:
+    detector = ChargingSessionDetector()
+
+    sessions = [
+        session
+        for timestamp, snapshot in STREAM
+        if (session := detector.feed("VIN", timestamp, snapshot)) is not None
+    ]
+
+    [session] = sessions
+    assert session.start == 600
+    assert session.end == 1800
+    assert session.duration == 1200
+    assert session.samples == 3
+    assert session.charging_type == ChargingType.AC
+    assert session.energy_kwh == pytest.approx(15 / 6 + 15 / 6)
+    assert session.peak_power_kw == pytest.approx(20.0)
+    assert session.start_soc == 50.0
+    assert session.end_soc == 54.0
+    assert session.stop_reason == ChargingStopReason.NO_REASON
+    assert session.last_charge_ending_energy_kwh == 42.5
+    assert session.used_since_previous_charge_kwh == 12.3
+
+
+def test_unplugging_ends_a_dc_session() -> None:
+    detector = ChargingSessionDetector()
+    detector.feed("VIN", 0, _snapshot(10, amps=250))
+
+    session = detector.feed("VIN", 60, _snapshot(10, amps=250, gun=0))
+
+    assert session is not None
+    assert session.charging_type == ChargingType.DC
+    assert session.stop_reason is None
+
+
+def test_sessions_agree_with_is_bms_charging() -> None:
+    for status in range(14):
+        detector = ChargingSessionDetector()
+        detector.feed("VIN", 0, _snapshot(status, amps=25))
+        snapshot = _snapshot(status, amps=25)
+        assert snapshot.chrgMgmtData is not None
+
+        charging = bool(detector.flush())
+
+        assert charging == snapshot.chrgMgmtData.is_bms_charging, status
+
+
+def test_super_offboard_charging_does_not_open_a_session() -> None:
+    detector = ChargingSessionDetector()
+    for timestamp, snapshot in (
+        (0, _snapshot(0, gun=0)),
+        (600, _snapshot(11, amps=100)),
+        (1200, _snapshot(11, amps=100)),
+        (1800, _snapshot(2, stop_reason=0)),
+    ):
+        assert detector.feed("VIN", timestamp, snapshot) is None
+
+    assert detector.flush() == []
+
+
+def test_data_gaps_split_sessions_and_flush_closes_open_ones() -> None:
+    received: list[ChargingSession] = []
+    detector = ChargingSessionDetector(on_session=received.append, max_gap=900)
+    detector.feed("VIN", 0, _snapshot(1, amps=25))
+    detector.feed("VIN", 300, _snapshot(1, amps=25))
+    detector.feed("VIN", 5000, _snapshot(1, amps=25))
+    detector.feed("OTHER", 0, _snapshot(0))
+
+    flushed = detector.flush()
+
+    assert [(s.start, s.end) for s in received] == [(0, 300), (5000, 5000)]
+    assert flushed == received[1:]
+
+
+def test_sessions_from_a_recorded_frame() -> None:
+    recorder = TelemetryRecorder()
+    for timestamp, snapshot in STREAM:
+        recorder.record("VIN", snapshot, timestamp=timestamp)
+    frame = recorder.read("VIN", ChrgMgmtDataResp)
+
+    stream_detector = ChargingSessionDetector()
+    from_stream = [
+        stream_detector.feed("VIN", timestamp, snapshot)
+        for timestamp, snapshot in STREAM
+    ]
+
+    assert ChargingSessionDetector().feed_frame("VIN", frame) == [
+        session for session in from_stream if session is not None
+    ]
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+
+import httpx
+import pytest
+
+from saic_ismart_client_ng import SaicApi
+from saic_ismart_client_ng.api.vehicle.alarm import AlarmSwitch, AlarmSwitchReq
+from saic_ismart_client_ng.listener import SaicApiListener
+from saic_ismart_client_ng.model import SaicApiConfiguration
+from saic_ismart_client_ng.net.codec import (
+    OrjsonJsonCodec,
+    StdlibJsonCodec,
+    default_json_codec,
+    to_json_dict,
+)
+
+
+class RecordingListener(SaicApiListener):
+    def __init__(self) -> None:
+        self.bodies: list[str | None] = []
+
+    async def on_request(
+        self,
+        path: str,  # noqa: ARG002
+        body: str | None = None,
+        headers: dict[str, str] | None = None,  # noqa: ARG002
+    ) -> None:
+        self.bodies.append(body)
+
+
+def test_to_json_dict_omits_none_fields() -> None:
+    body = AlarmSwitchReq(
+        vin="hash", alarmSwitchList=[AlarmSwitch(alarmType=2, alarmSwitch=1)]
+    )
+
+    assert to_json_dict(body) == {
+        "vin": "hash",
+        "alarmSwitchList": [{"alarmType": 2, "alarmSwitch": 1}],
+    }
+
+
+def test_stdlib_codec_is_compact() -> None:
+    codec = StdlibJsonCodec()
+
+    assert codec.dumps({"a": [1, "é"]}) == '{"a":[1,"é"]}'.encode()
+    assert codec.loads(b'{"a": 1}') == {"a": 1}
+
+
+def test_stdlib_codec_is_the_default() -> None:
+    assert isinstance(default_json_codec(), StdlibJsonCodec)
+    assert isinstance(
+        SaicApiConfiguration("user@example.com", "password").json_codec,
+        StdlibJsonCodec,
+    )
+
+
+def test_orjson_codec_matches_stdlib() -> None:
+    pytest.importorskip("orjson")
+    value = {"a": [1, "é"], "b": None}
+
+    assert OrjsonJsonCodec().dumps(value) == StdlibJsonCodec().dumps(value)
+
+
+@pytest.mark.asyncio
+async def test_request_bodies_use_the_configured_codec() -> None:
+    listener = RecordingListener()
+    api = SaicApi(
+        SaicApiConfiguration(
+            "user@example.com", "password", json_codec=StdlibJsonCodec()
+        ),
+        listener=listener,
+        transport=httpx.MockTransport(lambda _: httpx.Response(200, json={"code": 0})),
+    )
+
+    await api.set_alarm_switches([], "LSJWHXXXXXXXXXXXX")
+
+    [body] = listener.bodies
+    assert body is not None
+    assert " " not in body
+    assert json.loads(body) == {
+        "vin": api.hash_vin("LSJWHXXXXXXXXXXXX"),
+        "alarmSwitchList": [],
+    }
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import pytest
+
+from saic_ismart_client_ng.api.vehicle import BasicVehicleStatus
+from saic_ismart_client_ng.telemetry import DeltaArchive, DeltaEncoder
+from saic_ismart_client_ng.telemetry.delta import (
+    read_varint,
+    unzigzag,
+    write_varint,
+    zigzag,
+)
+
+
+@dataclass(slots=True)
+class MixedSnapshot:
+    power: float | None = None
+    plugged: bool | None = None
+    soc: int | None = None
+
+
+@pytest.mark.parametrize("value", [0, 1, -1, 63, -64, 300, -(2**40), 2**62])
+def test_zigzag_varint_round_trip(value: int) -> None:
+    out = bytearray()
+    write_varint(out, zigzag(value))
+
+    encoded, position = read_varint(bytes(out), 0)
+
+    assert unzigzag(encoded) == value
+    assert position == len(out)
+
+
+def _history(rows: int) -> list[tuple[int, BasicVehicleStatus]]:
+    return [
+        (
+            1_700_000_000 + i * 60,
+            BasicVehicleStatus(
+                mileage=133_690 + i // 3,
+                exteriorTemperature=7 + (i % 5) - 2,
+                interiorTemperature=None if i % 7 == 0 else 17,
+                timeOfLastCANBUSActivity=1_700_000_000 + i * 60 - 1,
+                lockStatus=1,
+            ),
+        )
+        for i in range(rows)
+    ]
+
+
+def test_archive_round_trips_snapshots() -> None:
+    history = _history(100)
+    encoder = DeltaEncoder(BasicVehicleStatus, block_size=16)
+    encoder.extend(history)
+
+    archive = DeltaArchive(encoder.to_bytes())
+    frame = archive.read()
+
+    assert archive.kind == "BasicVehicleStatus"
+    assert archive.block_count == 7
+    assert len(archive) == 100
+    assert frame.timestamps == [timestamp for timestamp, _ in history]
+    for name in ("mileage", "exteriorTemperature", "interiorTemperature", "bootStatus"):
+        assert frame.column(name) == [getattr(s, name) for _, s in history]
+
+
+def test_archive_reads_single_blocks_and_time_ranges() -> None:
+    history = _history(40)
+    encoder = DeltaEncoder(BasicVehicleStatus, block_size=10)
+    encoder.extend(history)
+    archive = DeltaArchive(encoder.to_bytes())
+
+    block = archive.block(2)
+    in_range = archive.read(start=history[5][0], end=history[12][0])
+
+    assert block.timestamps == [timestamp for timestamp, _ in history[20:30]]
+    assert block.column("mileage") == [s.mileage for _, s in history[20:30]]
+    assert in_range.timestamps == [timestamp for timestamp, _ in history[5:13]]
+
+
+def test_archive_is_much_smaller_than_one_row_per_snapshot() -> None:
+    encoder = DeltaEncoder(BasicVehicleStatus)
+    encoder.extend(_history(1000))
+
+    # 46 columns, a full row would need at least one byte per column
+    assert len(encoder.to_bytes()) < 1000 * 20
+
+
+def test_float_and_bool_columns() -> None:
+    snapshots = [
+        (1, MixedSnapshot(power=-1.5, plugged=True, soc=80)),
+        (2, MixedSnapshot(power=None, plugged=False, soc=81)),
+        (3, MixedSnapshot(power=2.25, plugged=None, soc=None)),
+    ]
+    encoder = DeltaEncoder(MixedSnapshot)
+    encoder.extend(snapshots)
+
+    frame = DeltaArchive(encoder.to_bytes()).read()
+
+    assert frame.column("power") == [-1.5, None, 2.25]
+    assert frame.column("plugged") == [True, False, None]
+    assert frame.column("soc") == [80, 81, None]
+
+
+def test_archive_rejects_other_data() -> None:
+    with pytest.raises(ValueError, match="archive"):
+        DeltaArchive(b"not an archive")
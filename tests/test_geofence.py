@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from saic_ismart_client_ng.api.schema import GpsPosition
+from saic_ismart_client_ng.telemetry import (
+    CircleFence,
+    GeofenceEngine,
+    GeofenceEvent,
+    GeofenceTransition,
+    PolygonFence,
+    Track,
+    TrackPoint,
+)
+
+VIN = "LSJWHXXXXXXXXXXXX"
+
+HOME = CircleFence("home", 45.0, 9.0, radius_m=100.0)
+# Roughly 780 m by 1110 m, east of home
+OFFICE = PolygonFence(
+    "office", ((45.0, 9.01), (45.01, 9.01), (45.01, 9.02), (45.0, 9.02))
+)
+
+
+def _point(timestamp: int, latitude: float, longitude: float) -> TrackPoint:
+    return TrackPoint(timestamp, round(latitude * 1e6), round(longitude * 1e6), 0, 0, 0)
+
+
+def _position(latitude: float, longitude: float) -> GpsPosition:
+    return GpsPosition(
+        wayPoint=GpsPosition.WayPoint(
+            position=GpsPosition.WayPoint.Position(
+                latitude=round(latitude * 1e6), longitude=round(longitude * 1e6)
+            )
+        )
+    )
+
+
+# From home to the office, with the first fix after leaving home jittering back
+COMMUTE = [
+    _point(0, 45.0, 9.0),
+    _point(10, 45.0, 9.0014),
+    _point(20, 45.0, 9.0012),
+    _point(30, 45.0, 9.005),
+    _point(40, 45.005, 9.015),
+    _point(50, 45.005, 9.03),
+]
+
+
+def test_distances_are_signed() -> None:
+    assert HOME.distance_m(45.0, 9.0) == pytest.approx(-100.0)
+    assert HOME.distance_m(45.001, 9.0) == pytest.approx(11.2, abs=0.1)
+    assert OFFICE.distance_m(45.005, 9.015) < 0
+    assert OFFICE.distance_m(45.005, 9.0) == pytest.approx(786, abs=1)
+
+
+def test_polygons_need_three_vertices() -> None:
+    with pytest.raises(ValueError, match="3 vertices"):
+        PolygonFence("line", ((45.0, 9.0), (45.1, 9.1)))
+
+
+def test_enter_and_exit_with_hysteresis() -> None:
+    events: list[GeofenceEvent] = []
+    engine = GeofenceEngine([HOME, OFFICE], hysteresis_m=50.0, on_event=events.append)
+
+    for point in COMMUTE:
+        engine.evaluate_point(VIN, point)
+
+    assert [(e.fence_id, e.transition, e.timestamp) for e in events] == [
+        ("home", GeofenceTransition.ENTER, 0),
+        ("home", GeofenceTransition.EXIT, 30),
+        ("office", GeofenceTransition.ENTER, 40),
+        ("office", GeofenceTransition.EXIT, 50),
+    ]
+    assert engine.inside(VIN) == frozenset()
+
+
+def test_positions_without_coordinates_are_ignored() -> None:
+    engine = GeofenceEngine([HOME])
+
+    assert engine.evaluate(VIN, 0, GpsPosition()) == []
+    assert [e.transition for e in engine.evaluate(VIN, 1, _position(45.0, 9.0))] == [
+        GeofenceTransition.ENTER
+    ]
+    assert engine.inside(VIN) == {"home"}
+
+
+def test_removed_fences_are_forgotten() -> None:
+    engine = GeofenceEngine([HOME])
+    engine.evaluate_point(VIN, COMMUTE[0])
+
+    assert engine.remove_fence("home")
+    assert engine.inside(VIN) == frozenset()
+    assert engine.evaluate_point(VIN, COMMUTE[0]) == []
+
+
+def test_batch_evaluation_matches_streaming() -> None:
+    pytest.importorskip("numpy")
+    streaming = GeofenceEngine([HOME, OFFICE], hysteresis_m=50.0)
+    batch = GeofenceEngine([HOME, OFFICE], hysteresis_m=50.0)
+    streamed = [e for p in COMMUTE for e in streaming.evaluate_point(VIN, p)]
+    track = Track()
+    track.extend(COMMUTE[:4])
+
+    events = batch.evaluate_track(VIN, track)
+    assert batch.inside(VIN) == frozenset()
+    events += batch.evaluate_point(VIN, COMMUTE[4])
+    track = Track()
+    track.extend(COMMUTE[5:])
+    events += batch.evaluate_track(VIN, track)
+
+    assert events == streamed
+
+
+def test_evaluation_does_not_scan_every_fence() -> None:
+    fences = [
+        CircleFence(f"fence-{row}-{column}", 45 + row * 0.01, 9 + column * 0.01, 200)
+        for row in range(100)
+        for column in range(100)
+    ]
+    engine = GeofenceEngine(fences)
+
+    started = time.perf_counter()
+    for timestamp in range(1000):
+        engine.evaluate_point(VIN, _point(timestamp, 45.5, 9.5 + timestamp * 1e-5))
+    per_point = (time.perf_counter() - started) / 1000
+
+    assert engine.inside(VIN) == {"fence-50-51"}
+    assert per_point < 1e-3
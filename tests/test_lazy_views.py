@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+import json
+from unittest.mock import patch
+
+import dacite
+import httpx
+import pytest
+
+from saic_ismart_client_ng import SaicApi
+from saic_ismart_client_ng.api.lazy import LazyView, lazy_view, materialize
+from saic_ismart_client_ng.api.message import MessageResp
+from saic_ismart_client_ng.api.vehicle import BasicVehicleStatus, VehicleStatusResp
+from saic_ismart_client_ng.model import SaicApiConfiguration
+from saic_ismart_client_ng.net.client import SaicApiClient
+
+VEHICLE_STATUS = {
+    "basicVehicleStatus": {"engineStatus": 0, "handBrake": 1, "mileage": 133690},
+    "gpsPosition": {
+        "gpsStatus": 2,
+        "wayPoint": {"position": {"latitude": 45485072, "longitude": 9160267}},
+    },
+    "statusTime": 1705953524,
+}
+
+
+def test_lazy_view_reads_fields_on_demand() -> None:
+    view = lazy_view(VehicleStatusResp, VEHICLE_STATUS)
+
+    assert isinstance(view, VehicleStatusResp)
+    assert view.statusTime == 1705953524
+    assert view.basicVehicleStatus is not None
+    assert isinstance(view.basicVehicleStatus, BasicVehicleStatus)
+    assert view.basicVehicleStatus.is_parked
+    assert view.basicVehicleStatus.lockStatus is None
+    assert view.gpsPosition is not None
+    assert view.gpsPosition.wayPoint is not None
+    assert view.gpsPosition.wayPoint.position is not None
+    assert view.gpsPosition.wayPoint.position.latitude == 45485072
+    assert view.extendedVehicleStatus is None
+
+
+def test_lazy_view_caches_converted_fields() -> None:
+    view = lazy_view(VehicleStatusResp, VEHICLE_STATUS)
+
+    assert view.basicVehicleStatus is view.basicVehicleStatus
+
+
+def test_lazy_view_fields_can_be_assigned() -> None:
+    view = lazy_view(VehicleStatusResp, VEHICLE_STATUS)
+
+    view.statusTime = 1
+
+    assert view.statusTime == 1
+
+
+def test_lazy_view_uses_defaults_for_missing_lists() -> None:
+    view = lazy_view(MessageResp, {"recordsNumber": 0})
+
+    assert view.messages == []
+
+
+def test_materialize_matches_eager_decoding() -> None:
+    view = lazy_view(VehicleStatusResp, VEHICLE_STATUS)
+
+    materialized = materialize(view)
+
+    assert not isinstance(materialized, LazyView)
+    assert not isinstance(materialized.basicVehicleStatus, LazyView)
+    assert materialized == dacite.from_dict(VehicleStatusResp, VEHICLE_STATUS)
+    assert asdict(view) == asdict(materialized)
+
+
+@pytest.mark.asyncio
+async def test_api_returns_lazy_views_when_configured() -> None:
+    api = SaicApi(
+        SaicApiConfiguration("user@example.com", "password", lazy_decode=True)
+    )
+
+    async def send(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            content=json.dumps({"code": 0, "data": VEHICLE_STATUS}).encode(),
+            request=request,
+        )
+
+    with patch.object(SaicApiClient, "send", side_effect=send):
+        status = await api.get_vehicle_status("LSJWHXXXXXXXXXXXX")
+
+    assert isinstance(status, LazyView)
+    assert status.statusTime == 1705953524
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from saic_ismart_client_ng import SaicApi
+from saic_ismart_client_ng.api.message import (
+    MessageEntity,
+    MessageFilter,
+    MessageResp,
+    UpateMessageRequest,
+)
+from saic_ismart_client_ng.exceptions import SaicApiException, SaicLogoutException
+from saic_ismart_client_ng.model import SaicApiConfiguration
+
+
+class RecordingMessageApi(SaicApi):
+    def __init__(self, *, failing: set[int] | None = None) -> None:
+        super().__init__(SaicApiConfiguration("user@example.com", "password"))
+        self.failing = failing or set()
+        self.updates: list[UpateMessageRequest] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def update_message_status(self, data: UpateMessageRequest) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0)
+            if data.messageId in self.failing:
+                msg = "failed"
+                raise SaicApiException(msg, return_code=4)
+            self.updates.append(data)
+        finally:
+            self.in_flight -= 1
+
+    async def get_message_list(
+        self,
+        *,
+        page_num: int,
+        page_size: int,  # noqa: ARG002
+        message_group: str,  # noqa: ARG002
+    ) -> MessageResp | None:
+        if page_num > 1:
+            return MessageResp()
+        return MessageResp(
+            messages=[MessageEntity(messageId=i, readStatus=i % 2) for i in range(6)],
+            totalNumber=6,
+        )
+
+
+@pytest.mark.asyncio
+async def test_read_messages_reports_each_message() -> None:
+    api = RecordingMessageApi(failing={3})
+
+    results = await api.read_messages(range(10), concurrency=4)
+
+    assert [r.message_id for r in results] == list(range(10))
+    assert [r.message_id for r in results if not r.succeeded] == [3]
+    assert len(api.updates) == 9
+    assert {u.actionType for u in api.updates} == {"READ"}
+    assert api.max_in_flight == 4
+
+
+@pytest.mark.asyncio
+async def test_delete_messages_uses_group_action_for_whole_group() -> None:
+    api = RecordingMessageApi()
+
+    results = await api.delete_messages(MessageFilter("NEWS"))
+
+    assert [r.action for r in results] == ["DELETE_NEWS"]
+    assert [(u.actionType, u.messageId) for u in api.updates] == [("DELETE_NEWS", None)]
+
+
+@pytest.mark.asyncio
+async def test_delete_messages_with_predicate_deletes_matches_only() -> None:
+    api = RecordingMessageApi()
+
+    results = await api.delete_messages(
+        MessageFilter("ALARM", predicate=lambda m: m.readStatus == 1)
+    )
+
+    assert all(r.succeeded for r in results)
+    assert sorted(u.messageId for u in api.updates) == [1, 3, 5]  # type: ignore[type-var]
+    assert {u.actionType for u in api.updates} == {"DELETE"}
+
+
+@pytest.mark.asyncio
+async def test_logout_aborts_bulk_operation() -> None:
+    api = RecordingMessageApi()
+
+    async def logged_out(data: UpateMessageRequest) -> None:  # noqa: ARG001
+        msg = "logged out"
+        raise SaicLogoutException(msg)
+
+    api.update_message_status = logged_out  # type: ignore[method-assign]
+
+    with pytest.raises(SaicLogoutException):
+        await api.read_messages([1, 2, 3])
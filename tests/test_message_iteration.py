@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from saic_ismart_client_ng import SaicApi
+from saic_ismart_client_ng.api.message import MessageEntity, MessageResp
+from saic_ismart_client_ng.model import SaicApiConfiguration
+
+
+class PagedMessageApi(SaicApi):
+    def __init__(
+        self, message_count: int, *, report_total: bool = True, delay: float = 0.01
+    ) -> None:
+        super().__init__(SaicApiConfiguration("user@example.com", "password"))
+        self.message_count = message_count
+        self.report_total = report_total
+        self.delay = delay
+        self.requested_pages: list[int] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_message_list(
+        self,
+        *,
+        page_num: int,
+        page_size: int,
+        message_group: str,
+    ) -> MessageResp | None:
+        self.requested_pages.append(page_num)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        start = (page_num - 1) * page_size
+        end = min(start + page_size, self.message_count)
+        return MessageResp(
+            messages=[
+                MessageEntity(messageId=i, messageType=message_group)
+                for i in range(start, end)
+            ],
+            totalNumber=self.message_count if self.report_total else None,
+        )
+
+
+@pytest.mark.asyncio
+async def test_iter_messages_yields_every_message_in_order() -> None:
+    api = PagedMessageApi(message_count=23)
+
+    ids = [m.messageId async for m in api.iter_messages("ALARM", page_size=5)]
+
+    assert ids == list(range(23))
+    assert sorted(api.requested_pages) == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_iter_messages_bounds_concurrent_prefetch() -> None:
+    api = PagedMessageApi(message_count=100)
+
+    count = 0
+    async for _ in api.iter_messages("NEWS", page_size=5, prefetch=3):
+        count += 1
+
+    assert count == 100
+    assert api.max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_iter_messages_without_prefetch_is_sequential() -> None:
+    api = PagedMessageApi(message_count=12)
+
+    ids = [
+        m.messageId async for m in api.iter_messages("ALARM", page_size=5, prefetch=0)
+    ]
+
+    assert ids == list(range(12))
+    assert api.requested_pages == [1, 2, 3]
+    assert api.max_in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_iter_messages_stops_on_short_page_without_total() -> None:
+    api = PagedMessageApi(message_count=10, report_total=False)
+
+    ids = [m.messageId async for m in api.iter_messages("ALARM", page_size=4)]
+
+    assert ids == list(range(10))
+    assert max(api.requested_pages) <= 5
+
+
+@pytest.mark.asyncio
+async def test_closing_the_iterator_cancels_prefetched_pages() -> None:
+    api = PagedMessageApi(message_count=100, delay=0)
+
+    iterator = api.iter_messages("ALARM", page_size=5, prefetch=2)
+    first = await anext(iterator)
+    api.delay = 10
+    await iterator.aclose()
+
+    assert first.messageId == 0
+    assert api.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_iter_messages_rejects_invalid_page_size() -> None:
+    api = PagedMessageApi(message_count=1)
+
+    with pytest.raises(ValueError, match="page_size"):
+        await anext(api.iter_messages("ALARM", page_size=0))
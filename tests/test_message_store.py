@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING
+
+import pytest
+
+from saic_ismart_client_ng.api.message import schema
+from saic_ismart_client_ng.api.message.schema import MessageEntity
+from saic_ismart_client_ng.api.message.store import (
+    InMemoryMessageStore,
+    MessageQuery,
+    MessageStore,
+    SqliteMessageStore,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def _message(
+    message_id: int,
+    *,
+    minute: int,
+    vin: str = "VIN1",
+    message_type: str = "323",
+    read_status: int = 0,
+    title: str = "Vehicle alarm",
+    content: str = "",
+) -> MessageEntity:
+    return MessageEntity(
+        messageId=message_id,
+        createTime=int(datetime.datetime(2024, 1, 1, 12, minute).timestamp() * 1000),
+        messageTime=f"2024-01-01 12:{minute:02d}:00",
+        messageType=message_type,
+        readStatus=read_status,
+        sender="SAIC",
+        title=title,
+        content=content,
+        vin=vin,
+    )
+
+
+MESSAGES = [
+    _message(1, minute=1, content="Door open on the driver side"),
+    _message(2, minute=2, vin="VIN2", content="Charging started"),
+    _message(3, minute=3, message_type="324", read_status=1, content="Door closed"),
+    _message(4, minute=4, content="Charging finished", read_status=1),
+]
+
+STORES: list[Callable[[], MessageStore]] = [InMemoryMessageStore, SqliteMessageStore]
+
+
+@pytest.fixture(params=STORES, ids=["memory", "sqlite"])
+def store(request: pytest.FixtureRequest) -> MessageStore:
+    result: MessageStore = request.param()
+    result.add_all(MESSAGES)
+    return result
+
+
+def _ids(messages: list[MessageEntity]) -> list[str | int | None]:
+    return [m.messageId for m in messages]
+
+
+def test_query_without_filters_returns_newest_first(store: MessageStore) -> None:
+    assert _ids(store.query(MessageQuery())) == [4, 3, 2, 1]
+    assert _ids(store.query(MessageQuery(newest_first=False, limit=2))) == [1, 2]
+
+
+def test_query_by_indexed_fields(store: MessageStore) -> None:
+    assert _ids(store.query(MessageQuery(vin="VIN1"))) == [4, 3, 1]
+    assert _ids(store.query(MessageQuery(message_type="324"))) == [3]
+    assert _ids(store.query(MessageQuery(vin="VIN1", read_status=0))) == [1]
+
+
+def test_query_by_time_range(store: MessageStore) -> None:
+    query = MessageQuery(
+        since=datetime.datetime(2024, 1, 1, 12, 2),
+        until=datetime.datetime(2024, 1, 1, 12, 3),
+    )
+
+    assert _ids(store.query(query)) == [3, 2]
+
+
+def test_query_by_text_matches_all_tokens(store: MessageStore) -> None:
+    assert _ids(store.query(MessageQuery(text="door"))) == [3, 1]
+    assert _ids(store.query(MessageQuery(text="Charging FINISHED"))) == [4]
+    assert store.query(MessageQuery(text="window")) == []
+
+
+def test_adding_a_known_message_replaces_it(store: MessageStore) -> None:
+    store.add(_message(1, minute=1, read_status=1, content="Door open"))
+
+    assert len(store) == 4
+    assert _ids(store.query(MessageQuery(read_status=0))) == [2]
+    assert _ids(store.query(MessageQuery(text="driver"))) == []
+
+
+def test_removed_messages_are_not_returned(store: MessageStore) -> None:
+    assert store.remove(3)
+    assert not store.remove(3)
+
+    assert store.get(3) is None
+    assert len(store) == 3
+    assert _ids(store.query(MessageQuery(text="door"))) == [1]
+
+
+def test_get_round_trips_the_message(store: MessageStore) -> None:
+    assert store.get(2) == MESSAGES[1]
+    assert store.get("2") == MESSAGES[1]
+
+
+def test_message_time_parsing_is_cached() -> None:
+    message = MessageEntity(messageTime="31/12/2023 10:00:00")
+
+    assert message.message_time == datetime.datetime(2023, 12, 31, 10, 0)
+    hits = schema._parse_message_time.cache_info().hits
+    assert message.message_time == datetime.datetime(2023, 12, 31, 10, 0)
+    assert schema._parse_message_time.cache_info().hits == hits + 1
+
+
+def test_unparsable_message_times_are_logged_every_time(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    message = MessageEntity(messageTime="not a time")
+
+    for _ in range(2):
+        assert message.message_time is not None
+
+    assert caplog.text.count("Could not parse messageTime 'not a time'") == 2
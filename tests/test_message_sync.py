@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from saic_ismart_client_ng import SaicApi
+from saic_ismart_client_ng.api.message import MessageEntity, MessageResp
+from saic_ismart_client_ng.api.message.sync import (
+    JsonFileMessageCursorStore,
+    MessageCursor,
+    MessageSync,
+)
+from saic_ismart_client_ng.model import SaicApiConfiguration
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class FakeMessageApi(SaicApi):
+    def __init__(self) -> None:
+        super().__init__(SaicApiConfiguration("user@example.com", "password"))
+        self.messages: list[MessageEntity] = []
+        self.unread = MessageResp(alarmNumber=0, commandNumber=0, newsNumber=0)
+        self.requested_pages: list[int] = []
+
+    def add(self, message_id: int, create_time: int) -> None:
+        self.messages.insert(
+            0,
+            MessageEntity(
+                messageId=message_id, createTime=create_time, messageType="ALARM"
+            ),
+        )
+
+    async def get_unread_messages_count(self) -> MessageResp | None:
+        return self.unread
+
+    async def get_message_list(
+        self,
+        *,
+        page_num: int,
+        page_size: int,
+        message_group: str,  # noqa: ARG002
+    ) -> MessageResp | None:
+        self.requested_pages.append(page_num)
+        start = (page_num - 1) * page_size
+        return MessageResp(
+            messages=self.messages[start : start + page_size],
+            totalNumber=len(self.messages),
+        )
+
+
+@pytest.mark.asyncio
+async def test_first_sync_returns_all_messages_oldest_first() -> None:
+    api = FakeMessageApi()
+    for i in range(5):
+        api.add(i, 1000 + i)
+
+    new = await MessageSync(api, page_size=2).sync("ALARM")
+
+    assert [m.messageId for m in new] == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_sync_stops_paging_at_known_messages() -> None:
+    api = FakeMessageApi()
+    for i in range(10):
+        api.add(i, 1000 + i)
+    sync = MessageSync(api, page_size=2)
+    await sync.sync("ALARM")
+    api.add(10, 2000)
+    api.add(11, 2000)
+    api.unread.alarmNumber = 2
+    api.requested_pages.clear()
+
+    new = await sync.sync("ALARM")
+
+    assert [m.messageId for m in new] == [10, 11]
+    assert api.requested_pages == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_sync_is_skipped_without_unread_messages() -> None:
+    api = FakeMessageApi()
+    api.add(0, 1000)
+    sync = MessageSync(api)
+    await sync.sync("ALARM")
+    api.add(1, 1001)
+    api.requested_pages.clear()
+
+    assert await sync.sync("ALARM") == []
+    assert api.requested_pages == []
+    assert [m.messageId for m in await sync.sync("ALARM", force=True)] == [1]
+
+
+@pytest.mark.asyncio
+async def test_prime_skips_the_history() -> None:
+    api = FakeMessageApi()
+    for i in range(10):
+        api.add(i, 1000 + i)
+    api.add(10, 1009)
+    sync = MessageSync(api, page_size=2)
+
+    await sync.prime(["ALARM"])
+    api.add(11, 1009)
+    api.add(12, 2000)
+    api.unread.alarmNumber = 2
+
+    assert api.requested_pages == [1, 2]
+    assert [m.messageId for m in await sync.sync("ALARM")] == [11, 12]
+
+
+@pytest.mark.asyncio
+async def test_sync_all_probes_each_group() -> None:
+    api = FakeMessageApi()
+    api.add(0, 1000)
+
+    result = await MessageSync(api).sync_all()
+
+    assert set(result) == {"ALARM", "COMMAND", "NEWS"}
+
+
+def test_cursor_tracks_messages_sharing_a_create_time() -> None:
+    cursor = MessageCursor(create_time=-1).advance(
+        [
+            MessageEntity(messageId=1, createTime=5),
+            MessageEntity(messageId=2, createTime=5),
+        ]
+    )
+
+    assert not cursor.is_newer(MessageEntity(messageId=2, createTime=5))
+    assert cursor.is_newer(MessageEntity(messageId=3, createTime=5))
+    assert not cursor.is_newer(MessageEntity(messageId=4, createTime=4))
+
+
+@pytest.mark.asyncio
+async def test_json_file_store_persists_cursors(tmp_path: Path) -> None:
+    path = tmp_path / "cursors.json"
+    cursor = MessageCursor(create_time=5, message_ids=frozenset({"1"}))
+    await JsonFileMessageCursorStore(path).save("account", "ALARM", cursor)
+
+    store = JsonFileMessageCursorStore(path)
+
+    assert await store.load("account", "ALARM") == cursor
+    assert await store.load("account", "NEWS") is None
+    assert await store.load("other", "ALARM") is None
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import itertools
+
+import httpx
+import pytest
+
+from saic_ismart_client_ng import SaicApi
+from saic_ismart_client_ng.exceptions import SaicApiException
+from saic_ismart_client_ng.mock import (
+    ErrorRule,
+    FixedLatency,
+    MockGateway,
+    MockGatewayTransport,
+    mock_vin,
+)
+from saic_ismart_client_ng.mock.server import serve
+from saic_ismart_client_ng.model import SaicApiConfiguration
+
+USERNAME = "driver@example.com"
+PASSWORD = "secret"  # noqa: S105
+BASE_URI = "https://gateway.mock/api.app/v1/"
+
+
+def _api(
+    gateway: MockGateway,
+    *,
+    base_uri: str = BASE_URI,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> SaicApi:
+    configuration = SaicApiConfiguration(
+        USERNAME, PASSWORD, base_uri=base_uri, sms_delivery_delay=0
+    )
+    return SaicApi(configuration, transport=transport or MockGatewayTransport(gateway))
+
+
+@pytest.mark.asyncio
+async def test_login_and_vehicle_list() -> None:
+    gateway = MockGateway()
+    gateway.add_account(USERNAME, PASSWORD, vehicles=2)
+    api = _api(gateway)
+
+    login = await api.login()
+    vehicles = await api.vehicle_list()
+
+    assert login.access_token
+    assert [v.vin for v in vehicles.vinList] == [mock_vin(1), mock_vin(2)]
+
+
+@pytest.mark.asyncio
+async def test_wrong_password_is_rejected() -> None:
+    gateway = MockGateway()
+    gateway.add_account(USERNAME, "another password")
+
+    with pytest.raises(SaicApiException):
+        await _api(gateway).login()
+
+
+@pytest.mark.asyncio
+async def test_status_goes_through_the_event_handshake() -> None:
+    # Every reading of the clock moves it a second forward
+    ticks = itertools.count(1_700_000_000)
+    gateway = MockGateway(clock=lambda: next(ticks), event_delay=FixedLatency(5))
+    gateway.add_account(USERNAME, PASSWORD)
+    api = _api(gateway)
+    await api.login()
+
+    status = await api.get_vehicle_status(mock_vin(1))
+
+    assert status.basicVehicleStatus is not None
+    assert status.basicVehicleStatus.lockStatus == 1
+    assert gateway.request_counts["/vehicle/status"] >= 3
+
+
+@pytest.mark.asyncio
+async def test_control_and_charging_data() -> None:
+    gateway = MockGateway()
+    gateway.add_account(USERNAME, PASSWORD)
+    api = _api(gateway)
+    await api.login()
+
+    control = await api.lock_vehicle(mock_vin(1))
+    charging = await api.get_vehicle_charging_management_data(mock_vin(1))
+
+    assert control.rvc_req_sts_decoded == b"\x01"
+    assert charging.chrgMgmtData is not None
+    assert charging.chrgMgmtData.bmsPackSOCDsp == 800
+
+
+@pytest.mark.asyncio
+async def test_messages() -> None:
+    gateway = MockGateway()
+    gateway.add_account(USERNAME, PASSWORD)
+    for i in range(5):
+        gateway.add_message(USERNAME, group="NEWS", title=f"News {i}")
+    api = _api(gateway)
+    await api.login()
+
+    titles = [m.title async for m in api.iter_messages("NEWS", page_size=2)]
+    first = await api.get_news_list(page_num=1, page_size=2)
+    assert first is not None
+    await api.read_message(message_id=first.messages[0].messageId or "")
+    unread = await api.get_unread_messages_count()
+
+    assert titles == ["News 4", "News 3", "News 2", "News 1", "News 0"]
+    assert first.totalNumber == 5
+    assert unread is not None
+    assert unread.newsNumber == 4
+
+
+@pytest.mark.asyncio
+async def test_control_commands_are_logged() -> None:
+    gateway = MockGateway()
+    gateway.add_account(USERNAME, PASSWORD)
+    api = _api(gateway)
+    await api.login()
+
+    await api.unlock_vehicle(mock_vin(1))
+    commands = await api.get_command_list(page_num=1, page_size=10)
+
+    assert commands is not None
+    assert [m.vin for m in commands.messages] == [api.hash_vin(mock_vin(1))]
+
+
+@pytest.mark.asyncio
+async def test_error_injection() -> None:
+    gateway = MockGateway(
+        errors=[ErrorRule(1.0, code=503, paths=("/vehicle/list",))], seed=1
+    )
+    gateway.add_account(USERNAME, PASSWORD)
+    api = _api(gateway)
+    await api.login()
+
+    with pytest.raises(SaicApiException, match="return code: 503"):
+        await api.vehicle_list()
+
+    assert gateway.error_counts == {"/vehicle/list": 1}
+
+
+@pytest.mark.asyncio
+async def test_tampered_requests_are_rejected() -> None:
+    gateway = MockGateway()
+    gateway.add_account(USERNAME, PASSWORD)
+    inner = MockGatewayTransport(gateway)
+
+    class Tamper(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+            request.headers["APP-VERIFICATION-STRING"] = "0" * 64
+            return await inner.handle_async_request(request)
+
+    with pytest.raises(SaicApiException, match="Invalid signature"):
+        await _api(gateway, transport=Tamper()).login()
+
+
+@pytest.mark.asyncio
+async def test_http_server() -> None:
+    gateway = MockGateway()
+    gateway.add_account(USERNAME, PASSWORD)
+    server = await serve(gateway, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        api = _api(
+            gateway,
+            base_uri=f"http://127.0.0.1:{port}/api.app/v1/",
+            transport=httpx.AsyncHTTPTransport(),
+        )
+        await api.login()
+        status = await api.get_vehicle_status(mock_vin(1))
+
+    assert status.gpsPosition is not None
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import pytest
+
+from saic_ismart_client_ng import SaicApi
+from saic_ismart_client_ng.api.message import MessageEntity, MessageResp
+from saic_ismart_client_ng.api.vehicle import (
+    VehicleListResp,
+    VehicleStatusResp,
+    VinInfo,
+)
+from saic_ismart_client_ng.api.vehicle_charging import ChrgMgmtDataResp
+from saic_ismart_client_ng.crypto_utils import sha256_hex_digest
+from saic_ismart_client_ng.model import SaicApiConfiguration
+from saic_ismart_client_ng.refresh import MessageTriggeredRefresh, VehicleRefresh
+from saic_ismart_client_ng.registry import VehicleHandle
+
+
+class FakeApi(SaicApi):
+    def __init__(self) -> None:
+        super().__init__(SaicApiConfiguration("user@example.com", "password"))
+        self.alarms: list[MessageEntity] = []
+        self.unread = MessageResp(alarmNumber=0, commandNumber=0, newsNumber=0)
+        self.calls: list[str] = []
+        self.vins = ["VIN1", "VIN2"]
+
+    async def vehicle_list(self) -> VehicleListResp:
+        self.calls.append("vehicleList")
+        result = VehicleListResp(vinList=[VinInfo(vin=vin) for vin in self.vins])
+        self.vehicle_registry.update(result.vinList)
+        return result
+
+    async def get_unread_messages_count(self) -> MessageResp | None:
+        self.calls.append("unreadCount")
+        return self.unread
+
+    async def get_message_list(
+        self,
+        *,
+        page_num: int,
+        page_size: int,  # noqa: ARG002
+        message_group: str,
+    ) -> MessageResp | None:
+        self.calls.append(f"list {message_group}")
+        messages = self.alarms if message_group == "ALARM" and page_num == 1 else []
+        return MessageResp(messages=messages, totalNumber=len(messages))
+
+    async def get_vehicle_status(self, vin: str | VehicleHandle) -> VehicleStatusResp:
+        assert isinstance(vin, VehicleHandle)
+        self.calls.append(f"status {vin.vin}")
+        return VehicleStatusResp(statusTime=1)
+
+    async def get_vehicle_charging_management_data(
+        self, vin: str | VehicleHandle
+    ) -> ChrgMgmtDataResp:
+        assert isinstance(vin, VehicleHandle)
+        self.calls.append(f"charging {vin.vin}")
+        return ChrgMgmtDataResp()
+
+
+async def _primed(api: FakeApi, refresh: MessageTriggeredRefresh) -> None:
+    assert await refresh.poll_once() == []
+    api.calls.clear()
+
+
+def _new_alarms(api: FakeApi, alarms: list[MessageEntity]) -> None:
+    api.alarms = alarms
+    api.unread = MessageResp(alarmNumber=len(alarms), commandNumber=0, newsNumber=0)
+
+
+@pytest.mark.asyncio
+async def test_the_first_poll_does_not_refresh_the_history() -> None:
+    api = FakeApi()
+    api.alarms = [
+        MessageEntity(messageId=1, createTime=1, vin=sha256_hex_digest("VIN1"))
+    ]
+    refresh = MessageTriggeredRefresh(api)
+
+    assert await refresh.poll_once() == []
+    assert not any(call.startswith("status") for call in api.calls)
+
+    api.alarms.insert(
+        0, MessageEntity(messageId=2, createTime=2, vin=sha256_hex_digest("VIN1"))
+    )
+    api.unread = MessageResp(alarmNumber=1, commandNumber=0, newsNumber=0)
+    [result] = await refresh.poll_once()
+
+    assert [m.messageId for m in result.messages] == [2]
+
+
+@pytest.mark.asyncio
+async def test_only_vehicles_named_in_new_messages_are_refreshed() -> None:
+    api = FakeApi()
+    received: list[VehicleRefresh] = []
+
+    async def on_refresh(refresh: VehicleRefresh) -> None:
+        received.append(refresh)
+
+    refresh = MessageTriggeredRefresh(api, on_refresh=on_refresh)
+    await _primed(api, refresh)
+    _new_alarms(
+        api,
+        [
+            MessageEntity(messageId=2, createTime=2, vin=sha256_hex_digest("VIN2")),
+            MessageEntity(messageId=1, createTime=1, vin=sha256_hex_digest("VIN1")),
+            MessageEntity(messageId=0, createTime=0, vin=sha256_hex_digest("VIN1")),
+        ],
+    )
+
+    result = await refresh.poll_once()
+
+    assert {r.vehicle.vin: len(r.messages) for r in result} == {"VIN1": 2, "VIN2": 1}
+    assert received == result
+    assert all(r.vehicle_status is not None for r in result)
+    assert api.calls.count("status VIN1") == 1
+    assert api.calls.count("charging VIN1") == 1
+
+
+@pytest.mark.asyncio
+async def test_polls_without_unread_messages_only_probe_the_count() -> None:
+    api = FakeApi()
+    refresh = MessageTriggeredRefresh(api, refresh_charging=False)
+    await _primed(api, refresh)
+    _new_alarms(
+        api, [MessageEntity(messageId=1, createTime=1, vin=sha256_hex_digest("VIN1"))]
+    )
+    await refresh.poll_once()
+    api.unread = MessageResp(alarmNumber=0, commandNumber=0, newsNumber=0)
+    api.calls.clear()
+
+    assert await refresh.poll_once() == []
+    assert api.calls == ["unreadCount"]
+
+
+@pytest.mark.asyncio
+async def test_hashed_vins_resolve_to_registered_vehicles() -> None:
+    api = FakeApi()
+    handle = api.vehicle_registry.register("VIN1")
+    refresh = MessageTriggeredRefresh(api)
+    await _primed(api, refresh)
+    _new_alarms(api, [MessageEntity(messageId=1, createTime=1, vin=handle.vin_hash)])
+
+    [result] = await refresh.poll_once()
+
+    assert result.vehicle is handle
+    assert "vehicleList" not in api.calls
+
+
+@pytest.mark.asyncio
+async def test_messages_before_the_vehicle_list_fetch_it_once() -> None:
+    api = FakeApi()
+    refresh = MessageTriggeredRefresh(api)
+    await _primed(api, refresh)
+    _new_alarms(
+        api,
+        [
+            MessageEntity(messageId=2, createTime=2, vin=sha256_hex_digest("VIN1")),
+            MessageEntity(messageId=1, createTime=1, vin=sha256_hex_digest("GONE")),
+        ],
+    )
+
+    [result] = await refresh.poll_once()
+
+    assert result.vehicle.vin == "VIN1"
+    assert api.calls.count("vehicleList") == 1
+    assert api.vehicle_registry.by_hash(sha256_hex_digest("GONE")) is None
+    assert "GONE" not in api.vehicle_registry
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from saic_ismart_client_ng import SaicApi
+from saic_ismart_client_ng.api.vehicle import VinInfo
+from saic_ismart_client_ng.crypto_utils import sha256_hex_digest
+from saic_ismart_client_ng.model import SaicApiConfiguration
+from saic_ismart_client_ng.registry import VehicleHandle, VehicleRegistry
+
+VIN = "LSJWHXXXXXXXXXXXX"
+
+
+def test_update_indexes_vehicles_by_vin_and_hash() -> None:
+    registry = VehicleRegistry()
+    info = VinInfo(vin=VIN, modelName="MG4")
+
+    [handle] = registry.update([info, VinInfo(vin=None)])
+
+    assert handle.vin_hash == sha256_hex_digest(VIN)
+    assert handle.info is info
+    assert registry.by_vin(VIN) is handle
+    assert registry.by_hash(handle.vin_hash) is handle
+    assert VIN in registry
+    assert len(registry) == 1
+
+
+def test_resolve_hashes_unknown_vins_once() -> None:
+    registry = VehicleRegistry()
+
+    first = registry.resolve(VIN)
+    second = registry.resolve(VIN)
+
+    assert first is second
+    assert registry.resolve(first) is first
+
+
+def test_updating_metadata_keeps_the_hash() -> None:
+    registry = VehicleRegistry()
+    original = registry.register(VIN)
+    info = VinInfo(vin=VIN, modelName="MG5")
+
+    updated = registry.register(VIN, info=info)
+
+    assert updated == original
+    assert updated.info is info
+    assert registry.by_hash(original.vin_hash) is updated
+
+
+def test_api_accepts_handles_and_plain_vins() -> None:
+    api = SaicApi(SaicApiConfiguration("user@example.com", "password"))
+    handle = VehicleHandle(vin=VIN, vin_hash="precomputed")
+
+    assert api.hash_vin(handle) == "precomputed"
+    assert api.hash_vin(VIN) == sha256_hex_digest(VIN)
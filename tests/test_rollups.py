@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import numpy as np
+
+from saic_ismart_client_ng.api.vehicle import BasicVehicleStatus, VehicleStatusResp
+from saic_ismart_client_ng.api.vehicle_charging import (
+    ChrgMgmtData,
+    ChrgMgmtDataResp,
+)
+from saic_ismart_client_ng.telemetry import TelemetryRecorder
+from saic_ismart_client_ng.telemetry.rollup import TelemetryRollups, bucket_stats
+
+VIN = "LSJWHXXXXXXXXXXXX"
+SOC = "chrgMgmtData.bmsPackSOCDsp"
+MILEAGE = "basicVehicleStatus.mileage"
+
+
+def _charging(soc: int | None) -> ChrgMgmtDataResp:
+    return ChrgMgmtDataResp(chrgMgmtData=ChrgMgmtData(bmsPackSOCDsp=soc))
+
+
+def test_bucket_stats_skip_missing_values() -> None:
+    stats = bucket_stats([0, 30, 59, 60, 90], [1.0, None, 3.0, 10.0, 20.0], 60)
+
+    assert stats.starts.tolist() == [0, 60]
+    assert stats.minimum.tolist() == [1.0, 10.0]
+    assert stats.maximum.tolist() == [3.0, 20.0]
+    assert stats.total.tolist() == [4.0, 30.0]
+    assert stats.count.tolist() == [2, 2]
+    assert stats.last.tolist() == [3.0, 20.0]
+
+
+def test_recorded_snapshots_are_rolled_up() -> None:
+    rollups = TelemetryRollups()
+    recorder = TelemetryRecorder(rollups=rollups)
+    # Two hours of 30 second samples, the SoC climbing by 1 per sample
+    for timestamp in range(0, 7200, 30):
+        recorder.record(VIN, _charging(timestamp // 30), timestamp=timestamp)
+
+    minutes = rollups.aggregate(VIN, SOC, bucket=60)
+    hours = rollups.aggregate(VIN, SOC, bucket=3600)
+    half_hours = rollups.aggregate(VIN, SOC, bucket=1800, start=1800, end=3599)
+
+    assert len(minutes) == 120
+    assert minutes.average[:2].tolist() == [0.5, 2.5]
+    assert hours.timestamps.tolist() == [0, 3600]
+    assert hours.minimum.tolist() == [0.0, 120.0]
+    assert hours.maximum.tolist() == [119.0, 239.0]
+    assert hours.last.tolist() == [119.0, 239.0]
+    assert hours.count.tolist() == [120, 120]
+    assert half_hours.timestamps.tolist() == [1800]
+    assert half_hours.average.tolist() == [89.5]
+    assert rollups.columns(VIN) == [SOC]
+
+
+def test_only_the_configured_parts_are_rolled_up() -> None:
+    rollups = TelemetryRollups()
+    rollups.add(
+        VIN,
+        VehicleStatusResp(
+            basicVehicleStatus=BasicVehicleStatus(mileage=100), statusTime=5
+        ),
+        timestamp=5,
+    )
+
+    assert rollups.columns(VIN) == [MILEAGE]
+
+
+def test_frames_and_live_snapshots_merge_out_of_order() -> None:
+    recorder = TelemetryRecorder()
+    for timestamp in range(3600, 7200, 60):
+        recorder.record(VIN, _charging(50), timestamp=timestamp)
+    live = TelemetryRollups()
+    live.add(VIN, _charging(10), timestamp=7200)
+    live.add(VIN, _charging(90), timestamp=30)
+
+    live.feed_frame(VIN, ChrgMgmtDataResp, recorder.read(VIN, ChrgMgmtDataResp))
+    days = live.aggregate(VIN, SOC, bucket=86400)
+    hours = live.aggregate(VIN, SOC, bucket=3600)
+
+    assert days.count.tolist() == [62]
+    assert days.minimum.tolist() == [10.0]
+    assert days.maximum.tolist() == [90.0]
+    assert days.last.tolist() == [10.0]
+    assert hours.timestamps.tolist() == [0, 3600, 7200]
+    np.testing.assert_allclose(hours.average, [90.0, 50.0, 10.0])
+
+
+def test_bucket_must_be_a_multiple_of_the_finest_tier() -> None:
+    with pytest.raises(ValueError, match="multiple of 60"):
+        TelemetryRollups().aggregate(VIN, SOC, bucket=90)
+    assert len(TelemetryRollups().aggregate(VIN, SOC, bucket=60)) == 0
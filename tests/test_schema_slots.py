@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from dataclasses import is_dataclass
+import inspect
+from typing import TYPE_CHECKING
+
+import pytest
+
+from saic_ismart_client_ng.api import schema as common_schema
+from saic_ismart_client_ng.api.message import schema as message_schema
+from saic_ismart_client_ng.api.vehicle import schema as vehicle_schema
+from saic_ismart_client_ng.api.vehicle_charging import (
+    ChrgMgmtData,
+    schema as charging_schema,
+)
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+
+def _dataclasses(module: ModuleType) -> list[type]:
+    found = []
+    pending = [member for _, member in inspect.getmembers(module, inspect.isclass)]
+    while pending:
+        cls = pending.pop()
+        if is_dataclass(cls) and cls.__module__ == module.__name__:
+            found.append(cls)
+            pending.extend(
+                member
+                for _, member in inspect.getmembers(cls, inspect.isclass)
+                if member.__qualname__.startswith(cls.__qualname__ + ".")
+            )
+    return found
+
+
+@pytest.mark.parametrize(
+    "module", [common_schema, message_schema, vehicle_schema, charging_schema]
+)
+def test_schema_dataclasses_are_slotted(module: ModuleType) -> None:
+    classes = _dataclasses(module)
+
+    assert classes
+    for cls in classes:
+        assert "__slots__" in cls.__dict__, cls.__qualname__
+
+
+def test_slotted_instances_keep_decoded_properties() -> None:
+    data = ChrgMgmtData(bmsPackCrnt=19915, bmsPackVol=1649, bmsChrgSts=1)
+
+    assert not hasattr(data, "__dict__")
+    assert data.decoded_power == pytest.approx(-1.7520625)
+    assert data.bms_charging_status is not None
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from saic_ismart_client_ng.api.lazy import lazy_view
+from saic_ismart_client_ng.api.vehicle import BasicVehicleStatus, VehicleStatusResp
+from saic_ismart_client_ng.api.vehicle_charging import ChrgMgmtDataResp
+from saic_ismart_client_ng.telemetry import (
+    TelemetryReader,
+    TelemetryRecorder,
+    schema_columns,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+VIN = "LSJWHXXXXXXXXXXXX"
+
+
+def _status(status_time: int, mileage: int | None) -> VehicleStatusResp:
+    return VehicleStatusResp(
+        basicVehicleStatus=BasicVehicleStatus(mileage=mileage, engineStatus=0),
+        statusTime=status_time,
+    )
+
+
+def test_schema_columns_flatten_numeric_fields() -> None:
+    names = {column.name for column in schema_columns(VehicleStatusResp)}
+
+    assert "statusTime" in names
+    assert "basicVehicleStatus.mileage" in names
+    assert "gpsPosition.wayPoint.position.latitude" in names
+    assert schema_columns(lazy_view(VehicleStatusResp, {}).__class__) == (
+        schema_columns(VehicleStatusResp)
+    )
+
+
+def test_in_memory_recorder_reads_time_ranges() -> None:
+    recorder = TelemetryRecorder(chunk_size=4)
+    for i in range(10):
+        recorder.record(VIN, _status(1000 + i, None if i == 3 else i * 10))
+
+    frame = recorder.read(
+        VIN,
+        VehicleStatusResp,
+        start=1002,
+        end=1005,
+        names=["basicVehicleStatus.mileage"],
+    )
+
+    assert frame.timestamps == [1002, 1003, 1004, 1005]
+    assert frame.column("basicVehicleStatus.mileage") == [20, None, 40, 50]
+    assert list(frame.columns) == ["basicVehicleStatus.mileage"]
+
+
+def test_flushed_chunks_are_read_back_from_disk(tmp_path: Path) -> None:
+    recorder = TelemetryRecorder(tmp_path, chunk_size=3)
+    # Out of order snapshots are sorted when a chunk is flushed
+    for status_time in (5, 3, 4, 1, 2, 6, 7):
+        recorder.record(VIN, _status(status_time, status_time * 100))
+
+    assert len(list(TelemetryReader(tmp_path).chunk_paths(VIN, VehicleStatusResp))) == 2
+    assert (
+        len(
+            list(TelemetryReader(tmp_path).chunk_paths(VIN, "VehicleStatusResp", end=2))
+        )
+        == 1
+    )
+
+    recorder.flush()
+    frame = TelemetryReader(tmp_path).read(VIN, VehicleStatusResp, start=2, end=6)
+
+    assert frame.timestamps == [2, 3, 4, 5, 6]
+    assert frame.column("basicVehicleStatus.mileage") == [200, 300, 400, 500, 600]
+    assert frame.column("basicVehicleStatus.engineStatus") == [0] * 5
+    assert frame.column("gpsPosition.gpsStatus") == [None] * 5
+
+
+def test_recorder_read_combines_flushed_and_buffered_rows(tmp_path: Path) -> None:
+    recorder = TelemetryRecorder(tmp_path, chunk_size=2)
+    for i in range(5):
+        recorder.record(VIN, _status(i, i))
+
+    assert recorder.read(VIN, VehicleStatusResp).timestamps == [0, 1, 2, 3, 4]
+
+
+def test_snapshots_are_recorded_per_kind(tmp_path: Path) -> None:
+    recorder = TelemetryRecorder(tmp_path)
+    recorder.record(VIN, _status(1, 1))
+    recorder.record(VIN, ChrgMgmtDataResp(), timestamp=2)
+    recorder.flush()
+
+    reader = TelemetryReader(tmp_path)
+
+    assert reader.read(VIN, VehicleStatusResp).timestamps == [1]
+    assert reader.read(VIN, ChrgMgmtDataResp).timestamps == [2]
+    assert len(reader.read("OTHER", ChrgMgmtDataResp)) == 0
+
+
+def test_restarted_recorder_keeps_earlier_chunks(tmp_path: Path) -> None:
+    for mileage in (100, 200):
+        recorder = TelemetryRecorder(tmp_path, chunk_size=2)
+        recorder.record(VIN, _status(1, mileage))
+        recorder.record(VIN, _status(2, mileage))
+
+    frame = TelemetryReader(tmp_path).read(VIN, VehicleStatusResp)
+
+    assert frame.timestamps == [1, 1, 2, 2]
+    assert sorted(frame.column("basicVehicleStatus.mileage")) == [100, 100, 200, 200]
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from saic_ismart_client_ng.api.schema import GpsPosition
+from saic_ismart_client_ng.telemetry import (
+    DistanceDownsampler,
+    OpeningWindowDownsampler,
+    TrackPoint,
+    TrackStore,
+    douglas_peucker,
+)
+from saic_ismart_client_ng.telemetry.tracks import distance_m
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+VIN = "LSJWHXXXXXXXXXXXX"
+
+
+def _position(latitude: int, longitude: int) -> GpsPosition:
+    return GpsPosition(
+        gpsStatus=2,
+        wayPoint=GpsPosition.WayPoint(
+            position=GpsPosition.WayPoint.Position(
+                altitude=115, latitude=latitude, longitude=longitude
+            ),
+            heading=90,
+            speed=300,
+        ),
+    )
+
+
+def _point(timestamp: int, latitude: int, longitude: int) -> TrackPoint:
+    return TrackPoint(timestamp, latitude, longitude, 0, 0, 0)
+
+
+# About 7.8 m per 100 millionths of a degree of longitude at 45 degrees north
+STRAIGHT_LINE = [_point(i, 45_000_000, 9_000_000 + i * 100) for i in range(50)]
+
+
+def test_points_without_coordinates_are_skipped() -> None:
+    store = TrackStore()
+
+    assert not store.append(VIN, 1, GpsPosition(gpsStatus=0))
+    assert not store.append(VIN, 2, _position(0, 0))
+    assert store.append(VIN, 3, _position(45485072, 9160267))
+
+    track = store.read(VIN)
+    assert track.points() == [TrackPoint(3, 45485072, 9160267, 115, 300, 90)]
+    assert track.latitudes_deg() == [pytest.approx(45.485072)]
+    assert track.longitudes_deg() == [pytest.approx(9.160267)]
+
+
+def test_distance_is_in_meters() -> None:
+    assert distance_m(STRAIGHT_LINE[0], STRAIGHT_LINE[1]) == pytest.approx(
+        7.86, abs=0.01
+    )
+
+
+def test_douglas_peucker_keeps_corners() -> None:
+    corner = _point(100, 45_010_000, 9_004_900)
+    points = [*STRAIGHT_LINE, corner]
+
+    assert douglas_peucker(points, epsilon_m=1.0) == [
+        STRAIGHT_LINE[0],
+        STRAIGHT_LINE[-1],
+        corner,
+    ]
+
+
+def test_opening_window_downsampling_matches_straight_lines() -> None:
+    store = TrackStore(downsampler=lambda: OpeningWindowDownsampler(1.0))
+    for point in STRAIGHT_LINE:
+        store.append_point(VIN, point)
+
+    assert store.read(VIN).points() == [STRAIGHT_LINE[0], STRAIGHT_LINE[-1]]
+
+
+def test_distance_downsampling_drops_close_points() -> None:
+    store = TrackStore(downsampler=lambda: DistanceDownsampler(20.0))
+    for point in STRAIGHT_LINE:
+        store.append_point(VIN, point)
+
+    timestamps = list(store.read(VIN).timestamps)
+
+    assert timestamps == list(range(0, 50, 3))
+
+
+def test_flushed_tracks_are_read_by_time_range(tmp_path: Path) -> None:
+    store = TrackStore(tmp_path)
+    for point in STRAIGHT_LINE[:30]:
+        store.append_point(VIN, point)
+    store.flush()
+    for point in STRAIGHT_LINE[30:]:
+        store.append_point(VIN, point)
+
+    track = store.read(VIN, start=25, end=34)
+
+    assert list(track.timestamps) == list(range(25, 35))
+    assert (tmp_path / f"{VIN}.track").stat().st_size == 30 * 28
+    assert len(TrackStore(tmp_path).read(VIN)) == 30
+
+
+def test_to_numpy_converts_coordinates() -> None:
+    pytest.importorskip("numpy")
+    store = TrackStore()
+    store.append(VIN, 1, _position(45485072, 9160267))
+
+    columns = store.read(VIN).to_numpy()
+
+    assert columns["latitudes"][0] == pytest.approx(45.485072)
+    assert columns["timestamps"].tolist() == [1]
+
+
+@pytest.mark.parametrize("max_window", [-1, 0, 1])
+def test_opening_window_needs_two_points(max_window: int) -> None:
+    with pytest.raises(ValueError, match="at least 2 points"):
+        OpeningWindowDownsampler(1.0, max_window=max_window)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from saic_ismart_client_ng.api.schema import GpsPosition
+from saic_ismart_client_ng.api.vehicle import BasicVehicleStatus, VehicleStatusResp
+from saic_ismart_client_ng.api.vehicle_charging import (
+    ChrgMgmtDataResp,
+    RvsChargeStatus,
+)
+from saic_ismart_client_ng.telemetry import (
+    TelemetryRecorder,
+    Trip,
+    TripBuilder,
+    build_trips,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+VIN = "LSJWHXXXXXXXXXXXX"
+
+
+def _status(
+    *,
+    engine: int,
+    mileage: int | None,
+    journey: int = 7,
+    longitude: int = 9_000_000,
+    hand_brake: int = 0,
+) -> VehicleStatusResp:
+    return VehicleStatusResp(
+        basicVehicleStatus=BasicVehicleStatus(
+            engineStatus=engine,
+            handBrake=hand_brake,
+            mileage=mileage,
+            currentJourneyId=journey,
+        ),
+        gpsPosition=GpsPosition(
+            wayPoint=GpsPosition.WayPoint(
+                position=GpsPosition.WayPoint.Position(
+                    latitude=45_000_000, longitude=longitude
+                )
+            )
+        ),
+    )
+
+
+def _charging(usage: int) -> ChrgMgmtDataResp:
+    return ChrgMgmtDataResp(rvsChargeStatus=RvsChargeStatus(powerUsageOfDay=usage))
+
+
+# A 3 km drive along a straight line, with the daily usage counter reset midway
+STREAM = [
+    (0, _status(engine=0, mileage=10000), _charging(50)),
+    (60, _status(engine=1, mileage=10000), _charging(52)),
+    (120, _status(engine=1, mileage=10010, longitude=9_012_000), _charging(60)),
+    (180, _status(engine=1, mileage=10020, longitude=9_025_000), _charging(3)),
+    (240, _status(engine=0, mileage=10030, longitude=9_038_000), _charging(6)),
+    (300, _status(engine=0, mileage=10030, longitude=9_038_000), _charging(6)),
+]
+
+
+def test_trip_ends_when_parked() -> None:
+    trips: list[Trip] = []
+    builder = TripBuilder(on_trip=trips.append)
+
+    for timestamp, status, charging in STREAM:
+        builder.feed(VIN, timestamp, status, charging)
+
+    assert len(trips) == 1
+    trip = trips[0]
+    assert (trip.start, trip.end, trip.samples) == (60, 240, 4)
+    assert trip.journey_id == 7
+    assert trip.distance_km == pytest.approx(3.0)
+    assert (trip.start_mileage_km, trip.end_mileage_km) == (1000.0, 1003.0)
+    assert trip.energy_kwh == pytest.approx(1.4)
+    assert trip.consumption_kwh_per_100km == pytest.approx(1.4 / 3.0 * 100)
+    # The fixes are on a straight line
+    assert [point.timestamp for point in trip.route] == [60, 240]
+
+
+def test_hand_brake_parks_the_vehicle() -> None:
+    builder = TripBuilder()
+    builder.feed(VIN, 0, _status(engine=1, mileage=1))
+
+    (trip,) = builder.feed(VIN, 60, _status(engine=1, mileage=2, hand_brake=1))
+
+    assert trip.end == 60
+
+
+def test_journey_change_and_gaps_split_trips() -> None:
+    builder = TripBuilder(max_gap=600)
+    builder.feed(VIN, 0, _status(engine=1, mileage=100))
+
+    (first,) = builder.feed(VIN, 60, _status(engine=1, mileage=110, journey=8))
+    (second,) = builder.feed(VIN, 1000, _status(engine=1, mileage=150, journey=8))
+    (third,) = builder.flush()
+
+    assert (first.journey_id, first.end, first.energy_kwh) == (7, 0, None)
+    assert (second.start, second.end, second.distance_km) == (60, 60, 0.0)
+    assert (third.start, third.end) == (1000, 1000)
+
+
+def test_distance_falls_back_to_gps() -> None:
+    builder = TripBuilder()
+    for timestamp, longitude in ((0, 9_000_000), (60, 9_012_000), (120, 9_025_000)):
+        builder.feed(
+            VIN, timestamp, _status(engine=1, mileage=None, longitude=longitude)
+        )
+
+    (trip,) = builder.flush()
+
+    # 0.025 degrees of longitude at 45 degrees north
+    assert trip.distance_km == pytest.approx(1.965, abs=0.001)
+    assert trip.start_mileage_km is None
+
+
+def test_archives_are_processed_in_worker_processes(tmp_path: Path) -> None:
+    recorder = TelemetryRecorder(tmp_path, chunk_size=4)
+    for vin in (VIN, "LSJWHYYYYYYYYYYYY"):
+        for timestamp, status, charging in STREAM:
+            recorder.record(vin, status, timestamp=timestamp)
+            recorder.record(vin, charging, timestamp=timestamp)
+    recorder.flush()
+    builder = TripBuilder()
+    expected = [
+        trip
+        for timestamp, status, charging in STREAM
+        for trip in builder.feed(VIN, timestamp, status, charging)
+    ]
+
+    trips = build_trips(tmp_path, max_workers=2)
+
+    assert sorted(trips) == ["LSJWHXXXXXXXXXXXX", "LSJWHYYYYYYYYYYYY"]
+    assert trips[VIN] == expected
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+import json
+
+from saic_ismart_client_ng.api.vehicle.commands import (
+    _serialized_prefix,
+    climate_command,
+    close_locks_command,
+    find_my_car_command,
+    open_locks_command,
+    windows_command,
+)
+from saic_ismart_client_ng.api.vehicle.locks.schema import VehicleLockId
+from saic_ismart_client_ng.api.vehicle.schema import (
+    RvcParams,
+    RvcParamsId,
+    RvcReqType,
+    VehicleControlReq,
+)
+from saic_ismart_client_ng.api.vehicle.windows.schema import VehicleWindowId
+from saic_ismart_client_ng.crypto_utils import sha256_hex_digest
+
+VIN_HASH = sha256_hex_digest("LSJWHXXXXXXXXXXXX")
+
+
+def test_serialized_climate_command_matches_request_dataclass() -> None:
+    expected = VehicleControlReq(
+        rvc_req_type=RvcReqType.CLIMATE,
+        rvc_params=[
+            RvcParams(RvcParamsId.FAN_SPEED, b"\x02"),
+            RvcParams(RvcParamsId.TEMPERATURE, b"\x08"),
+            RvcParams(RvcParamsId.PARAMS_MAX, b"\x00\x00\x00\x00"),
+        ],
+        vin=VIN_HASH,
+    )
+    command = climate_command(fan_speed=2, ac_on=None, temperature_idx=8)
+
+    assert json.loads(command.serialize(VIN_HASH)) == asdict(expected)
+    assert asdict(command.to_request(VIN_HASH)) == asdict(expected)
+
+
+def test_serialized_command_without_params() -> None:
+    decoded = json.loads(close_locks_command().serialize(VIN_HASH))
+
+    assert decoded == {"rvcReqType": "1", "vin": VIN_HASH}
+
+
+def test_serialized_open_locks_command() -> None:
+    decoded = json.loads(open_locks_command(VehicleLockId.TAILGATE).serialize(VIN_HASH))
+
+    assert decoded["rvcReqType"] == "2"
+    assert decoded["rvcParams"][3] == {"paramId": 7, "paramValue": "Ag=="}
+
+
+def test_windows_command_ignores_requested_order() -> None:
+    first = windows_command(
+        should_open=True,
+        windows=[VehicleWindowId.DRIVER, VehicleWindowId.SUNROOF],
+    )
+    second = windows_command(
+        should_open=True,
+        windows=[VehicleWindowId.SUNROOF, VehicleWindowId.DRIVER],
+    )
+
+    assert first == second
+
+
+def test_stopping_find_my_car_disables_horn_and_lights() -> None:
+    assert find_my_car_command(should_stop=True) == find_my_car_command(
+        should_stop=True, with_horn=False, with_lights=False
+    )
+
+
+def test_serialized_prefix_is_cached_per_command() -> None:
+    command = climate_command(fan_speed=3, ac_on=True, temperature_idx=5)
+    command.serialize(VIN_HASH)
+    hits = _serialized_prefix.cache_info().hits
+
+    climate_command(fan_speed=3, ac_on=True, temperature_idx=5).serialize("other")
+
+    assert _serialized_prefix.cache_info().hits == hits + 1
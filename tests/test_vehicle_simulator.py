@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from saic_ismart_client_ng import SaicApi
+from saic_ismart_client_ng.api.vehicle.commands import (
+    climate_command,
+    close_locks_command,
+    open_locks_command,
+    windows_command,
+)
+from saic_ismart_client_ng.api.vehicle.locks.schema import VehicleLockId
+from saic_ismart_client_ng.api.vehicle.windows.schema import VehicleWindowId
+from saic_ismart_client_ng.api.vehicle_charging.schema import (
+    BmsChargingStatusCode,
+    ChargingControlRequest,
+)
+from saic_ismart_client_ng.mock import (
+    MockGateway,
+    MockGatewayTransport,
+    SimulatedVehicle,
+    SimulationTiming,
+    mock_vin,
+)
+from saic_ismart_client_ng.model import SaicApiConfiguration
+from saic_ismart_client_ng.net.codec import to_json_dict
+
+if TYPE_CHECKING:
+    from saic_ismart_client_ng.api.vehicle.schema import BasicVehicleStatus
+
+VIN = mock_vin(1)
+T0 = 1_700_000_000.0
+
+
+def _basic_status(vehicle: SimulatedVehicle, now: float) -> BasicVehicleStatus:
+    status = vehicle.vehicle_status(now).basicVehicleStatus
+    assert status is not None
+    return status
+
+
+def test_locks_change_after_actuation() -> None:
+    vehicle = SimulatedVehicle(VIN)
+    vehicle.response_delay(T0)
+
+    vehicle.control(
+        to_json_dict(open_locks_command(VehicleLockId.DOORS).to_request("")), T0
+    )
+
+    assert _basic_status(vehicle, T0 + 1).lockStatus == 1
+    assert _basic_status(vehicle, T0 + 20).lockStatus == 0
+
+    vehicle.control(to_json_dict(close_locks_command().to_request("")), T0 + 20)
+
+    assert _basic_status(vehicle, T0 + 30).lockStatus == 1
+
+
+def test_climate_starts_after_a_delay_and_warms_the_cabin() -> None:
+    vehicle = SimulatedVehicle(VIN, timing=SimulationTiming(climate=30))
+    vehicle.response_delay(T0)
+
+    vehicle.control(
+        to_json_dict(climate_command(fan_speed=2, ac_on=None).to_request("")), T0
+    )
+
+    before = vehicle.vehicle_status(T0 + 10).basicVehicleStatus
+    after = vehicle.vehicle_status(T0 + 30 + 600).basicVehicleStatus
+    assert before is not None
+    assert after is not None
+    assert before.remoteClimateStatus == 0
+    assert after.remoteClimateStatus == 2
+    assert after.interiorTemperature == 22
+
+
+def test_windows() -> None:
+    vehicle = SimulatedVehicle(VIN)
+    vehicle.response_delay(T0)
+
+    command = windows_command(should_open=True, windows=[VehicleWindowId.DRIVER])
+    vehicle.control(to_json_dict(command.to_request("")), T0)
+
+    # Waking up takes 10 seconds, moving the window 2 more
+    assert _basic_status(vehicle, T0 + 11).driverWindow == 0
+    status = vehicle.vehicle_status(T0 + 12).basicVehicleStatus
+    assert status is not None
+    assert status.driverWindow == 1
+    assert status.passengerWindow == 0
+
+
+def test_sleeping_vehicle_wakes_up() -> None:
+    vehicle = SimulatedVehicle(VIN, timing=SimulationTiming(wake_up=10, stay_awake=300))
+
+    assert vehicle.response_delay(T0) == 10
+    assert vehicle.response_delay(T0 + 100) == 0
+    assert vehicle.is_awake(T0 + 399)
+    assert not vehicle.is_awake(T0 + 400)
+    assert vehicle.response_delay(T0 + 500) == 10
+
+
+def test_charging_advances_soc_until_target() -> None:
+    vehicle = SimulatedVehicle(
+        VIN,
+        soc=50.0,
+        capacity_kwh=64.0,
+        charging_power_kw=6.4,
+        timing=SimulationTiming(actuation=0, charge_start=0),
+    )
+    vehicle.response_delay(T0)
+
+    vehicle.charging_control(to_json_dict(ChargingControlRequest(chrgCtrlReq=1)), T0)
+
+    one_hour = vehicle.charging_management_data(T0 + 3600).chrgMgmtData
+    assert one_hour is not None
+    assert one_hour.is_bms_charging
+    assert one_hour.bmsPackSOCDsp == 600
+    assert one_hour.decoded_power == pytest.approx(-6.4, abs=0.05)
+
+    done = vehicle.charging_management_data(T0 + 6 * 3600)
+    assert done.chrgMgmtData is not None
+    assert done.chrgMgmtData.bms_charging_status == BmsChargingStatusCode.CHARGE_DONE
+    assert done.chrgMgmtData.bmsPackSOCDsp == 1000
+    assert done.rvsChargeStatus is not None
+    assert done.rvsChargeStatus.powerUsageSinceLastCharge == 320
+
+
+def test_stop_replaces_pending_start() -> None:
+    vehicle = SimulatedVehicle(
+        VIN, timing=SimulationTiming(actuation=1, charge_start=60)
+    )
+    vehicle.response_delay(T0)
+
+    vehicle.charging_control({"chrgCtrlReq": 1}, T0)
+    vehicle.charging_control({"chrgCtrlReq": 2}, T0 + 10)
+
+    data = vehicle.charging_management_data(T0 + 120).chrgMgmtData
+    assert data is not None
+    assert data.bms_charging_status == BmsChargingStatusCode.CONNECTED_NOT_CHARGING
+    assert vehicle.soc(T0 + 120) == 50.0
+
+
+@pytest.mark.asyncio
+async def test_commands_through_the_gateway() -> None:
+    timing = SimulationTiming(wake_up=0, actuation=0, climate=0)
+    gateway = MockGateway(
+        vehicle_factory=lambda vin: SimulatedVehicle(vin, timing=timing)
+    )
+    gateway.add_account("driver@example.com", "secret")
+    api = SaicApi(
+        SaicApiConfiguration(
+            "driver@example.com",
+            "secret",
+            base_uri="https://gateway.mock/api.app/v1/",
+            sms_delivery_delay=0,
+        ),
+        transport=MockGatewayTransport(gateway),
+    )
+    await api.login()
+
+    await api.unlock_vehicle(VIN)
+    await api.start_ac(VIN)
+    status = await api.get_vehicle_status(VIN)
+
+    assert status.basicVehicleStatus is not None
+    assert status.basicVehicleStatus.lockStatus == 0
+    assert status.basicVehicleStatus.remoteClimateStatus == 2
+    assert status.basicVehicleStatus.canBusActive == 1
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from typing import TYPE_CHECKING
+
+import pytest
+
+from saic_ismart_client_ng.api.lazy import lazy_view, materialize
+from saic_ismart_client_ng.api.vehicle import BasicVehicleStatus, VehicleStatusResp
+from saic_ismart_client_ng.api.vehicle_charging import (
+    ChrgMgmtData,
+    ChrgMgmtDataResp,
+)
+from saic_ismart_client_ng.telemetry import TelemetryWarehouse
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+VIN = "LSJWHXXXXXXXXXXXX"
+SOC = "chrgMgmtData.bmsPackSOCDsp"
+
+
+def _charging(soc: int | None) -> ChrgMgmtDataResp:
+    return ChrgMgmtDataResp(chrgMgmtData=ChrgMgmtData(bmsPackSOCDsp=soc))
+
+
+def test_series_and_latest_values(tmp_path: Path) -> None:
+    with TelemetryWarehouse(tmp_path / "telemetry.db") as warehouse:
+        for timestamp, soc in ((10, 500), (20, 510), (30, None), (40, 530)):
+            warehouse.record(VIN, _charging(soc), timestamp=timestamp)
+        warehouse.record("OTHER", _charging(999), timestamp=25)
+        warehouse.flush()
+
+        assert warehouse.series(VIN, ChrgMgmtDataResp, SOC, start=15, end=35) == [
+            (20, 510),
+            (30, None),
+        ]
+        assert warehouse.latest_value(VIN, "ChrgMgmtDataResp", SOC, before=35) == (
+            20,
+            510,
+        )
+        timestamp, snapshot = warehouse.latest(VIN, ChrgMgmtDataResp) or (0, None)
+        assert timestamp == 40
+        assert isinstance(snapshot, ChrgMgmtDataResp)
+        assert snapshot.chrgMgmtData is not None
+        assert snapshot.chrgMgmtData.bmsPackSOCDsp == 530
+
+
+def test_snapshots_default_to_status_time(tmp_path: Path) -> None:
+    with TelemetryWarehouse(tmp_path / "telemetry.db") as warehouse:
+        warehouse.record(
+            VIN,
+            lazy_view(
+                VehicleStatusResp,
+                {"statusTime": 1234, "basicVehicleStatus": {"mileage": 10}},
+            ),
+        )
+        warehouse.flush()
+
+        ((timestamp, snapshot),) = warehouse.snapshots(VIN, VehicleStatusResp)
+
+    assert timestamp == 1234
+    assert materialize(snapshot.basicVehicleStatus) == BasicVehicleStatus(mileage=10)
+
+
+def test_unknown_kinds_and_columns_are_rejected(tmp_path: Path) -> None:
+    with TelemetryWarehouse(tmp_path / "telemetry.db") as warehouse:
+        with pytest.raises(ValueError, match="not stored"):
+            warehouse.record(VIN, BasicVehicleStatus())
+        with pytest.raises(ValueError, match="no numeric column"):
+            warehouse.series(VIN, ChrgMgmtDataResp, "chrgMgmtData; DROP TABLE")
+
+
+def test_writes_survive_reopening(tmp_path: Path) -> None:
+    path = tmp_path / "telemetry.db"
+
+    async def record() -> None:
+        warehouse = TelemetryWarehouse(path, batch_size=64)
+        for timestamp in range(5000):
+            warehouse.record(VIN, _charging(timestamp % 1000), timestamp=timestamp)
+        await warehouse.flush_async()
+        warehouse.close()
+
+    asyncio.run(record())
+
+    connection = sqlite3.connect(path)
+    assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    connection.close()
+    with TelemetryWarehouse(path) as warehouse:
+        series = warehouse.series(VIN, ChrgMgmtDataResp, SOC)
+
+        assert len(series) == 5000
+        assert series[-1] == (4999, 999)
+
+
+def test_missing_columns_are_added_on_open(tmp_path: Path) -> None:
+    path = tmp_path / "telemetry.db"
+    TelemetryWarehouse(path).close()
+    connection = sqlite3.connect(path)
+    connection.execute(f'ALTER TABLE "ChrgMgmtDataResp" DROP COLUMN "{SOC}"')
+    connection.close()
+
+    with TelemetryWarehouse(path) as warehouse:
+        warehouse.record(VIN, _charging(510), timestamp=10)
+        warehouse.flush()
+
+        assert warehouse.series(VIN, ChrgMgmtDataResp, SOC) == [(10, 510)]
+
+
+def test_failed_batches_are_raised_on_flush(tmp_path: Path) -> None:
+    path = tmp_path / "telemetry.db"
+    with TelemetryWarehouse(path) as warehouse:
+        connection = sqlite3.connect(path)
+        connection.execute('DROP TABLE "ChrgMgmtDataResp"')
+        connection.close()
+        warehouse.record(VIN, _charging(510), timestamp=10)
+
+        with pytest.raises(sqlite3.OperationalError, match="no such table"):
+            warehouse.flush()
+        warehouse.flush()
+
+
+def test_unwritable_values_are_raised_on_flush(tmp_path: Path) -> None:
+    with TelemetryWarehouse(tmp_path / "telemetry.db") as warehouse:
+        warehouse.record(
+            VIN,
+            VehicleStatusResp(basicVehicleStatus=BasicVehicleStatus(mileage=2**70)),
+            timestamp=10,
+        )
+
+        with pytest.raises(OverflowError):
+            warehouse.flush()
+
+        warehouse.record(VIN, _charging(510), timestamp=20)
+        warehouse.flush()
+
+        assert warehouse.series(VIN, ChrgMgmtDataResp, SOC) == [(20, 510)]